@@ -19,8 +19,14 @@ interface PlacesContextType {
   allPlaces: Place[];
   refreshPlaces: () => void;
   deletePlace: (placeId: string) => Promise<void>;
+  fetchPlacesByIds: (placeIds: string[]) => Promise<Place[]>;
 }
 
+const PAGE_SIZE = 200;
+
+// Last /places/batch response per id list, revalidated with its ETag
+const batchCache = new Map<string, { etag: string; places: Place[] }>();
+
 export const PlacesContext = createContext<PlacesContextType | undefined>(undefined);
 
 export const PlacesProvider = ({ children }: { children: ReactNode }) => {
@@ -28,12 +34,20 @@ export const PlacesProvider = ({ children }: { children: ReactNode }) => {
 
   const fetchAllPlaces = async () => {
     try {
-      const response = await axios.get('http://192.168.1.14:8080/places', {
-        params: { page: 1, per_page: 1000 },
-      });
-      if (response.data.success) {
-        setAllPlaces(response.data.places);
-      }
+      // Follow the server's cursor so each page costs the same at any depth
+      const places: Place[] = [];
+      let cursor: string | null = null;
+      do {
+        const response = await axios.get('http://192.168.1.14:8080/places', {
+          params: { per_page: PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+        });
+        if (!response.data.success) {
+          break;
+        }
+        places.push(...response.data.places);
+        cursor = response.data.pagination.next_cursor;
+      } while (cursor);
+      setAllPlaces(places);
     } catch (e) {
       setAllPlaces([]);
     }
@@ -44,12 +58,38 @@ export const PlacesProvider = ({ children }: { children: ReactNode }) => {
     await fetchAllPlaces();
   };
 
+  const fetchPlacesByIds = async (placeIds: string[]): Promise<Place[]> => {
+    if (placeIds.length === 0) {
+      return [];
+    }
+    const key = placeIds.join(',');
+    const cached = batchCache.get(key);
+    const response = await axios.post(
+      'http://192.168.1.14:8080/places/batch',
+      { ids: placeIds },
+      {
+        headers: cached ? { 'If-None-Match': cached.etag } : {},
+        validateStatus: (status) => status === 200 || status === 304,
+      }
+    );
+    if (response.status === 304 && cached) {
+      return cached.places;
+    }
+    const places: Place[] = response.data.places;
+    if (response.headers.etag) {
+      batchCache.set(key, { etag: response.headers.etag, places });
+    }
+    return places;
+  };
+
   useEffect(() => {
     fetchAllPlaces();
   }, []);
 
   return (
-    <PlacesContext.Provider value={{ allPlaces, refreshPlaces: fetchAllPlaces, deletePlace }}>
+    <PlacesContext.Provider
+      value={{ allPlaces, refreshPlaces: fetchAllPlaces, deletePlace, fetchPlacesByIds }}
+    >
       {children}
     </PlacesContext.Provider>
   );
@@ -1,4 +1,4 @@
-import React, { useContext, useState } from 'react';
+import React, { useContext, useEffect, useState } from 'react';
 import { View, Text, StyleSheet, FlatList, Modal, Alert } from 'react-native';
 import { Button, Card } from 'react-native-paper';
 import { AlbumsContext, Album } from '../context/AlbumsContext';
@@ -10,14 +10,24 @@ const AlbumDetailScreen: React.FC = ({ route, navigation }: any) => {
   const albumsContext = useContext(AlbumsContext)!;
   const { removePlaceFromAlbums } = albumsContext;
   const placesContext = useContext(PlacesContext)!;
-  const { allPlaces, deletePlace } = placesContext;
+  const { allPlaces, deletePlace, fetchPlacesByIds } = placesContext;
 
   // Add state for delete modal and loading
   const [deletePlaceModalVisible, setDeletePlaceModalVisible] = useState(false);
   const [deleteLoading, setDeleteLoading] = useState(false);
   const [placeToDelete, setPlaceToDelete] = useState<Place | null>(null);
 
-  const places = allPlaces.filter((place: Place) => album.placeIds.includes(place.id));
+  // Album contents come from one batch request; an unchanged album is
+  // revalidated with its ETag instead of being downloaded again
+  const [places, setPlaces] = useState<Place[]>([]);
+
+  useEffect(() => {
+    fetchPlacesByIds(album.placeIds)
+      .then(setPlaces)
+      .catch(() =>
+        setPlaces(allPlaces.filter((place: Place) => album.placeIds.includes(place.id)))
+      );
+  }, [album.placeIds, allPlaces]);
 
   const handleDeletePlace = async (place: Place) => {
     setPlaceToDelete(place);
@@ -40,6 +40,9 @@ const UploadScreen: React.FC = () => {
   const [isConnected, setIsConnected] = useState<boolean | null>(null);
 
   const API_BASE_URL = 'http://192.168.1.14:8080';
+  const JOB_POLL_INTERVAL_MS = 2000;
+  // Give up polling after this long (the server times a job out after 30 min)
+  const JOB_POLL_DEADLINE_MS = 40 * 60 * 1000;
 
   // Test connection on component mount
   useEffect(() => {
@@ -100,12 +103,30 @@ const UploadScreen: React.FC = () => {
       console.log('Sending request with data:', requestData);
       
       setProgress('Sending video URL to server...');
-      const response = await axios.post(`${API_BASE_URL}/process-url`, requestData, {
+      const submitted = await axios.post(`${API_BASE_URL}/process-url`, requestData, {
         headers: {
           'Content-Type': 'application/json',
         },
-        timeout: 300000, // 5 minutes timeout
+        timeout: 30000,
       });
+      const jobId = submitted.data.job_id;
+      console.log('Job queued:', jobId);
+
+      // Processing runs as a server-side job; poll until it has a result
+      let response = submitted;
+      const deadline = Date.now() + JOB_POLL_DEADLINE_MS;
+      do {
+        if (Date.now() > deadline) {
+          throw new Error('Timed out waiting for the server to process the video');
+        }
+        await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+        response = await axios.get(`${API_BASE_URL}/jobs/${jobId}/result`, {
+          timeout: 30000,
+        });
+        if (response.status === 202) {
+          setProgress(response.data.status === 'queued' ? 'Waiting in queue...' : 'Processing video...');
+        }
+      } while (response.status === 202);
 
       console.log('Response received:', response.status, response.data);
 
@@ -23,18 +23,29 @@ import tempfile
 import traceback
 import string
 import collections
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable
 
 from extractor import (
     fetch_clip,
     fetch_caption,
     whisper_transcribe,
     ocr_frames,
-    geocode_place,
+    ConcurrentGeocoder,
+    get_gazetteer,
 )
-from llm_parser import parse_place_info
+from llm_parser import (
+    Compilation,
+    PlaceInfo,
+    parse_feedback_only,
+    stream_place_info,
+)
+from pre_extractor import pre_extract
 from vector_store import VectorStore
 
+# Below this much fused text a confidently pre-extracted caption-only post has
+# nothing left for the LLM to summarise
+FEEDBACK_MIN_CHARS = 280
+
 
 # --------------------------------------------------------------------------------------
 # Helper functions
@@ -103,6 +114,12 @@ def build_summary(data: Dict[str, Any]) -> Dict[str, Any]:
                 "genre": act.get("genre"),
                 "category_detail": _get_category_detail(act),
                 "address": _format_address(avail),
+                "city": avail.get("city") or "",
+                "state": avail.get("state") or "",
+                "country": avail.get("country") or "",
+                "lat": avail.get("lat"),
+                "lon": avail.get("lon"),
+                "geo_precision": avail.get("geo_precision"),
                 "key_takeaways": _collect_takeaways(ratings),
             }
         )
@@ -112,7 +129,32 @@ def build_summary(data: Dict[str, Any]) -> Dict[str, Any]:
 # --------------------------------------------------------------------------------------
 # Core pipeline (unchanged heavy lifting)
 # --------------------------------------------------------------------------------------
-def run(url: str):
+def _needs_geocode(activity: PlaceInfo) -> bool:
+    return bool(activity.place_name) and not activity.availability.street_address
+
+
+def _apply_geocode(activity: PlaceInfo, geo: Dict[str, Any]) -> None:
+    """Fill missing address fields on an activity from a geocode result."""
+    if not geo:
+        return
+    avail = activity.availability
+    if geo.get("precision", "street") == "street":
+        avail.street_address = geo.get("display_address")
+    avail.city = avail.city or geo.get("city")
+    avail.state = avail.state or geo.get("state")
+    avail.country = avail.country or geo.get("country")
+    avail.region = avail.region or geo.get("region")
+    if geo.get("lat") is not None and geo.get("lon") is not None:
+        avail.lat, avail.lon = float(geo["lat"]), float(geo["lon"])
+        avail.geo_precision = geo.get("precision", "street")
+
+
+def run(url: str, on_activity: Optional[Callable[[PlaceInfo], None]] = None):
+    """Run the full pipeline for one video.
+
+    ``on_activity`` is called with each geocoded PlaceInfo as soon as it is
+    streamed out of the LLM, before the rest of the response arrives.
+    """
     with tempfile.TemporaryDirectory() as tmp:
         tmp_path = pathlib.Path(tmp)
         clip_path = tmp_path / "clip.mp4"
@@ -141,36 +183,57 @@ def run(url: str):
             )
             print(f"🔹 Fused text len = {len(fused_text)}")
 
-            print("🧠 Parsing via LLM…")
-            info = parse_place_info(fused_text)
-
-            print("🌍 Geocoding…")
-            for activity in info.activities:
-                if not activity.place_name:
-                    continue
-
-                if not activity.availability.street_address:
-                    geo = geocode_place(
-                        place_name=activity.place_name,
-                        genre=activity.genre,
-                        extra_hint=activity.availability.city,
-                    )
-                    if geo:
-                        activity.availability.street_address = geo.get(
-                            "display_address"
-                        )
-                        activity.availability.city = (
-                            activity.availability.city or geo.get("city")
-                        )
-                        activity.availability.state = (
-                            activity.availability.state or geo.get("state")
-                        )
-                        activity.availability.country = (
-                            activity.availability.country or geo.get("country")
-                        )
-                        activity.availability.region = (
-                            activity.availability.region or geo.get("region")
-                        )
+            # Errors raised by on_activity inside geocode callbacks, which
+            # concurrent.futures would otherwise log and drop
+            callback_errors: List[Exception] = []
+
+            with ConcurrentGeocoder() as geocoder:
+
+                def _handle_activity(activity: PlaceInfo):
+                    # Start geocoding each place as soon as the LLM finishes
+                    # describing it; lookups run concurrently with the stream
+                    if not _needs_geocode(activity):
+                        if on_activity:
+                            on_activity(activity)
+                        return
+
+                    def _done(future):
+                        try:
+                            _apply_geocode(activity, future.result())
+                        except Exception as e:
+                            # Still emit the place, just without coordinates
+                            print(f"⚠️ Geocoding failed for {activity.place_name}: {e}")
+                        try:
+                            if on_activity:
+                                on_activity(activity)
+                        except Exception as e:
+                            callback_errors.append(e)
+
+                    geocoder.submit(
+                        activity.place_name,
+                        activity.genre,
+                        activity.availability.city,
+                    ).add_done_callback(_done)
+
+                pre = pre_extract(caption_text, frame_text, get_gazetteer())
+                if pre.confident:
+                    print(f"⚡ Pre-extracted {pre.place_name} ({pre.genre})")
+                    activity = pre.to_place_info()
+                    if speech_text or len(fused_text) >= FEEDBACK_MIN_CHARS:
+                        print("🧠 Parsing feedback via LLM…")
+                        activity = parse_feedback_only(fused_text, activity)
+                    else:
+                        print("⏭️ Nothing beyond the caption – skipping LLM")
+                    _handle_activity(activity)
+                    info = Compilation(content_type=pre.genre, activities=[activity])
+                else:
+                    print("🧠 Parsing via LLM (streaming)…")
+                    info = stream_place_info(fused_text, on_activity=_handle_activity)
+
+                print("🌍 Waiting for geocoding…")
+
+            if callback_errors:
+                raise callback_errors[0]
 
             rich = info.dict()
             rich["__fused_text"] = fused_text
@@ -11,13 +11,15 @@ import traceback
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List
+import threading
 import uuid
 
 from flask import Flask, render_template, request, jsonify, send_from_directory
 from werkzeug.utils import secure_filename
 from flask_cors import CORS
 
-from agent import run, build_summary
+from extractor import get_geocode_cache
+from jobs import JOB_TIMEOUT, JobQueue, start_job_system
 from vector_store import VectorStore, search_places
 
 app = Flask(__name__)
@@ -36,6 +38,42 @@ UPLOAD_FOLDER.mkdir(exist_ok=True)
 
 ALLOWED_EXTENSIONS = {"mp4", "avi", "mov", "mkv", "webm"}
 
+# Extraction runs in worker processes fed from a persistent job queue;
+# the web process only enqueues jobs and stores their results
+job_queue = JobQueue(os.environ.get("JOB_QUEUE_PATH", "jobs.sqlite"))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_TIMEOUT_SECONDS = float(os.environ.get("JOB_TIMEOUT_SECONDS", JOB_TIMEOUT))
+_job_system = None
+_job_system_lock = threading.Lock()
+
+
+@app.before_request
+def _start_background_workers():
+    """Start workers with the first request (not in the reloader's parent)."""
+    global _job_system
+    with _job_system_lock:
+        if _job_system is None:
+            # Keep the precomputed similar-places lists current
+            vector_store.start_similar_worker()
+            _job_system = start_job_system(
+                job_queue, vector_store.store_results, JOB_WORKERS, JOB_TIMEOUT_SECONDS
+            )
+
+
+def _job_response(job_id: str):
+    return (
+        jsonify(
+            {
+                "success": True,
+                "job_id": job_id,
+                "status": "queued",
+                "status_url": f"/jobs/{job_id}",
+            }
+        ),
+        202,
+    )
+
+
 ALBUMS_FILE = Path("albums.json")
 
 
@@ -70,7 +108,7 @@ def index():
 
 @app.route("/upload", methods=["POST"])
 def upload_video():
-    """Handle video upload and processing."""
+    """Save an uploaded video and queue it for processing; returns a job id."""
     try:
         if "video" not in request.files:
             return jsonify({"error": "No video file provided"}), 400
@@ -93,29 +131,11 @@ def upload_video():
         filepath = UPLOAD_FOLDER / safe_filename
         file.save(filepath)
 
-        # Process the video
-        result = run(str(filepath))
-
-        if "error" in result:
-            # Clean up uploaded file
-            filepath.unlink(missing_ok=True)
-            return jsonify({"error": result["error"]}), 500
-
-        # Build summary and store in vector database
-        summary = build_summary(result)
-        doc_ids = vector_store.store_results(summary, f"uploaded:{safe_filename}")
-
-        # Clean up uploaded file
-        filepath.unlink(missing_ok=True)
-
-        return jsonify(
-            {
-                "success": True,
-                "result": summary,
-                "doc_ids": doc_ids,
-                "message": f"Successfully processed {len(summary['activities'])} places",
-            }
+        # The worker deletes the file once it has been processed
+        job_id = job_queue.submit(
+            "upload", str(filepath.resolve()), f"uploaded:{safe_filename}"
         )
+        return _job_response(job_id)
 
     except Exception as e:
         traceback.print_exc()
@@ -124,7 +144,7 @@ def upload_video():
 
 @app.route("/process-url", methods=["POST"])
 def process_url():
-    """Process video from URL."""
+    """Queue a video URL for processing; returns a job id."""
     try:
         data = request.get_json()
         url = data.get("url")
@@ -132,36 +152,100 @@ def process_url():
         if not url:
             return jsonify({"error": "No URL provided"}), 400
 
-        # Process the URL
-        result = run(url)
-
-        if "error" in result:
-            return jsonify({"error": result["error"]}), 500
-
-        # Build summary and store in vector database
-        summary = build_summary(result)
-        doc_ids = vector_store.store_results(summary, url)
-
-        return jsonify(
-            {
-                "success": True,
-                "result": summary,
-                "doc_ids": doc_ids,
-                "message": f"Successfully processed {len(summary['activities'])} places",
-            }
-        )
+        return _job_response(job_queue.submit("url", url, url))
 
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/jobs/<job_id>")
+def get_job(job_id):
+    """Status of a processing job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(
+        {
+            "success": True,
+            "job": {
+                key: job[key]
+                for key in (
+                    "id",
+                    "status",
+                    "attempts",
+                    "error",
+                    "created_at",
+                    "started_at",
+                    "finished_at",
+                )
+            },
+        }
+    )
+
+
+@app.route("/jobs/<job_id>/result")
+def get_job_result(job_id):
+    """Result of a finished job, shaped like the old synchronous response.
+
+    202 while the job is still queued or running, 500 if it failed.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] == "failed":
+        return jsonify({"error": job["error"], "status": "failed"}), 500
+    if job["status"] != "done":
+        return jsonify({"success": False, "status": job["status"]}), 202
+    summary = job["summary"]
+    return jsonify(
+        {
+            "success": True,
+            "result": summary,
+            "doc_ids": job["doc_ids"],
+            "message": f"Successfully processed {len(summary['activities'])} places",
+        }
+    )
+
+
+# Upper bounds on ids per /places/batch and queries per /search/batch
+MAX_BATCH_IDS = 500
+MAX_BATCH_QUERIES = 50
+
+
+def _conditional_json(payload: Dict[str, Any]):
+    """JSON response with a strong ETag; 304 when If-None-Match matches.
+
+    The ETag is a hash of the response body, so it changes exactly when
+    the place data does and clients can revalidate without re-downloading.
+    """
+    response = jsonify(payload)
+    response.add_etag()
+    response.headers["Cache-Control"] = "no-cache"
+    etag, _ = response.get_etag()
+    if request.if_none_match.contains(etag):
+        response.status_code = 304
+        response.set_data(b"")
+    return response
+
+
+def _search_filters() -> dict:
+    """Structured genre/city/country filters from the query string."""
+    return {
+        key: request.args.get(key)
+        for key in ("genre", "city", "country")
+        if request.args.get(key)
+    }
+
+
 @app.route("/search")
 def search():
     """Search places in the database."""
     query = request.args.get("q", "")
-    search_type = request.args.get("type", "semantic")  # semantic, name, genre
+    # semantic, hybrid, name, genre
+    search_type = request.args.get("type", "semantic")
     limit = int(request.args.get("limit", 10))
+    filters = _search_filters()
 
     if not query:
         return jsonify({"error": "No search query provided"}), 400
@@ -171,8 +255,10 @@ def search():
             results = vector_store.search_by_place_name(query, limit)
         elif search_type == "genre":
             results = vector_store.search_by_genre(query, limit)
+        elif search_type == "hybrid":
+            results = vector_store.search_hybrid(query, limit, filters)
         else:
-            results = vector_store.search(query, limit)
+            results = vector_store.search(query, limit, filters)
 
         return jsonify(
             {"success": True, "results": results, "query": query, "count": len(results)}
@@ -182,11 +268,41 @@ def search():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/search/batch", methods=["POST"])
+def search_batch():
+    """Run many semantic searches in one request.
+
+    Body: {"queries": [...], "limit": 10, "filters": {genre, city, country}}.
+    Results are keyed by query text, so repeated queries are answered once.
+    """
+    data = request.get_json(silent=True) or {}
+    queries = data.get("queries")
+    if not isinstance(queries, list) or not queries:
+        return jsonify({"error": "No search queries provided"}), 400
+    queries = list(dict.fromkeys(str(q) for q in queries))
+    if len(queries) > MAX_BATCH_QUERIES:
+        return (
+            jsonify({"error": f"At most {MAX_BATCH_QUERIES} queries per request"}),
+            400,
+        )
+    filters = data.get("filters") or None
+    if filters is not None and not isinstance(filters, dict):
+        return jsonify({"error": "filters must be an object"}), 400
+
+    try:
+        results = vector_store.search_many(queries, int(data.get("limit", 10)), filters)
+        return jsonify({"success": True, "results": results, "count": len(results)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/stats")
 def get_stats():
     """Get database statistics."""
     try:
         stats = vector_store.get_stats()
+        stats["geocode_cache"] = get_geocode_cache().stats()
+        stats["jobs"] = job_queue.stats()
         return jsonify({"success": True, "stats": stats})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -194,45 +310,127 @@ def get_stats():
 
 @app.route("/places")
 def get_places():
-    """Get all places with pagination."""
+    """Get places newest first, by page number or by opaque cursor."""
     page = int(request.args.get("page", 1))
     per_page = int(request.args.get("per_page", 20))
     offset = (page - 1) * per_page
+    cursor = request.args.get("cursor") or None
+    genre = request.args.get("genre") or None
 
     try:
-        all_places = vector_store.get_all_places(limit=per_page)
-        total_count = vector_store.get_stats().get("total_places", 0)
+        result = vector_store.get_places_page(
+            limit=per_page, cursor=cursor, offset=offset, genre=genre
+        )
+        total_count = result["total"]
 
         return jsonify(
             {
                 "success": True,
-                "places": all_places,
+                "places": result["places"],
                 "pagination": {
                     "page": page,
                     "per_page": per_page,
                     "total": total_count,
                     "pages": (total_count + per_page - 1) // per_page,
+                    "next_cursor": result["next_cursor"],
                 },
             }
         )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/places/nearby")
+def get_places_nearby():
+    """Places within a radius of a point, or inside a map bounding box.
+
+    Either ``lat``/``lon`` (+ ``radius_km``) or
+    ``bbox=min_lat,min_lon,max_lat,max_lon``; an optional ``q`` ranks the
+    places in the area semantically.
+    """
+    query = request.args.get("q") or None
+    limit = int(request.args.get("limit", 50))
+
+    try:
+        if request.args.get("bbox"):
+            min_lat, min_lon, max_lat, max_lon = (
+                float(v) for v in request.args["bbox"].split(",")
+            )
+            results = vector_store.search_bbox(
+                min_lat, min_lon, max_lat, max_lon, query, limit, _search_filters()
+            )
+        elif request.args.get("lat") and request.args.get("lon"):
+            results = vector_store.search_nearby(
+                float(request.args["lat"]),
+                float(request.args["lon"]),
+                float(request.args.get("radius_km", 5)),
+                query,
+                limit,
+                _search_filters(),
+            )
+        else:
+            return jsonify({"error": "Provide lat and lon, or bbox"}), 400
+    except ValueError:
+        return jsonify({"error": "Invalid coordinates"}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+    return jsonify({"success": True, "results": results, "count": len(results)})
+
 
 @app.route("/place/<place_id>")
 def get_place(place_id):
     """Get specific place details."""
     try:
-        # This would need to be implemented in vector_store.py
-        # For now, return a placeholder
-        return jsonify(
-            {
-                "success": True,
-                "place": {"id": place_id, "message": "Place details endpoint"},
-            }
-        )
+        place = vector_store.get_place(place_id)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    if place is None:
+        return jsonify({"error": "Place not found"}), 404
+    return _conditional_json({"success": True, "place": place})
+
+
+@app.route("/places/batch", methods=["GET", "POST"])
+def get_places_batch():
+    """Many places by id in one round trip.
+
+    ``GET /places/batch?ids=a,b,c`` or ``POST {"ids": [...]}``; places come
+    back in the order asked and unknown ids are listed under ``missing``.
+    """
+    if request.method == "POST":
+        ids = (request.get_json(silent=True) or {}).get("ids") or []
+    else:
+        ids = [i for i in request.args.get("ids", "").split(",") if i]
+    if not isinstance(ids, list) or not all(isinstance(i, str) for i in ids):
+        return jsonify({"error": "ids must be a list of place ids"}), 400
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({"error": f"At most {MAX_BATCH_IDS} ids per request"}), 400
+
+    try:
+        places = vector_store.get_places_by_ids(ids)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    found = {place["id"] for place in places}
+    return _conditional_json(
+        {
+            "success": True,
+            "places": places,
+            "missing": [i for i in dict.fromkeys(ids) if i not in found],
+        }
+    )
+
+
+@app.route("/place/<place_id>/similar")
+def get_similar_places(place_id):
+    """Precomputed "more like this" places for one place, nearest first."""
+    limit = request.args.get("limit", type=int)
+    try:
+        results = vector_store.get_similar(place_id, limit)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    return jsonify({"success": True, "results": results, "count": len(results)})
 
 
 @app.route("/api/health")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Batch Backfill of LLM Parsing
+-------------------------------
+Re-extracts a whole corpus of fused video text through the OpenAI Batch API
+instead of one chat completion per video.
+
+Input is JSONL with one object per line:
+    {"id": "...", "text": "<fused speech/OCR/caption text>", "url": "optional"}
+
+Output is JSONL with the lean summary for each id.
+"""
+
+import argparse
+import json
+from typing import Dict, Any, List
+
+from agent import build_summary
+from llm_parser import parse_place_info_batch
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    """Read corpus records, skipping blank lines and entries without text."""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("id") and record.get("text"):
+                records.append(record)
+    return records
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Backfill LLM parsing via the Batch API")
+    ap.add_argument("corpus", help="JSONL file of {id, text, url} records")
+    ap.add_argument("--out", default="backfill_results.jsonl")
+    ap.add_argument(
+        "--chunk-size",
+        type=int,
+        default=50000,
+        help="Requests per batch job (default: 50000, the Batch API limit)",
+    )
+    ap.add_argument("--poll-interval", type=float, default=30.0)
+    ap.add_argument(
+        "--base-url", help="Alternate API root, e.g. a local stand-in server"
+    )
+    ap.add_argument(
+        "--store", action="store_true", help="Also store results in the vector database"
+    )
+    args = ap.parse_args()
+
+    records = load_corpus(args.corpus)
+    print(f"📚 Loaded {len(records)} records from {args.corpus}")
+
+    vector_store = None
+    if args.store:
+        from vector_store import VectorStore
+
+        vector_store = VectorStore()
+
+    with open(args.out, "w", encoding="utf-8") as out:
+        for start in range(0, len(records), args.chunk_size):
+            chunk = records[start : start + args.chunk_size]
+            texts = {r["id"]: r["text"] for r in chunk}
+            results = parse_place_info_batch(
+                texts, poll_interval=args.poll_interval, base_url=args.base_url
+            )
+
+            for record in chunk:
+                info = results[record["id"]]
+                summary = build_summary(info.dict())
+                if vector_store is not None and summary["activities"]:
+                    vector_store.store_results(summary, record.get("url"))
+                out.write(
+                    json.dumps(
+                        {
+                            "id": record["id"],
+                            "url": record.get("url"),
+                            "content_type": info.content_type,
+                            "result": summary,
+                        },
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+
+    print(f"✅ Wrote backfill results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Benchmark: Embedding Backend Query Latency and Recall Guard
+------------------------------------------------------------
+Reports p50/p99 single-query embedding latency (what /search pays per
+request) for the PyTorch fp32 backend and the int8 ONNX backend, and
+checks that the ONNX backend's top-k neighbours over a synthetic corpus
+match fp32's on a held-out query set. The measured recall is recorded in
+the export's embedder.json, and OnnxEmbedder refuses to load an export
+whose recorded recall is missing or below MIN_ONNX_RECALL; the script also
+exits non-zero when recall@k falls below --min-recall.
+
+    python3 embeddings.py export
+    python3 benchmarks/bench_embeddings.py --threads 4 --k 10 --min-recall 0.95
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_vector_store import synthetic_activities  # noqa: E402
+from embeddings import (  # noqa: E402
+    DEFAULT_MODEL,
+    DEFAULT_ONNX_DIR,
+    MIN_ONNX_RECALL,
+    OnnxEmbedder,
+    SentenceTransformerEmbedder,
+    recall_at_k,
+    record_recall,
+)
+from vector_store import VectorStore  # noqa: E402
+
+HELDOUT = Path(__file__).resolve().parent / "data" / "heldout_queries.txt"
+
+
+def latency(embed, queries: List[str], rounds: int) -> Dict[str, float]:
+    embed(queries[:1])  # warm up
+    samples = []
+    for _ in range(rounds):
+        for q in queries:
+            start = time.perf_counter()
+            embed([q])
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "p50": statistics.median(samples) * 1000,
+        "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Embedding backend benchmark")
+    ap.add_argument("--model", default=DEFAULT_MODEL)
+    ap.add_argument("--onnx-dir", default=DEFAULT_ONNX_DIR)
+    ap.add_argument("--threads", type=int, default=None, help="ONNX intra-op threads")
+    ap.add_argument("--docs", type=int, default=2000, help="Recall corpus size")
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--min-recall", type=float, default=MIN_ONNX_RECALL)
+    ap.add_argument("--rounds", type=int, default=5)
+    args = ap.parse_args()
+
+    queries = [q for q in HELDOUT.read_text().splitlines() if q.strip()]
+    corpus = [
+        VectorStore._create_document_text(a) for a in synthetic_activities(args.docs)
+    ]
+
+    fp32 = SentenceTransformerEmbedder(args.model)
+    # Not yet validated, so load without the recall check
+    int8 = OnnxEmbedder(args.onnx_dir, intra_op_threads=args.threads, min_recall=None)
+
+    print(f"📊 {len(queries)} held-out queries, {args.docs} corpus documents")
+    for name, embed in (("torch fp32", fp32), ("onnx int8", int8)):
+        r = latency(embed, queries, args.rounds)
+        print(f"   {name:<10} p50 {r['p50']:7.2f} ms   p99 {r['p99']:7.2f} ms")
+
+    recall = recall_at_k(fp32, int8, corpus, queries, args.k)
+    print(f"   recall@{args.k} (onnx int8 vs torch fp32): {recall:.3f}")
+    record_recall(args.onnx_dir, recall, args.k)
+    if recall < args.min_recall:
+        print(f"❌ Recall below {args.min_recall}; keep EMBEDDING_BACKEND=torch")
+        sys.exit(1)
+    print("✅ Recall guard passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark: Hybrid (BM25 + Vector) Search Latency
+-------------------------------------------------
+Builds a store of synthetic places and reports p50/p99 latency for vector,
+BM25-only and hybrid (reciprocal rank fusion) queries, plus the time to
+build the in-memory inverted index from the stored documents.
+
+By default a hashing embedder stands in for the sentence transformer so
+the lexical and fusion overhead is measured in isolation; pass --model to
+use the real embedding model.
+
+    python3 benchmarks/bench_hybrid_search.py --docs 100000 --queries 200
+"""
+
+import argparse
+import hashlib
+import math
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_vector_store import QUERIES, synthetic_activities  # noqa: E402
+from vector_store import VectorStore  # noqa: E402
+
+DISHES = ["birria", "pastrami", "ramen", "pho", "khachapuri", "cacio e pepe", "mole"]
+
+
+def hashing_embedder(dims: int = 64) -> Callable[[List[str]], List[List[float]]]:
+    """Cheap deterministic bag-of-words vectors (no model download)."""
+
+    def embed(texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            v = [0.0] * dims
+            for word in re.findall(r"\w+", text.lower()):
+                v[int(hashlib.md5(word.encode()).hexdigest(), 16) % dims] += 1.0
+            norm = math.sqrt(sum(x * x for x in v)) or 1.0
+            vectors.append([x / norm for x in v])
+        return vectors
+
+    embed.model_id = f"hashing-{dims}"
+    return embed
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "p50": statistics.median(ordered) * 1000,
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+    }
+
+
+def time_queries(fn: Callable[[str], object], queries: List[str]) -> Dict[str, float]:
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Hybrid search latency benchmark")
+    ap.add_argument("--docs", type=int, default=100_000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--limit", type=int, default=10)
+    ap.add_argument(
+        "--model", action="store_true", help="Use the sentence transformer embedder"
+    )
+    args = ap.parse_args()
+
+    rng = random.Random(11)
+    activities = synthetic_activities(args.docs)
+    for activity in activities:
+        activity["key_takeaways"].append(f"Get the {rng.choice(DISHES)}")
+    queries = [
+        f"{QUERIES[i % len(QUERIES)]} {rng.choice(DISHES)}" for i in range(args.queries)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = VectorStore(
+            persist_directory=tmp, embedder=None if args.model else hashing_embedder()
+        )
+        start = time.perf_counter()
+        for i in range(0, len(activities), 5000):
+            store.store_results({"activities": activities[i : i + 5000]})
+        ingest = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store._ensure_indexes()
+        index_build = time.perf_counter() - start
+
+        results = {
+            "vector": time_queries(lambda q: store.search(q, args.limit), queries),
+            "bm25": time_queries(
+                lambda q: store._lexical_index.search(q, args.limit), queries
+            ),
+            "hybrid": time_queries(
+                lambda q: store.search_hybrid(q, args.limit), queries
+            ),
+        }
+
+    print(f"📊 {args.docs} documents, {args.queries} queries, top {args.limit}")
+    print(f"   ingest {ingest:.1f}s, inverted index build {index_build:.1f}s")
+    for name, r in results.items():
+        print(f"   {name:<7} p50 {r['p50']:7.2f} ms   p99 {r['p99']:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Benchmark: Vector Store Ingest and Query Throughput
+----------------------------------------------------
+Compares the old path (Chroma's bundled default embedding function, fed
+through documents/query_texts) against VectorStore's explicit batched
+SentenceTransformer embeddings. Both run against throwaway directories.
+
+    python3 benchmarks/bench_vector_store.py --docs 2000 --queries 200
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import chromadb  # noqa: E402
+from chromadb.config import Settings  # noqa: E402
+
+from vector_store import VectorStore  # noqa: E402
+
+GENRES = ["restaurant", "cafe", "bar", "bakery", "museum", "park", "hotel", "hike"]
+CUISINES = ["Italian", "Japanese", "Mexican", "Thai", "French", "Korean", "Indian"]
+CITIES = ["New York", "Tokyo", "Paris", "Mexico City", "London", "Seoul", "Lisbon"]
+TIPS = [
+    "Go early to beat the line",
+    "Order the house special",
+    "Cash only",
+    "Great sunset views from the terrace",
+    "Reservations recommended on weekends",
+    "Try the seasonal tasting menu",
+    "Friendly staff and quick service",
+]
+QUERIES = [
+    "cozy coffee shop",
+    "romantic Italian dinner",
+    "best ramen in Tokyo",
+    "rooftop bar with views",
+    "family friendly park",
+    "spicy Korean food",
+    "quiet museum afternoon",
+]
+
+
+def synthetic_activities(n: int, seed: int = 7) -> List[Dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "place_name": f"Place {i}",
+            "genre": rng.choice(GENRES),
+            "category_detail": rng.choice(CUISINES),
+            "address": f"{rng.randint(1, 999)} Main St, {rng.choice(CITIES)}",
+            "key_takeaways": rng.sample(TIPS, 3),
+        }
+        for i in range(n)
+    ]
+
+
+def bench_default_ef(activities: List[Dict], queries: List[str]) -> Dict[str, float]:
+    """Old behaviour: Chroma embeds documents and query texts itself."""
+    with tempfile.TemporaryDirectory() as tmp:
+        client = chromadb.PersistentClient(
+            path=tmp, settings=Settings(anonymized_telemetry=False)
+        )
+        collection = client.get_or_create_collection(name="place_info")
+        helper = VectorStore.__new__(VectorStore)
+
+        start = time.perf_counter()
+        collection.add(
+            documents=[helper._create_document_text(a) for a in activities],
+            metadatas=[helper._create_metadata(a) for a in activities],
+            ids=[str(i) for i in range(len(activities))],
+        )
+        ingest = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for q in queries:
+            collection.query(query_texts=[q], n_results=5)
+        query = time.perf_counter() - start
+
+    return {
+        "ingest_per_s": len(activities) / ingest,
+        "query_per_s": len(queries) / query,
+    }
+
+
+def bench_explicit(activities: List[Dict], queries: List[str]) -> Dict[str, float]:
+    """New behaviour: one batched SentenceTransformer embedding function."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = VectorStore(persist_directory=tmp)
+
+        start = time.perf_counter()
+        store.store_results({"activities": activities})
+        ingest = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for q in queries:
+            store.search(q, 5)
+        query = time.perf_counter() - start
+
+    return {
+        "ingest_per_s": len(activities) / ingest,
+        "query_per_s": len(queries) / query,
+    }
+
+
+def bench_search_many(
+    activities: List[Dict], queries: List[str], batch: int = 50
+) -> Dict[str, float]:
+    """Batched queries: one embedding pass and one Chroma query per batch."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = VectorStore(persist_directory=tmp)
+
+        start = time.perf_counter()
+        store.store_results({"activities": activities})
+        ingest = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(0, len(queries), batch):
+            store.search_many(queries[i : i + batch], 5)
+        query = time.perf_counter() - start
+
+    return {
+        "ingest_per_s": len(activities) / ingest,
+        "query_per_s": len(queries) / query,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Vector store throughput benchmark")
+    ap.add_argument("--docs", type=int, default=2000)
+    ap.add_argument("--queries", type=int, default=200)
+    args = ap.parse_args()
+
+    activities = synthetic_activities(args.docs)
+    queries = [QUERIES[i % len(QUERIES)] + f" {i}" for i in range(args.queries)]
+
+    results = {
+        "chroma default EF": bench_default_ef(activities, queries),
+        "explicit batched": bench_explicit(activities, queries),
+        "search_many x50": bench_search_many(activities, queries),
+    }
+    print(f"📊 {args.docs} documents, {args.queries} queries")
+    for name, r in results.items():
+        print(
+            f"   {name:<18} ingest {r['ingest_per_s']:8.1f} docs/s   "
+            f"query {r['query_per_s']:7.1f} q/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
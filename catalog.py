@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""SQLite Catalog of Stored Places
+---------------------------------
+A small side database kept next to the Chroma files. It records one row per
+stored place (ingest time and the fields we aggregate on) and maintains
+exact counts by genre, city and country plus daily ingest counts, so stats
+are O(1) reads instead of scans over the collection.
+
+Every store/delete updates the catalog right after the Chroma write, in a
+single SQLite transaction (``BEGIN IMMEDIATE``) that also serializes
+writers across processes, and bumps a generation counter that caches and
+in-memory indexes compare against to detect writes made by any process.
+The two writes are not atomic together, so ``VectorStore`` rebuilds the
+catalog on open when its total no longer matches the collection.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Aggregated dimensions -> metadata field they are read from
+DIMENSIONS = {"genre": "genre", "city": "city", "country": "country"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    genre TEXT NOT NULL,
+    city TEXT NOT NULL,
+    country TEXT NOT NULL
+);
+-- Stable newest-first order for keyset pagination
+CREATE INDEX IF NOT EXISTS places_by_created ON places (created_at, id);
+CREATE INDEX IF NOT EXISTS places_by_genre
+    ON places (genre COLLATE NOCASE, created_at, id);
+CREATE TABLE IF NOT EXISTS counts (
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (dimension, value)
+);
+CREATE TABLE IF NOT EXISTS ingest_daily (
+    day TEXT PRIMARY KEY,
+    new_places INTEGER NOT NULL DEFAULT 0,
+    activities INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _dimension_values(metadata: Dict[str, Any]) -> Dict[str, str]:
+    values = {dim: metadata.get(field) or "" for dim, field in DIMENSIONS.items()}
+    values["genre"] = values["genre"] or "unknown"
+    return values
+
+
+class PlaceCatalog:
+    """Per-place rows plus incrementally maintained aggregates."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # Autocommit mode so BEGIN IMMEDIATE takes the cross-process write lock
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def _bump_generation(self):
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('generation', '1') "
+            "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def generation(self) -> int:
+        """Counter bumped by every store, delete and rebuild."""
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'generation'"
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def _transaction(self, fn, *args):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(*args)
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _bump(self, values: Dict[str, str], delta: int):
+        rows = [("total", "", delta)] + [
+            (dim, value, delta) for dim, value in values.items() if value
+        ]
+        self._conn.executemany(
+            "INSERT INTO counts (dimension, value, count) VALUES (?, ?, ?) "
+            "ON CONFLICT (dimension, value) DO UPDATE SET "
+            "count = count + excluded.count",
+            rows,
+        )
+
+    def _record_ingest(self, day: str, new_places: int, activities: int):
+        self._conn.execute(
+            "INSERT INTO ingest_daily (day, new_places, activities) VALUES (?, ?, ?) "
+            "ON CONFLICT (day) DO UPDATE SET "
+            "new_places = new_places + excluded.new_places, "
+            "activities = activities + excluded.activities",
+            (day, new_places, activities),
+        )
+
+    def _prune_counts(self):
+        self._conn.execute(
+            "DELETE FROM counts WHERE count <= 0 AND dimension != 'total'"
+        )
+
+    def _write_place(self, doc_id: str, created_at: str, values: Dict[str, str]):
+        self._conn.execute(
+            "INSERT INTO places (id, created_at, genre, city, country) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+            "genre = excluded.genre, city = excluded.city, "
+            "country = excluded.country",
+            (doc_id, created_at, values["genre"], values["city"], values["country"]),
+        )
+
+    def _upsert(
+        self, records: List[Tuple[str, Dict[str, Any]]], activities: int
+    ) -> int:
+        new_places = 0
+        for doc_id, metadata in records:
+            old = self._conn.execute(
+                "SELECT genre, city, country FROM places WHERE id = ?", (doc_id,)
+            ).fetchone()
+            if old is not None:
+                self._bump(dict(zip(DIMENSIONS, old)), -1)
+            else:
+                new_places += 1
+            values = _dimension_values(metadata)
+            self._bump(values, 1)
+            created_at = metadata.get("created_at") or datetime.now().isoformat()
+            self._write_place(doc_id, created_at, values)
+        self._record_ingest(datetime.now().date().isoformat(), new_places, activities)
+        self._prune_counts()
+        self._bump_generation()
+        return self.generation()
+
+    def _delete(self, ids: List[str]) -> int:
+        for doc_id in ids:
+            old = self._conn.execute(
+                "SELECT genre, city, country FROM places WHERE id = ?", (doc_id,)
+            ).fetchone()
+            if old is None:
+                continue
+            self._bump(dict(zip(DIMENSIONS, old)), -1)
+            self._conn.execute("DELETE FROM places WHERE id = ?", (doc_id,))
+        self._prune_counts()
+        self._bump_generation()
+        return self.generation()
+
+    def record_upsert(
+        self, records: List[Tuple[str, Dict[str, Any]]], activities: int = 0
+    ) -> int:
+        """Apply stored/updated places (id, metadata); returns the new generation."""
+        return self._transaction(self._upsert, records, activities)
+
+    def record_delete(self, ids: List[str]) -> int:
+        """Remove places from the aggregates; returns the new generation."""
+        return self._transaction(self._delete, ids)
+
+    def is_bootstrapped(self) -> bool:
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'bootstrapped'"
+        ).fetchone()
+        return row is not None
+
+    def rebuild(self, records: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Recompute everything from the stored records (backfill or repair)."""
+
+        def _rebuild():
+            for table in ("places", "counts", "ingest_daily"):
+                self._conn.execute(f"DELETE FROM {table}")
+            today = datetime.now().date().isoformat()
+            for doc_id, metadata in records:
+                created_at = (
+                    metadata.get("created_at") or metadata.get("timestamp") or today
+                )
+                values = _dimension_values(metadata)
+                self._bump(values, 1)
+                self._write_place(doc_id, created_at, values)
+                self._record_ingest(created_at[:10], 1, 1)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('bootstrapped', ?)",
+                (datetime.now().isoformat(),),
+            )
+            self._bump_generation()
+
+        self._transaction(_rebuild)
+
+    def total(self) -> int:
+        row = self._conn.execute(
+            "SELECT count FROM counts WHERE dimension = 'total' AND value = ''"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def count(self, genre: Optional[str] = None) -> int:
+        """Number of places, optionally of one genre (case-insensitive)."""
+        if not genre:
+            return self.total()
+        row = self._conn.execute(
+            "SELECT COALESCE(SUM(count), 0) FROM counts "
+            "WHERE dimension = 'genre' AND value = ? COLLATE NOCASE",
+            (genre,),
+        ).fetchone()
+        return row[0]
+
+    def page(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, str]] = None,
+        offset: int = 0,
+        genre: Optional[str] = None,
+    ) -> List[Tuple[str, str]]:
+        """(id, created_at) of places newest first.
+
+        ``after`` is the (created_at, id) of the last row of the previous
+        page; seeking past it costs the same on every page, unlike
+        ``offset``.
+        """
+        clauses, params = [], []
+        if genre:
+            clauses.append("genre = ? COLLATE NOCASE")
+            params.append(genre)
+        if after is not None:
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._conn.execute(
+            f"SELECT id, created_at FROM places {where} "
+            "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        ).fetchall()
+
+    def stats(self, days: int = 30) -> Dict[str, Any]:
+        """Exact totals, per-dimension distributions and recent daily ingest."""
+        distributions: Dict[str, Dict[str, int]] = {dim: {} for dim in DIMENSIONS}
+        total = 0
+        for dimension, value, count in self._conn.execute(
+            "SELECT dimension, value, count FROM counts ORDER BY count DESC"
+        ):
+            if dimension == "total":
+                total = count
+            elif dimension in distributions:
+                distributions[dimension][value] = count
+
+        ingest = [
+            {"day": day, "new_places": new_places, "activities": activities}
+            for day, new_places, activities in self._conn.execute(
+                "SELECT day, new_places, activities FROM ingest_daily "
+                "ORDER BY day DESC LIMIT ?",
+                (days,),
+            )
+        ]
+        return {
+            "total_places": total,
+            "genre_distribution": distributions["genre"],
+            "city_distribution": distributions["city"],
+            "country_distribution": distributions["country"],
+            "ingest_by_day": ingest[::-1],
+        }
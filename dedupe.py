@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Near-Duplicate Place Detection
+--------------------------------
+Heuristics deciding whether an incoming activity is a place we already
+store under a slightly different name ("Joe's Pizza" vs "Joes Pizza NYC").
+Candidates come from an ANN query over the stored embeddings; these checks
+only look at the handful of neighbours it returns.
+"""
+
+import json
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Any, Dict, Optional, Set
+
+from gazetteer import haversine_km, normalize_name
+
+# Squared L2 between normalized embeddings (0 = identical, 2 = orthogonal)
+MAX_EMBEDDING_DISTANCE = 0.6
+MIN_NAME_SIMILARITY = 0.85
+# Street-level coordinates further apart than this are different branches
+MAX_DISTANCE_KM = 0.5
+
+# Common spellings of the same country, by normalized name (the LLM writes
+# "USA" where the geocoder writes "United States")
+COUNTRY_ALIASES = {
+    "usa": "united states",
+    "us": "united states",
+    "u s a": "united states",
+    "u s": "united states",
+    "united states of america": "united states",
+    "uk": "united kingdom",
+    "u k": "united kingdom",
+    "great britain": "united kingdom",
+}
+
+
+def name_key(name: str) -> str:
+    """Name with accents and punctuation dropped ("Joe's Café" -> "joes cafe")."""
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", "", text.casefold())
+    return " ".join(text.split())
+
+
+def _tokens(key: str) -> Set[str]:
+    return set(key.split())
+
+
+def _numbers(tokens: Set[str]) -> Set[str]:
+    return {t for t in tokens if any(c.isdigit() for c in t)}
+
+
+def name_similarity(a: str, b: str) -> float:
+    """0..1 similarity of two place names.
+
+    The larger of character-level similarity and token containment, so a
+    name with an extra location suffix still matches ("joes pizza" is
+    contained in "joes pizza nyc"). Containment needs at least two shared
+    tokens, so a bare "pizza" does not match every pizzeria, and names with
+    different numbers ("pier 39" / "pier 38") never match.
+    """
+    a, b = name_key(a), name_key(b)
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    ta, tb = _tokens(a), _tokens(b)
+    if _numbers(ta) != _numbers(tb):
+        return 0.0
+    ratio = SequenceMatcher(None, a, b).ratio()
+    shared = ta & tb
+    containment = len(shared) / min(len(ta), len(tb)) if len(shared) >= 2 else 0.0
+    return max(ratio, containment)
+
+
+def _street_coords(record: Dict[str, Any]) -> Optional[tuple]:
+    lat, lon = record.get("lat"), record.get("lon")
+    if lat is None or lon is None:
+        return None
+    if (record.get("geo_precision") or "street") != "street":
+        return None
+    return float(lat), float(lon)
+
+
+def same_location(activity: Dict[str, Any], metadata: Dict[str, Any]) -> bool:
+    """Whether two records can be the same venue given what we know of where.
+
+    Countries must agree (up to COUNTRY_ALIASES) when both are known.
+    Street-level coordinates must then be within MAX_DISTANCE_KM; without
+    them on both sides the cities must be known on both sides and agree.
+    """
+    country_a = normalize_name(activity.get("country") or "")
+    country_b = metadata.get("country_norm") or normalize_name(
+        metadata.get("country") or ""
+    )
+    country_a = COUNTRY_ALIASES.get(country_a, country_a)
+    country_b = COUNTRY_ALIASES.get(country_b, country_b)
+    if country_a and country_b and country_a != country_b:
+        return False
+    a, b = _street_coords(activity), _street_coords(metadata)
+    if a and b:
+        return haversine_km(a[0], a[1], b[0], b[1]) <= MAX_DISTANCE_KM
+    city_a = normalize_name(activity.get("city") or "")
+    city_b = metadata.get("city_norm") or normalize_name(metadata.get("city") or "")
+    return bool(city_a) and city_a == city_b
+
+
+def is_near_duplicate(
+    activity: Dict[str, Any], metadata: Dict[str, Any], distance: Optional[float]
+) -> bool:
+    """Embedding, name and location checks for one ANN candidate."""
+    if distance is not None and distance > MAX_EMBEDDING_DISTANCE:
+        return False
+    names = [metadata.get("place_name") or ""]
+    try:
+        names += json.loads(metadata.get("aliases") or "[]")
+    except (TypeError, ValueError):
+        pass
+    similarity = max(
+        name_similarity(activity.get("place_name") or "", name) for name in names
+    )
+    return similarity >= MIN_NAME_SIMILARITY and same_location(activity, metadata)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""Embedding Backends for the Vector Store
+-----------------------------------------
+One explicit embedding function used for both ingest and queries, so the
+vector store never falls back to ChromaDB's bundled default model.
+
+Backends (selected with EMBEDDING_BACKEND):
+  • torch – SentenceTransformer in PyTorch (default)
+  • onnx  – int8-quantized ONNX export run on ONNX Runtime, for CPU serving.
+            Create it once with ``python3 embeddings.py export``, then
+            validate it with ``benchmarks/bench_embeddings.py``, which
+            records its recall@k against fp32; exports below
+            MIN_ONNX_RECALL (or never validated) refuse to load.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_ONNX_DIR = f"models/{DEFAULT_MODEL}-onnx"
+ONNX_MODEL_FILE = "model_int8.onnx"
+# Lowest recall@k vs fp32 an int8 export may have been measured at to serve
+MIN_ONNX_RECALL = 0.95
+
+
+class SentenceTransformerEmbedder:
+    """Batched embeddings from a SentenceTransformer model."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, batch_size: int = 64):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_id = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name)
+
+    def __call__(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed all texts in as few forward passes as the batch size allows."""
+        if not texts:
+            return []
+        vectors = self.model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return vectors.tolist()
+
+
+class OnnxEmbedder:
+    """Int8-quantized ONNX export of a sentence transformer on ONNX Runtime.
+
+    Reproduces the model's mean pooling and L2 normalization, so vectors
+    are interchangeable with SentenceTransformerEmbedder's within the
+    tolerance checked by the recall guard: the export must have a recorded
+    recall@k of at least ``min_recall`` (pass None to skip the check, as the
+    benchmark that measures it does).
+    """
+
+    def __init__(
+        self,
+        model_dir: str = DEFAULT_ONNX_DIR,
+        intra_op_threads: Optional[int] = None,
+        batch_size: int = 64,
+        min_recall: Optional[float] = MIN_ONNX_RECALL,
+    ):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_dir = Path(model_dir)
+        with open(model_dir / "embedder.json", "r") as f:
+            config = json.load(f)
+        if min_recall is not None:
+            recall = (config.get("recall") or {}).get("value")
+            if recall is None or recall < min_recall:
+                raise ValueError(
+                    f"ONNX export in {model_dir} has recall@k {recall} "
+                    f"(needs {min_recall}); run benchmarks/bench_embeddings.py "
+                    "or keep EMBEDDING_BACKEND=torch"
+                )
+        self.model_id = f"{config['model_id']}:onnx-int8"
+        self.max_length = config.get("max_length", 256)
+        self.batch_size = batch_size
+
+        options = ort.SessionOptions()
+        # One request at a time per session: spend the cores inside each op
+        options.intra_op_num_threads = intra_op_threads or os.cpu_count() or 1
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(model_dir / ONNX_MODEL_FILE),
+            options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._inputs = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+
+    def __call__(self, texts: Sequence[str]) -> List[List[float]]:
+        import numpy as np
+
+        vectors = []
+        texts = list(texts)
+        for start in range(0, len(texts), self.batch_size):
+            encoded = self.tokenizer(
+                texts[start : start + self.batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            feeds = {
+                name: value.astype(np.int64)
+                for name, value in encoded.items()
+                if name in self._inputs
+            }
+            hidden = self.session.run(None, feeds)[0]
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(
+                np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None
+            )
+            vectors.extend(pooled.tolist())
+        return vectors
+
+
+def export_onnx(
+    model_name: str = DEFAULT_MODEL,
+    out_dir: str = DEFAULT_ONNX_DIR,
+    max_length: int = 256,
+) -> Path:
+    """Export a SentenceTransformer to ONNX and quantize its weights to int8.
+
+    Needs torch, sentence-transformers, onnx and onnxruntime; serving the
+    result only needs onnxruntime and transformers' tokenizer.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer, tokenizer = model[0].auto_model.eval(), model.tokenizer
+    tokenizer.save_pretrained(str(out))
+
+    sample = tokenizer(["Place: Joe's Pizza | Genre: restaurant"], return_tensors="pt")
+    names = [
+        n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample
+    ]
+    axes = {name: {0: "batch", 1: "sequence"} for name in names + ["last_hidden_state"]}
+    fp32_path = out / "model.onnx"
+
+    # Positional wrapper so the export doesn't depend on forward()'s argument order
+    class _Encoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = transformer
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(names, inputs))).last_hidden_state
+
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder(),
+            tuple(sample[n] for n in names),
+            str(fp32_path),
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=axes,
+            opset_version=17,
+            dynamo=False,
+        )
+    quantize_dynamic(
+        str(fp32_path), str(out / ONNX_MODEL_FILE), weight_type=QuantType.QInt8
+    )
+
+    with open(out / "embedder.json", "w") as f:
+        json.dump({"model_id": model_name, "max_length": max_length}, f, indent=2)
+    return out
+
+
+def record_recall(model_dir: str, recall: float, k: int):
+    """Store an export's measured recall@k in its embedder.json."""
+    path = Path(model_dir) / "embedder.json"
+    with open(path, "r") as f:
+        config = json.load(f)
+    config["recall"] = {"k": k, "value": recall}
+    with open(path, "w") as f:
+        json.dump(config, f, indent=2)
+
+
+def make_embedder(backend: Optional[str] = None):
+    """Embedding backend chosen by argument or $EMBEDDING_BACKEND.
+
+    ``onnx`` reads the export from $EMBEDDING_ONNX_DIR and uses
+    $EMBEDDING_THREADS intra-op threads (default: all cores).
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND") or "torch").lower()
+    if backend == "onnx":
+        threads = os.getenv("EMBEDDING_THREADS")
+        return OnnxEmbedder(
+            os.getenv("EMBEDDING_ONNX_DIR", DEFAULT_ONNX_DIR),
+            intra_op_threads=int(threads) if threads else None,
+        )
+    if backend == "torch":
+        return SentenceTransformerEmbedder(os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL))
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def recall_at_k(
+    reference, candidate, corpus: Sequence[str], queries: Sequence[str], k: int = 10
+) -> float:
+    """Mean overlap of top-k corpus hits between two embedders (1.0 = identical).
+
+    ``reference`` is the trusted (fp32) embedder; each embedder ranks the
+    corpus against its own query vectors by dot product.
+    """
+    import numpy as np
+
+    def top_k(embed) -> "np.ndarray":
+        docs = np.asarray(embed(list(corpus)), dtype=np.float32)
+        qs = np.asarray(embed(list(queries)), dtype=np.float32)
+        return np.argsort(-(qs @ docs.T), axis=1)[:, :k]
+
+    expected, got = top_k(reference), top_k(candidate)
+    overlaps = [len(set(e) & set(g)) / k for e, g in zip(expected, got)]
+    return float(sum(overlaps) / len(overlaps)) if overlaps else 1.0
+
+
+class CachedEmbedder:
+    """Embedding cache keyed by (model id, text hash).
+
+    Hot texts (repeated searches) are served from an in-memory LRU; an
+    optional SQLite tier keeps vectors across processes and re-ingests.
+    Only texts missing from both tiers reach the wrapped embedder, in one
+    batch.
+    """
+
+    def __init__(self, inner, max_entries: int = 4096, disk_path: Optional[str] = None):
+        self.inner = inner
+        self.model_id = getattr(inner, "model_id", type(inner).__name__)
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, array]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._disk.commit()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_id}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: array):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def __call__(self, texts: Sequence[str]) -> List[List[float]]:
+        keys = [self._key(t) for t in texts]
+        found: Dict[str, array] = {}
+
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            memory_hits = sum(1 for k in keys if k in found)
+            self.memory_hits += memory_hits
+
+            pending = list({k for k in keys if k not in found})
+            if self._disk is not None and pending:
+                for start in range(0, len(pending), 500):
+                    chunk = pending[start : start + 500]
+                    rows = self._disk.execute(
+                        "SELECT key, vector FROM embeddings WHERE key IN (%s)"
+                        % ",".join("?" * len(chunk)),
+                        chunk,
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = array("f")
+                        vector.frombytes(blob)
+                        found[key] = vector
+                        self._remember(key, vector)
+                self.disk_hits += sum(1 for k in keys if k in found) - memory_hits
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+
+        if missing:
+            vectors = self.inner(list(missing.values()))
+            computed = {
+                key: array("f", vector) for key, vector in zip(missing, vectors)
+            }
+            with self._lock:
+                self.misses += sum(1 for k in keys if k in missing)
+                for key, vector in computed.items():
+                    self._remember(key, vector)
+                if self._disk is not None:
+                    self._disk.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                        [(k, v.tobytes()) for k, v in computed.items()],
+                    )
+                    self._disk.commit()
+            found.update(computed)
+
+        return [found[key].tolist() for key in keys]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "model_id": self.model_id,
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (
+                (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+            ),
+        }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Embedding backend tools")
+    sub = ap.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Export an int8 ONNX model")
+    export.add_argument("--model", default=DEFAULT_MODEL)
+    export.add_argument("--out", default=DEFAULT_ONNX_DIR)
+    export.add_argument("--max-length", type=int, default=256)
+    args = ap.parse_args()
+
+    if args.command == "export":
+        out = export_onnx(args.model, args.out, args.max_length)
+        print(f"✅ Exported int8 ONNX model to {out}")
+        print(
+            "   Validate it before serving (it won't load until then): "
+            "python3 benchmarks/bench_embeddings.py"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,44 @@
-import subprocess, os, pathlib, cv2, pytesseract, torch, googlemaps
+import subprocess, os, pathlib, threading, cv2, pytesseract, torch, googlemaps
+import requests
 import whisperx
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 from tqdm import tqdm
 from yt_dlp import YoutubeDL
 
+from gazetteer import Gazetteer, haversine_km
+from geocache import DAY, GeocodeCache, normalize_query
+from ratelimit import call_limited
+
 
 # ---------- Download ----------
 def fetch_clip(url: str, out_path: pathlib.Path):
     """Download video via yt‑dlp (supports IG, TikTok, YT)."""
     cmd = ["yt-dlp", "-f", "mp4", "-o", str(out_path), url]
-    subprocess.run(cmd, check=True)
+    call_limited("ytdlp", subprocess.run, cmd, check=True)
 
 
 # ---------- Speech ----------
+_whisper_model = None
+_whisper_model_lock = threading.Lock()
+
+
+def get_whisper_model():
+    """Return the process-wide whisper model, loading it on first use."""
+    global _whisper_model
+    with _whisper_model_lock:
+        if _whisper_model is None:
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            _whisper_model = whisperx.load_model(
+                "large-v2",  # or "medium" / "small" for faster
+                device=device,
+                compute_type="float32",  # or "int8"
+            )
+        return _whisper_model
+
+
 def whisper_transcribe(video_path: pathlib.Path) -> str:
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    model = whisperx.load_model(
-        "large-v2",  # or "medium" / "small" for faster
-        device=device,
-        compute_type="float32",  # or "int8"
-    )
+    model = get_whisper_model()
     result = model.transcribe(str(video_path))
     return " ".join(seg["text"] for seg in result["segments"])
 
@@ -50,14 +70,136 @@ def ocr_frames(video_path: pathlib.Path) -> str:
 
 
 # ---------- Geocode (Updated) ----------
-def geocode_place(place_name: str, genre: str = None, extra_hint: str = None):
-    """Geocode a place using Google Maps API with optional genre and extra search hint."""
-    key = os.getenv("GOOGLE_API_KEY")
-    if not key:
-        print("❗ No GOOGLE_API_KEY found in environment.")
+GEOCODE_MAX_WORKERS = int(os.getenv("GEOCODE_MAX_WORKERS", "8"))
+
+_geocode_cache = None
+_geocode_cache_lock = threading.Lock()
+_maps_client = None
+_maps_client_lock = threading.Lock()
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+# Genres that need the Places API even when the name matches a city
+VENUE_GENRES = {
+    "restaurant",
+    "cafe",
+    "bar",
+    "bakery",
+    "museum",
+    "hotel",
+    "shopping",
+    "nightlife",
+    "wellness",
+}
+# A non-venue place matched by name must lie this close to a city hint
+AREA_HINT_MAX_KM = 50.0
+
+
+def get_geocode_cache() -> GeocodeCache:
+    """Return the process-wide geocode cache, opening it on first use."""
+    global _geocode_cache
+    with _geocode_cache_lock:
+        if _geocode_cache is None:
+            _geocode_cache = GeocodeCache(
+                path=os.getenv("GEOCODE_CACHE_PATH", "geocode_cache.sqlite"),
+                ttl=float(os.getenv("GEOCODE_CACHE_TTL_DAYS", "30")) * DAY,
+                negative_ttl=float(os.getenv("GEOCODE_NEGATIVE_TTL_DAYS", "1")) * DAY,
+            )
+        return _geocode_cache
+
+
+def get_maps_client() -> Optional[googlemaps.Client]:
+    """Return one shared, connection-pooled Maps client (None without a key)."""
+    global _maps_client
+    with _maps_client_lock:
+        if _maps_client is None:
+            key = os.getenv("GOOGLE_API_KEY")
+            if not key:
+                return None
+            _maps_client = googlemaps.Client(key)
+            # Let every geocoding worker keep its own keep-alive connection
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=GEOCODE_MAX_WORKERS, pool_maxsize=GEOCODE_MAX_WORKERS
+            )
+            _maps_client.session.mount("https://", adapter)
+        return _maps_client
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """Return the offline gazetteer from GEONAMES_PATH (None if not configured)."""
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            path = os.getenv("GEONAMES_PATH")
+            if not path or not os.path.exists(path):
+                return None
+            _gazetteer = Gazetteer.load(
+                path, min_population=int(os.getenv("GEONAMES_MIN_POPULATION", "0"))
+            )
+            print(f"🗺️ Loaded offline gazetteer with {len(_gazetteer)} places")
+        return _gazetteer
+
+
+def _offline_geocode(hint: Optional[str]) -> Dict[str, Any]:
+    """City/region/country-level fallback from the local gazetteer."""
+    gazetteer = get_gazetteer()
+    if gazetteer is None or not hint:
         return {}
+    return gazetteer.lookup(hint)
+
+
+def _hinted_area(
+    gazetteer: Gazetteer, place_name: str, hint: Optional[str]
+) -> Dict[str, Any]:
+    """``place_name`` as a gazetteer city/area that agrees with ``hint``.
 
-    gm = googlemaps.Client(key)
+    "Hyde Park" with hint "London" must not resolve to the most populous
+    Hyde Park elsewhere: the match has to be in the hint's country and,
+    when the hint is a city, within AREA_HINT_MAX_KM of it.
+    """
+    near = gazetteer.lookup(hint) if hint else {}
+    area = gazetteer.area(place_name, country=near.get("country"))
+    if not area or not near or near.get("precision") != "city":
+        return area
+    if area["precision"] == "country":
+        return area
+    km = haversine_km(area["lat"], area["lon"], near["lat"], near["lon"])
+    return area if km <= AREA_HINT_MAX_KM else {}
+
+
+def geocode_place(
+    place_name: str,
+    genre: str = None,
+    extra_hint: str = None,
+    precision: str = "street",
+):
+    """Geocode a place using Google Maps API with optional genre and extra search hint.
+
+    With ``precision="city"``, or when the place itself is a city/region in the
+    offline gazetteer, only the gazetteer is consulted. Street-level lookups
+    fall back to it when there is no API key or the Places API fails.
+    Gazetteer results carry ``precision`` "city" or "country".
+    """
+    gazetteer = get_gazetteer()
+    if precision == "city":
+        return _offline_geocode(extra_hint or place_name)
+    is_venue = (genre or "").lower() in VENUE_GENRES
+    if gazetteer is not None and not is_venue and "," not in place_name:
+        # The "place" is itself a city/region/country ("Bali", "Kyoto")
+        area = _hinted_area(gazetteer, place_name, extra_hint)
+        if area:
+            return area
+
+    cache = get_geocode_cache()
+    cache_key = normalize_query(place_name, genre, extra_hint)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    gm = get_maps_client()
+    if gm is None:
+        print("❗ No GOOGLE_API_KEY found in environment.")
+        return _offline_geocode(extra_hint)
 
     query_parts = [place_name]
     if genre:
@@ -68,22 +210,81 @@ def geocode_place(place_name: str, genre: str = None, extra_hint: str = None):
     query = " ".join(query_parts)
 
     try:
-        res = gm.places(query)
+        res = call_limited("google_places", gm.places, query, coalesce_key=query)
     except Exception as e:
+        # Transient failures (including exhausted quota) are not cached
         print(f"❌ Geocoding error for {place_name}: {e}")
-        return {}
+        return _offline_geocode(extra_hint)
 
     if not res.get("results"):
+        cache.put(cache_key, {})
         return {}
 
     best = res["results"][0]
     loc = best["geometry"]["location"]
 
-    return {
+    result = {
         "display_address": best.get("formatted_address"),
         "lat": loc["lat"],
         "lon": loc["lng"],
+        "precision": "street",
     }
+    if gazetteer is not None:
+        # Places text search has no structured city/country; fill from nearby
+        area = gazetteer.nearest(result["lat"], result["lon"])
+        for field in ("city", "state", "country"):
+            if area.get(field):
+                result[field] = area[field]
+    cache.put(cache_key, result)
+    return result
+
+
+class ConcurrentGeocoder:
+    """Geocode many places with bounded parallelism on the shared client.
+
+    Identical queries (after normalization) submitted during the geocoder's
+    lifetime share one lookup, so a compilation costs as much as its slowest
+    distinct place rather than the sum of all of them.
+    """
+
+    def __init__(self, max_workers: int = GEOCODE_MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="geocode"
+        )
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self, place_name: str, genre: str = None, extra_hint: str = None
+    ) -> Future:
+        key = normalize_query(place_name, genre, extra_hint)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._executor.submit(
+                    geocode_place, place_name, genre, extra_hint
+                )
+                self._futures[key] = future
+            return future
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def geocode_many(
+    queries: List[Tuple[str, Optional[str], Optional[str]]],
+    max_workers: int = GEOCODE_MAX_WORKERS,
+) -> List[Dict[str, Any]]:
+    """Geocode (place_name, genre, extra_hint) tuples concurrently, in order."""
+    with ConcurrentGeocoder(max_workers=max_workers) as geocoder:
+        futures = [geocoder.submit(*query) for query in queries]
+        return [future.result() for future in futures]
 
 
 # ---------- Captions ----------
@@ -96,6 +297,8 @@ def fetch_caption(url: str) -> str:
         "forcejson": True,  # return info-dict
     }
     with YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url, download=False)
+        info = call_limited(
+            "ytdlp", ydl.extract_info, url, download=False, coalesce_key=url
+        )
         desc = info.get("description") or ""
         return desc
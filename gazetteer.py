@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""Offline Gazetteer Geocoder
+----------------------------
+Resolves city / region / country hints to coordinates without any network
+calls, using a GeoNames-style dump (e.g. cities15000.txt from
+https://download.geonames.org/export/dump/).
+
+Names are kept in a sorted array searched with bisect, which works as a
+compact prefix index, and coordinates are bucketed into a 1°x1° grid for
+nearest-place (reverse) lookups. Optional admin1CodesASCII.txt and
+countryInfo.txt files next to the dump supply readable state and country
+names.
+"""
+
+import bisect
+import math
+import re
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# GeoNames main dump columns
+_NAME, _ASCII, _ALTERNATES, _LAT, _LON = 1, 2, 3, 4, 5
+_FEATURE_CLASS, _FEATURE_CODE = 6, 7
+_COUNTRY, _ADMIN1, _POPULATION = 8, 10, 14
+
+# Populated-place codes that are not a city or town in their own right
+# (neighbourhoods such as "Chinatown", historical/abandoned/destroyed places)
+_NON_AREA_CODES = {"PPLX", "PPLH", "PPLQ", "PPLW", "PPLCH"}
+
+
+def normalize_name(text: str) -> str:
+    """Casefold, strip accents and punctuation so "Zürich" == "zurich"."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", " ", text.casefold())
+    return " ".join(text.split())
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points, in kilometres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+class Gazetteer:
+    """In-memory place index built from a GeoNames dump."""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.country_codes: List[str] = []
+        self.admin1: List[str] = []
+        # "<feature class>.<feature code>", e.g. "P.PPLA" or "S.MUS"
+        self.features: List[str] = []
+        self.lats = array("d")
+        self.lons = array("d")
+        self.populations = array("q")
+
+        # Sorted (normalized name, place index) pairs for exact/prefix search
+        self._keys: List[str] = []
+        self._key_ids = array("l")
+        # (floor(lat), floor(lon)) -> place indices
+        self._grid: Dict[Tuple[int, int], array] = {}
+
+        self.admin1_names: Dict[str, str] = {}
+        self.country_names: Dict[str, str] = {}
+        # normalized country name / ISO code -> country code
+        self._countries: Dict[str, str] = {}
+        # country code -> place index of its capital
+        self._capitals: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def load(
+        cls, path: str, min_population: int = 0, alternate_names: bool = True
+    ) -> "Gazetteer":
+        """Load a GeoNames dump plus any admin1/country files beside it."""
+        path = Path(path)
+        gaz = cls()
+        pairs: List[Tuple[str, int]] = []
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                cols = line.rstrip("\n").split("\t")
+                if len(cols) <= _POPULATION:
+                    continue
+                population = int(cols[_POPULATION] or 0)
+                if population < min_population:
+                    continue
+
+                idx = len(gaz.names)
+                lat, lon = float(cols[_LAT]), float(cols[_LON])
+                gaz.names.append(cols[_NAME])
+                gaz.country_codes.append(cols[_COUNTRY])
+                gaz.admin1.append(cols[_ADMIN1])
+                gaz.features.append(f"{cols[_FEATURE_CLASS]}.{cols[_FEATURE_CODE]}")
+                gaz.lats.append(lat)
+                gaz.lons.append(lon)
+                gaz.populations.append(population)
+                gaz._grid.setdefault(
+                    (math.floor(lat), math.floor(lon)), array("l")
+                ).append(idx)
+
+                names = {normalize_name(cols[_NAME]), normalize_name(cols[_ASCII])}
+                if alternate_names and cols[_ALTERNATES]:
+                    names.update(
+                        normalize_name(n) for n in cols[_ALTERNATES].split(",")
+                    )
+                pairs.extend((n, idx) for n in names if n)
+
+        pairs.sort()
+        gaz._keys = [name for name, _ in pairs]
+        gaz._key_ids = array("l", (idx for _, idx in pairs))
+
+        admin1_path = path.parent / "admin1CodesASCII.txt"
+        if admin1_path.exists():
+            with open(admin1_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    cols = line.rstrip("\n").split("\t")
+                    if len(cols) >= 2:
+                        gaz.admin1_names[cols[0]] = cols[1]
+
+        country_path = path.parent / "countryInfo.txt"
+        if country_path.exists():
+            gaz._load_countries(country_path)
+
+        return gaz
+
+    def _load_countries(self, path: Path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#"):
+                    continue
+                cols = line.rstrip("\n").split("\t")
+                if len(cols) < 6:
+                    continue
+                code, name, capital = cols[0], cols[4], cols[5]
+                self.country_names[code] = name
+                for idx in self._ids_for(normalize_name(capital)):
+                    if self.country_codes[idx] == code:
+                        self._capitals[code] = idx
+                        break
+                for key in (name, code, cols[1]):
+                    self._countries[normalize_name(key)] = code
+
+    def _ids_for(self, key: str) -> List[int]:
+        lo = bisect.bisect_left(self._keys, key)
+        hi = bisect.bisect_right(self._keys, key, lo)
+        return list(self._key_ids[lo:hi])
+
+    def _result(self, idx: int, precision: str = "city") -> Dict[str, Any]:
+        code = self.country_codes[idx]
+        state = self.admin1_names.get(f"{code}.{self.admin1[idx]}", "")
+        country = self.country_names.get(code, code)
+        return {
+            "display_address": ", ".join(
+                p for p in (self.names[idx], state, country) if p
+            ),
+            "lat": self.lats[idx],
+            "lon": self.lons[idx],
+            "city": self.names[idx],
+            "state": state,
+            "country": country,
+            "precision": precision,
+        }
+
+    def lookup(self, hint: str, country: Optional[str] = None) -> Dict[str, Any]:
+        """Resolve a city/region/country hint; the most populous match wins.
+
+        Comma-separated hints ("Shibuya, Tokyo, Japan") are tried part by
+        part, and a trailing country narrows the city candidates.
+        """
+        parts = [normalize_name(p) for p in (hint or "").split(",")]
+        parts = [p for p in parts if p]
+        if not parts:
+            return {}
+
+        country_code = None
+        for key in [normalize_name(country or "")] + parts[::-1]:
+            if key in self._countries:
+                country_code = self._countries[key]
+                break
+
+        for part in parts:
+            ids = self._ids_for(part)
+            if country_code:
+                ids = [i for i in ids if self.country_codes[i] == country_code]
+            if ids:
+                return self._result(max(ids, key=lambda i: self.populations[i]))
+
+        return self._country_result(country_code)
+
+    def _country_result(self, country_code: Optional[str]) -> Dict[str, Any]:
+        capital = self._capitals.get(country_code, -1)
+        if capital < 0:
+            return {}
+        result = self._result(capital, precision="country")
+        result["city"] = result["state"] = ""
+        result["display_address"] = result["country"]
+        return result
+
+    def _is_area(self, idx: int) -> bool:
+        """Whether a row is an admin area or a city/town (not a landmark)."""
+        feature_class, _, code = self.features[idx].partition(".")
+        return feature_class == "A" or (
+            feature_class == "P" and code not in _NON_AREA_CODES
+        )
+
+    def area(self, name: str, country: Optional[str] = None) -> Dict[str, Any]:
+        """``name`` as a whole country, city or admin area, else {}.
+
+        Unlike ``lookup`` there is no fallback: neighbourhoods, parks and
+        landmarks that share a city's index never match, and ``country``
+        (a name or ISO code) must contain the match when given.
+        """
+        key = normalize_name(name)
+        if not key:
+            return {}
+        wanted = normalize_name(country or "")
+        wanted_code = self._countries.get(wanted)
+
+        def in_country(code: str) -> bool:
+            if not wanted:
+                return True
+            return code == wanted_code or wanted in (
+                normalize_name(code),
+                normalize_name(self.country_names.get(code, "")),
+            )
+
+        code = self._countries.get(key)
+        if code and in_country(code):
+            return self._country_result(code)
+        ids = [
+            i
+            for i in self._ids_for(key)
+            if self._is_area(i) and in_country(self.country_codes[i])
+        ]
+        if not ids:
+            return {}
+        return self._result(max(ids, key=lambda i: self.populations[i]))
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Places whose name starts with ``prefix``, most populous first."""
+        key = normalize_name(prefix)
+        if not key:
+            return []
+        lo = bisect.bisect_left(self._keys, key)
+        hi = bisect.bisect_left(self._keys, key + "\uffff", lo)
+        ids = set(self._key_ids[lo:hi])
+        best = sorted(ids, key=lambda i: -self.populations[i])[:limit]
+        return [self._result(i) for i in best]
+
+    def nearest(self, lat: float, lon: float, max_km: float = 50.0) -> Dict[str, Any]:
+        """Closest indexed place to a coordinate, searching outward by grid ring."""
+        cell_lat, cell_lon = math.floor(lat), math.floor(lon)
+        # A degree of longitude shrinks with latitude; use it as the ring width
+        km_per_ring = 111.0 * max(math.cos(math.radians(lat)), 0.01)
+        best, best_km = -1, max_km
+        for ring in range(min(int(max_km / km_per_ring) + 2, 181)):
+            for dlat in range(-ring, ring + 1):
+                for dlon in range(-ring, ring + 1):
+                    if max(abs(dlat), abs(dlon)) != ring:
+                        continue
+                    for idx in self._grid.get((cell_lat + dlat, cell_lon + dlon), ()):
+                        km = haversine_km(lat, lon, self.lats[idx], self.lons[idx])
+                        if km < best_km:
+                            best, best_km = idx, km
+            # Everything in the next ring is at least this far away
+            if best >= 0 and ring * km_per_ring > best_km:
+                break
+        return self._result(best) if best >= 0 else {}
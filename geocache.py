@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Persistent Geocode Cache
+--------------------------
+SQLite-backed cache for Google Places lookups keyed by the normalized
+(place_name, genre, extra_hint) query. Successful results and "no result"
+answers are both cached, with a shorter TTL for the negative entries.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DAY = 24 * 60 * 60
+
+
+def normalize_query(
+    place_name: str, genre: Optional[str] = None, extra_hint: Optional[str] = None
+) -> str:
+    """Build a cache key that ignores case, punctuation and spacing."""
+    parts = []
+    for part in (place_name, genre, extra_hint):
+        text = unicodedata.normalize("NFKC", part or "").casefold()
+        text = re.sub(r"[^\w\s]", "", text)
+        parts.append(" ".join(text.split()))
+    return "|".join(parts)
+
+
+class GeocodeCache:
+    """Thread-safe SQLite cache of geocode results with TTL and hit metrics."""
+
+    def __init__(
+        self,
+        path: str = "geocode_cache.sqlite",
+        ttl: float = 30 * DAY,
+        negative_ttl: float = 1 * DAY,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS geocode (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result ({} for a cached miss) or None if absent."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, expires_at FROM geocode WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < time.time():
+                self.misses += 1
+                return None
+            result = json.loads(row[0])
+            if result:
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+            return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a result; an empty dict records that the query found nothing."""
+        ttl = self.ttl if result else self.negative_ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (key, result, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, json.dumps(result), time.time() + ttl),
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM geocode WHERE expires_at < ?", (time.time(),)
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics for this process plus the current cache size."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Geohash Encoding and Cell Coverage
+------------------------------------
+Places store their geohash prefixes as metadata, so a radius or bounding
+box query becomes an exact-match ``$in`` filter over a handful of cells
+that Chroma evaluates before any vector ranking.
+"""
+
+import math
+from typing import List, Tuple
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Prefix lengths stored on every place (gh1 ... gh6)
+INDEXED_PRECISIONS = range(1, 7)
+MAX_COVER_CELLS = 64
+
+
+def encode(lat: float, lon: float, precision: int = 9) -> str:
+    """Standard base32 geohash of a coordinate."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                bits, lon_lo = bits * 2 + 1, mid
+            else:
+                bits, lon_hi = bits * 2, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                bits, lat_lo = bits * 2 + 1, mid
+            else:
+                bits, lat_hi = bits * 2, mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def bounds(cell: str) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) covered by a geohash cell."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+    for char in cell:
+        bits = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (bits >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(height, width) in degrees of a cell at this precision."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 - lon_bits
+    return 180.0 / 2**lat_bits, 360.0 / 2**lon_bits
+
+
+def cover_bbox(
+    min_lat: float, min_lon: float, max_lat: float, max_lon: float, precision: int
+) -> List[str]:
+    """Geohash cells at ``precision`` that together cover a bounding box."""
+    height, width = cell_size(precision)
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+    cells = []
+    # Step from the cell containing the min corner, one cell at a time
+    lat = math.floor((min_lat + 90.0) / height) * height - 90.0
+    while lat <= max_lat:
+        lon = math.floor((min_lon + 180.0) / width) * width - 180.0
+        while lon <= max_lon:
+            wrapped = (lon + 180.0) % 360.0 - 180.0
+            cells.append(
+                encode(min(lat + height / 2, 90.0), wrapped + width / 2, precision)
+            )
+            lon += width
+        lat += height
+    return sorted(set(cells))
+
+
+def best_cover(
+    min_lat: float, min_lon: float, max_lat: float, max_lon: float
+) -> Tuple[int, List[str]]:
+    """Finest indexed precision whose cover stays within MAX_COVER_CELLS."""
+    for precision in reversed(INDEXED_PRECISIONS):
+        height, width = cell_size(precision)
+        estimate = (math.ceil((max_lat - min_lat) / height) + 1) * (
+            math.ceil((max_lon - min_lon) / width) + 1
+        )
+        if estimate <= MAX_COVER_CELLS:
+            return precision, cover_bbox(min_lat, min_lon, max_lat, max_lon, precision)
+    precision = INDEXED_PRECISIONS[0]
+    return precision, cover_bbox(min_lat, min_lon, max_lat, max_lon, precision)
+
+
+def radius_bbox(lat: float, lon: float, radius_km: float) -> Tuple[float, ...]:
+    """Bounding box (min_lat, min_lon, max_lat, max_lon) around a circle."""
+    dlat = radius_km / 111.0
+    dlon = radius_km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lon - min(dlon, 180.0), lat + dlat, lon + min(dlon, 180.0)
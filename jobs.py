@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""Background Extraction Jobs
+----------------------------
+/process-url and /upload enqueue a job in a SQLite-backed queue and return
+its id at once; a pool of warm worker processes (models loaded once per
+process) runs the extraction pipeline, and a single storer thread in the
+web process writes finished summaries to the vector store. Chroma's
+persistent client is not safe to write from several processes, so only
+extraction is fanned out.
+
+Job lifecycle: queued -> running -> extracted -> done, or failed. Jobs left
+running by a worker that died, or running longer than JOB_TIMEOUT (their
+worker is stopped), are requeued up to MAX_ATTEMPTS times.
+"""
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MAX_ATTEMPTS = 2
+# Seconds a job may run before its worker is presumed hung
+JOB_TIMEOUT = 30 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,             -- 'url' or 'upload'
+    source TEXT NOT NULL,           -- URL, or path of the uploaded file
+    label TEXT NOT NULL,            -- source_url recorded with stored places
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker INTEGER,
+    summary TEXT,
+    doc_ids TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+"""
+
+_COLUMNS = (
+    "id",
+    "kind",
+    "source",
+    "label",
+    "status",
+    "attempts",
+    "worker",
+    "summary",
+    "doc_ids",
+    "error",
+    "created_at",
+    "started_at",
+    "finished_at",
+)
+_FIELDS = ", ".join(_COLUMNS)
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+class JobQueue:
+    """Persistent job table shared by the web process and the workers."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def _transaction(self, fn, *args):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(*args)
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _row(self, row) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(zip(_COLUMNS, row))
+        job["summary"] = json.loads(job["summary"]) if job["summary"] else None
+        job["doc_ids"] = json.loads(job["doc_ids"]) if job["doc_ids"] else None
+        return job
+
+    def submit(self, kind: str, source: str, label: str) -> str:
+        """Queue a job; returns its id."""
+        job_id = uuid.uuid4().hex
+        self._transaction(
+            self._conn.execute,
+            "INSERT INTO jobs (id, kind, source, label, status, created_at) "
+            "VALUES (?, ?, ?, ?, 'queued', ?)",
+            (job_id, kind, source, label, _now()),
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            f"SELECT {_FIELDS} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return self._row(row)
+
+    def _claim(self, status: str, new_status: str, worker: Optional[int]):
+        row = self._conn.execute(
+            f"SELECT {_FIELDS} FROM jobs WHERE status = ? "
+            "ORDER BY created_at, rowid LIMIT 1",
+            (status,),
+        ).fetchone()
+        if row is None:
+            return None
+        job = self._row(row)
+        if new_status == "running":
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, "
+                "attempts = attempts + 1, started_at = ? WHERE id = ?",
+                (worker, _now(), job["id"]),
+            )
+        else:
+            self._conn.execute(
+                "UPDATE jobs SET status = ? WHERE id = ?", (new_status, job["id"])
+            )
+        return job
+
+    def claim(self, worker: int) -> Optional[Dict[str, Any]]:
+        """Take the oldest queued job for extraction."""
+        return self._transaction(self._claim, "queued", "running", worker)
+
+    def claim_extracted(self) -> Optional[Dict[str, Any]]:
+        """Take the oldest extracted job for storing."""
+        return self._transaction(self._claim, "extracted", "storing", None)
+
+    def _update(self, job_id: str, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self._transaction(
+            self._conn.execute,
+            f"UPDATE jobs SET {assignments} WHERE id = ?",
+            (*fields.values(), job_id),
+        )
+
+    def extracted(self, job_id: str, summary: Dict[str, Any]):
+        self._update(job_id, status="extracted", summary=json.dumps(summary))
+
+    def done(self, job_id: str, doc_ids: List[str]):
+        self._update(
+            job_id, status="done", doc_ids=json.dumps(doc_ids), finished_at=_now()
+        )
+
+    def failed(self, job_id: str, error: str):
+        self._update(job_id, status="failed", error=error, finished_at=_now())
+
+    def _recover(
+        self, workers: Optional[List[int]], timeout: Optional[float]
+    ) -> Tuple[int, List[str]]:
+        """Requeue jobs whose worker is gone or that ran past ``timeout``.
+
+        All running jobs are interrupted if ``workers`` is None. Returns the
+        number requeued and the uploads of jobs failed for good.
+        """
+        conditions, params = [], []
+        if workers:
+            conditions.append(f"worker IN ({','.join('?' * len(workers))})")
+            params.extend(workers)
+        if timeout is not None:
+            conditions.append("started_at < ?")
+            params.append((datetime.now() - timedelta(seconds=timeout)).isoformat())
+        if workers is None:
+            clause = ""
+        elif conditions:
+            clause = f" AND ({' OR '.join(conditions)})"
+        else:
+            return 0, []
+
+        exhausted = f"status = 'running' AND attempts >= ?{clause}"
+        uploads = [
+            row[0]
+            for row in self._conn.execute(
+                f"SELECT source FROM jobs WHERE kind = 'upload' AND {exhausted}",
+                (MAX_ATTEMPTS, *params),
+            )
+        ]
+        self._conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Worker died or timed out', "
+            f"finished_at = ? WHERE {exhausted}",
+            (_now(), MAX_ATTEMPTS, *params),
+        )
+        requeued = self._conn.execute(
+            f"UPDATE jobs SET status = 'queued' WHERE status = 'running'{clause}",
+            params,
+        ).rowcount
+        # A storer interrupted mid-write just stores again (upserts are
+        # idempotent)
+        if workers is None:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'extracted' WHERE status = 'storing'"
+            )
+        return requeued, uploads
+
+    def recover(
+        self, workers: Optional[List[int]] = None, timeout: Optional[float] = None
+    ) -> int:
+        requeued, uploads = self._transaction(self._recover, workers, timeout)
+        # The worker that would have deleted these never finished
+        for upload in uploads:
+            Path(upload).unlink(missing_ok=True)
+        return requeued
+
+    def hung_workers(self, timeout: float) -> List[int]:
+        """Workers whose current job has run for more than ``timeout`` seconds."""
+        cutoff = (datetime.now() - timedelta(seconds=timeout)).isoformat()
+        rows = self._conn.execute(
+            "SELECT DISTINCT worker FROM jobs WHERE status = 'running' "
+            "AND started_at < ?",
+            (cutoff,),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Job counts by status."""
+        return dict(
+            self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        )
+
+
+def _extract(job: Dict[str, Any]) -> Dict[str, Any]:
+    from agent import build_summary, run
+
+    try:
+        result = run(job["source"])
+    finally:
+        if job["kind"] == "upload":
+            Path(job["source"]).unlink(missing_ok=True)
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return build_summary(result)
+
+
+def _worker_main(queue_path: str, poll_interval: float):
+    """Worker process: load models once, then extract jobs until killed."""
+    from extractor import get_whisper_model
+
+    queue = JobQueue(queue_path)
+    pid = os.getpid()
+    try:
+        get_whisper_model()
+    except Exception as e:
+        print(f"⚠️  Worker {pid} could not preload whisper: {e}")
+    print(f"👷 Worker {pid} ready")
+    while True:
+        job = queue.claim(pid)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        print(f"👷 Worker {pid} processing job {job['id']} ({job['source']})")
+        try:
+            queue.extracted(job["id"], _extract(job))
+        except Exception as e:
+            traceback.print_exc()
+            queue.failed(job["id"], str(e))
+
+
+class WorkerPool:
+    """Fixed number of extraction processes, restarted if they die."""
+
+    def __init__(self, queue_path: str, processes: int = 2, poll_interval: float = 1.0):
+        self.queue_path = queue_path
+        self.size = processes
+        self.poll_interval = poll_interval
+        # Fresh interpreters: no forked Flask/Chroma state or CUDA context
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List[multiprocessing.Process] = []
+
+    def _spawn(self) -> multiprocessing.Process:
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self.queue_path, self.poll_interval),
+            name="extract-worker",
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def start(self):
+        self._processes = [self._spawn() for _ in range(self.size)]
+
+    def terminate(self, pids: List[int]):
+        """Stop the given workers; reap() then replaces them."""
+        for process in self._processes:
+            if process.pid in pids and process.is_alive():
+                process.terminate()
+                process.join(5)
+
+    def reap(self) -> List[int]:
+        """Replace dead workers; returns the pids that died."""
+        dead = []
+        for i, process in enumerate(self._processes):
+            if not process.is_alive():
+                dead.append(process.pid)
+                self._processes[i] = self._spawn()
+        return dead
+
+    def alive(self) -> int:
+        return sum(process.is_alive() for process in self._processes)
+
+
+class JobStorer(threading.Thread):
+    """Web-process thread that stores extracted summaries and minds the pool."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        store: Callable[[Dict[str, Any], str], List[str]],
+        pool: Optional[WorkerPool] = None,
+        interval: float = 1.0,
+        timeout: float = JOB_TIMEOUT,
+    ):
+        super().__init__(name="job-storer", daemon=True)
+        self.queue = queue
+        self._store = store
+        self.pool = pool
+        self.interval = interval
+        self.timeout = timeout
+
+    def step(self) -> bool:
+        """Store one extracted job; returns whether there was one."""
+        job = self.queue.claim_extracted()
+        if job is None:
+            return False
+        try:
+            self.queue.done(job["id"], self._store(job["summary"], job["label"]))
+        except Exception as e:
+            traceback.print_exc()
+            self.queue.failed(job["id"], str(e))
+        return True
+
+    def run(self):
+        while True:
+            if self.pool is not None:
+                hung = self.queue.hung_workers(self.timeout)
+                if hung:
+                    print(f"⚠️  Stopping extraction workers {hung} (job timed out)")
+                    self.pool.terminate(hung)
+                dead = self.pool.reap()
+                if dead:
+                    print(f"⚠️  Restarted extraction workers {dead}")
+                if dead or hung:
+                    self.queue.recover(dead, self.timeout)
+            try:
+                busy = self.step()
+            except Exception as e:
+                print(f"⚠️  Job storer failed: {e}")
+                busy = False
+            if not busy:
+                time.sleep(self.interval)
+
+
+def start_job_system(
+    queue: JobQueue,
+    store: Callable[[Dict[str, Any], str], List[str]],
+    processes: int = 2,
+    timeout: float = JOB_TIMEOUT,
+) -> JobStorer:
+    """Requeue work interrupted by a restart, then start workers and storer."""
+    requeued = queue.recover()
+    if requeued:
+        print(f"🔁 Requeued {requeued} interrupted jobs")
+    pool = WorkerPool(queue.path, processes)
+    pool.start()
+    storer = JobStorer(queue, store, pool, timeout=timeout)
+    storer.start()
+    print(f"👷 Started {processes} extraction workers")
+    return storer
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""In-Memory BM25 Index
+----------------------
+Lexical inverted index over place documents, so exact dish names and proper
+nouns ("birria", "Katz's") rank well even when the embedding model blurs
+them. Updated incrementally as places are stored or deleted.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from gazetteer import normalize_name
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized word tokens ("Katz's Deli" -> ["katz", "s", "deli"])."""
+    return _TOKEN.findall(normalize_name(text))
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index of term -> {doc id: term frequency}."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add(self, doc_id: str, text: str):
+        """Index a document, replacing any previous version of it."""
+        self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        self._doc_terms[doc_id] = terms
+        length = sum(terms.values())
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+
+    def remove(self, doc_id: str):
+        """Drop a document from the index (no-op if it is not indexed)."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Top ``limit`` (doc id, BM25 score) pairs for a query."""
+        n_docs = len(self._doc_lengths)
+        if not n_docs:
+            return []
+        avg_length = self._total_length / n_docs
+        # Length normalization k1 * (1 - b + b * len / avg) split into a
+        # constant and a per-length slope, hoisted out of the posting loop
+        norm_base = self.k1 * (1 - self.b)
+        norm_slope = self.k1 * self.b / avg_length
+        lengths = self._doc_lengths
+        k1_plus_1 = self.k1 + 1
+
+        scores: Dict[str, float] = {}
+        get = scores.get
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            weight = math.log(1 + (n_docs - df + 0.5) / (df + 0.5)) * k1_plus_1
+            for doc_id, tf in postings.items():
+                scores[doc_id] = get(doc_id, 0.0) + weight * tf / (
+                    tf + norm_base + norm_slope * lengths[doc_id]
+                )
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[str]], k: int = 60
+) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: score(d) = sum over lists of 1 / (k + rank)."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -1,6 +1,14 @@
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Union, Callable
 from pydantic import BaseModel, validator, root_validator, Field
+from pathlib import Path
 import json
+import logging
+import tempfile
+import time
+
+from ratelimit import call_limited
+
+logger = logging.getLogger(__name__)
 
 
 SYSTEM = """
@@ -145,6 +153,10 @@ class Availability(BaseModel):
     state: Optional[str] = ""
     country: Optional[str] = ""
     region: Optional[str] = ""
+    # Filled from geocoding, never by the LLM
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    geo_precision: Optional[str] = None
 
 
 class SpecificDishFeedback(BaseModel):
@@ -332,40 +344,139 @@ def ensure_required_fields(data):
     return data
 
 
-def parse_place_info(text: str) -> Compilation:
-    import openai
-    import json
+AVAILABILITY_FIELDS = ("street_address", "city", "county", "state", "country", "region")
+CONFIDENCE_FIELDS = tuple(ConfidenceScores.model_fields)
+
+
+def _lower_keys(v):
+    """Lowercase dict keys in a subtree, reusing non-container values."""
+    if isinstance(v, dict):
+        return {k.lower(): _lower_keys(x) for k, x in v.items()}
+    if isinstance(v, list):
+        return [_lower_keys(x) for x in v]
+    return v
+
+
+def _as_list(v) -> list:
+    if v is None:
+        return []
+    if isinstance(v, str):
+        return [v]
+    return v
+
+
+def _normalize_activity(raw: Dict[str, Any], top_takeaways: List[str]):
+    """Lowercase, fill defaults and coerce shapes for one activity in one pass."""
+    activity: Dict[str, Any] = {}
+    for key, value in raw.items():
+        key = key.lower()
+        if key in ("activities", "sources"):
+            activity[key] = _as_list(value)
+        elif key == "key_takeaways":
+            activity[key] = _as_list(value) or top_takeaways
+        elif key == "dishes" and isinstance(value, list):
+            dishes = _lower_keys(value)
+            activity[key] = {
+                "explicitly_mentioned": [
+                    d for d in dishes if isinstance(d, dict) and d.get("mentioned")
+                ],
+                "visually_shown": [
+                    d for d in dishes if isinstance(d, dict) and d.get("shown")
+                ],
+            }
+        else:
+            activity[key] = _lower_keys(value)
+
+    if not activity.get("key_takeaways"):
+        activity["key_takeaways"] = top_takeaways
+
+    avail = activity.get("availability")
+    if not isinstance(avail, dict):
+        avail = activity["availability"] = {}
+    for field in AVAILABILITY_FIELDS:
+        avail.setdefault(field, "")
+    for field in ("lat", "lon", "geo_precision"):
+        avail.pop(field, None)
+
+    conf = activity.get("confidence")
+    if not isinstance(conf, dict):
+        conf = activity["confidence"] = {}
+    for field in CONFIDENCE_FIELDS:
+        conf.setdefault(field, 0.0)
+
+    if "ratings_feedback" not in activity:
+        activity["ratings_feedback"] = {"specific_dish_feedback": []}
+
+    return activity
+
+
+def normalize_response(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Single-pass replacement for ``normalize_keys`` + ``ensure_required_fields``.
+
+    Lowercases keys, fills required defaults and coerces list/str shapes while
+    walking the LLM output once, building new containers instead of
+    deep-copying and then mutating them.
+    """
+    top = {k.lower(): v for k, v in data.items()}
+
+    content_type = top.get("content_type") or top.get("primary_content_type")
+    top_takeaways = _as_list(top.get("key_takeaways"))
+
+    raw_activities = top.get("activities")
+    if isinstance(raw_activities, dict):
+        raw_activities = [raw_activities]
+    elif not isinstance(raw_activities, list) or not any(
+        isinstance(a, dict) for a in raw_activities
+    ):
+        # Single-activity response; a top-level "activities" here is the
+        # place's own list of things to do, not a list of places
+        raw_activities = [data] if "place_name" in top else []
+
+    return {
+        "content_type": content_type or "Compilation",
+        "activities": [
+            _normalize_activity(a, top_takeaways)
+            for a in raw_activities
+            if isinstance(a, dict)
+        ],
+    }
 
-    client = openai.OpenAI()
 
-    # Call LLM
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        temperature=0.2,
-        messages=[
+MODEL = "gpt-4o-mini"
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _chat_request_body(text: str) -> Dict[str, Any]:
+    """Build the chat-completion request used for both live and batch parsing."""
+    return {
+        "model": MODEL,
+        "temperature": 0.2,
+        "messages": [
             {"role": "system", "content": SYSTEM},
             {"role": "user", "content": text[:8000]},
         ],
-        response_format={"type": "json_object"},
-    )
+        "response_format": {"type": "json_object"},
+    }
 
+
+def _compilation_from_content(content: str) -> Compilation:
+    """Turn raw LLM JSON output into a validated Compilation."""
     # Attempt to parse output as JSON
     try:
-        data = json.loads(resp.choices[0].message.content)
+        data = json.loads(content)
     except json.JSONDecodeError:
         print("❌ Failed to parse JSON from LLM output:")
-        print("Raw content:\n", resp.choices[0].message.content)
+        print("Raw content:\n", content)
         raise ValueError("Input string to parse_place_info is not valid JSON")
 
-    # Normalize keys to lowercase
-    data = normalize_keys(data)
-
-    # Ensure all required fields exist
-    data = ensure_required_fields(data)
+    data = normalize_response(data)
 
-    # Print the normalized data for debugging
-    print("Normalized data structure before model validation:")
-    print(json.dumps(data, indent=2))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Normalized data structure before model validation:\n%s",
+            json.dumps(data, indent=2),
+        )
 
     try:
         return Compilation(**data)
@@ -373,3 +484,317 @@ def parse_place_info(text: str) -> Compilation:
         print(f"Error creating Compilation model: {e}")
         # Attempt to create a minimal valid Compilation
         return Compilation(content_type="Error", activities=[])
+
+
+def parse_place_info(text: str) -> Compilation:
+    import openai
+
+    client = openai.OpenAI()
+
+    # Call LLM
+    body = _chat_request_body(text)
+    resp = call_limited(
+        "openai",
+        client.chat.completions.create,
+        coalesce_key=json.dumps(body, sort_keys=True),
+        **body,
+    )
+
+    return _compilation_from_content(resp.choices[0].message.content)
+
+
+# ---------- Reduced parse (place already identified) ----------
+FEEDBACK_SYSTEM = """
+You will be given mixed speech transcription, OCR text and captions from a
+short-form video about a single place that has already been identified.
+Do not re-identify the place. Extract only the creator's opinions about it.
+
+Return a JSON object with these fields:
+- cuisine: Cuisine type if it is a restaurant/cafe/bar/bakery, else null
+- vibes: Atmosphere description, else null
+- ratings_feedback: service_feedback, food_feedback, vibes_feedback,
+  miscellaneous_feedback, specific_dish_feedback (list of dish_name/feedback)
+- dishes: list of dish_name, mentioned (true/false), shown (true/false), feedback
+- key_takeaways: 3-6 concise, actionable insights or tips for this place
+"""
+
+FEEDBACK_FIELDS = ("cuisine", "vibes", "ratings_feedback", "dishes", "key_takeaways")
+
+
+def parse_feedback_only(text: str, place: PlaceInfo) -> PlaceInfo:
+    """Fill feedback/takeaway fields on an already-identified place.
+
+    Used when the deterministic pre-extractor is confident about the place
+    name and location, so the LLM only has to summarise opinions.
+    """
+    import openai
+
+    client = openai.OpenAI()
+
+    body = _chat_request_body(text)
+    body["messages"] = [
+        {"role": "system", "content": FEEDBACK_SYSTEM},
+        {"role": "user", "content": f"PLACE: {place.place_name}\n{text[:8000]}"},
+    ]
+    resp = call_limited(
+        "openai",
+        client.chat.completions.create,
+        coalesce_key=json.dumps(body, sort_keys=True),
+        **body,
+    )
+
+    try:
+        data = json.loads(resp.choices[0].message.content)
+    except json.JSONDecodeError:
+        print("❌ Failed to parse JSON from feedback-only LLM output")
+        return place
+
+    activity = _normalize_activity(
+        {
+            **place.model_dump(),
+            **{
+                k: v
+                for k, v in data.items()
+                if v is not None and k.lower() in FEEDBACK_FIELDS
+            },
+        },
+        [],
+    )
+    try:
+        return PlaceInfo(**activity)
+    except Exception as e:
+        print(f"Error validating feedback-only result: {e}")
+        return place
+
+
+# ---------- Streaming ----------
+class ActivityStreamParser:
+    """Incremental JSON scanner that yields ``activities`` elements as they close.
+
+    Feed it chunks of the model's JSON output; each call to ``feed`` returns the
+    activity dicts whose closing brace arrived in that chunk. The full text is
+    kept in ``text`` so the complete document can be validated at the end.
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_chars: List[str] = []
+        self._last_string = ""
+        self._current_key = ""
+        self._in_activities = False
+        self._capture: Optional[List[str]] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self._chunks.append(chunk)
+        completed = []
+        for ch in chunk:
+            if self._capture is not None:
+                self._capture.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = "".join(self._key_chars)
+                elif self._depth == 1:
+                    self._key_chars.append(ch)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._key_chars = []
+            elif ch == ":" and self._depth == 1:
+                self._current_key = self._last_string.lower()
+            elif ch in "{[":
+                if ch == "[" and self._depth == 1 and self._current_key == "activities":
+                    self._in_activities = True
+                elif ch == "{" and self._in_activities and self._depth == 2:
+                    self._capture = [ch]
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._capture is not None and self._depth == 2:
+                    try:
+                        completed.append(json.loads("".join(self._capture)))
+                    except json.JSONDecodeError:
+                        pass
+                    self._capture = None
+                elif self._in_activities and self._depth == 1:
+                    self._in_activities = False
+        return completed
+
+
+def _activity_from_raw(raw: Dict[str, Any]) -> Optional[PlaceInfo]:
+    """Validate a single streamed activity dict into a PlaceInfo."""
+    try:
+        return PlaceInfo(**_normalize_activity(raw, []))
+    except Exception as e:
+        print(f"Skipping streamed activity that failed validation: {e}")
+        return None
+
+
+def stream_place_info(
+    text: str, on_activity: Optional[Callable[[PlaceInfo], None]] = None
+) -> Compilation:
+    """Like ``parse_place_info`` but streams the completion.
+
+    Each element of ``activities`` is validated and handed to ``on_activity``
+    as soon as it closes, so callers can geocode/store it while the rest of
+    the response is still being generated. Returns the full Compilation,
+    reusing the streamed PlaceInfo objects so caller-side edits are kept.
+    """
+    import openai
+
+    client = openai.OpenAI()
+
+    # A stream can only be consumed once, so it is rate limited but not shared
+    stream = call_limited(
+        "openai",
+        client.chat.completions.create,
+        **_chat_request_body(text),
+        stream=True,
+    )
+
+    parser = ActivityStreamParser()
+    streamed: List[PlaceInfo] = []
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        for raw in parser.feed(delta):
+            activity = _activity_from_raw(raw)
+            if activity is None:
+                continue
+            streamed.append(activity)
+            if on_activity:
+                on_activity(activity)
+
+    info = _compilation_from_content(parser.text)
+    if streamed:
+        # Top-level key_takeaways are only known once the whole document is in
+        if len(streamed) == len(info.activities):
+            for mine, full in zip(streamed, info.activities):
+                if not mine.key_takeaways:
+                    mine.key_takeaways = full.key_takeaways
+        info.activities = streamed
+    elif on_activity:
+        # Single-activity responses have no activities array to stream
+        for activity in info.activities:
+            on_activity(activity)
+
+    return info
+
+
+# ---------- Batch API (bulk backfill) ----------
+def write_batch_requests(texts: Dict[str, str], path: Union[str, Path]) -> Path:
+    """Write one Batch API request line per ``custom_id -> text`` entry."""
+    path = Path(path)
+    with open(path, "w", encoding="utf-8") as f:
+        for custom_id, text in texts.items():
+            line = {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": _chat_request_body(text),
+            }
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    return path
+
+
+def read_batch_results(output_text: str) -> Dict[str, Compilation]:
+    """Parse a Batch API output file into Compilations keyed by custom_id."""
+    results: Dict[str, Compilation] = {}
+    for line in output_text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        custom_id = record.get("custom_id")
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            error = record.get("error") or (response.get("body") or {}).get("error")
+            print(f"❌ Batch request {custom_id} failed: {error}")
+            results[custom_id] = Compilation(content_type="Error", activities=[])
+            continue
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+            results[custom_id] = _compilation_from_content(content)
+        except (KeyError, IndexError, ValueError) as e:
+            print(f"❌ Could not parse batch result {custom_id}: {e}")
+            results[custom_id] = Compilation(content_type="Error", activities=[])
+    return results
+
+
+def parse_place_info_batch(
+    texts: Dict[str, str],
+    poll_interval: float = 30.0,
+    timeout: Optional[float] = None,
+    base_url: Optional[str] = None,
+    client=None,
+) -> Dict[str, Compilation]:
+    """Parse many fused texts through a single OpenAI Batch API job.
+
+    Args:
+        texts: Mapping of caller-chosen ids to fused video text
+        poll_interval: Seconds to wait between batch status checks
+        timeout: Give up after this many seconds (None waits for the batch window)
+        base_url: Alternate API root, e.g. a local stand-in server for testing
+        client: Pre-built OpenAI client (overrides base_url)
+
+    Returns:
+        Dictionary of id -> Compilation; failed requests map to an Error compilation
+    """
+    if not texts:
+        return {}
+
+    if client is None:
+        import openai
+
+        client = openai.OpenAI(base_url=base_url)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = write_batch_requests(texts, Path(tmp) / "batch_input.jsonl")
+        with open(input_path, "rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    print(f"📦 Submitted batch {batch.id} with {len(texts)} requests")
+
+    started = time.monotonic()
+    while batch.status not in BATCH_TERMINAL_STATES:
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise TimeoutError(
+                f"Batch {batch.id} still {batch.status} after {timeout}s"
+            )
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+    results: Dict[str, Compilation] = {}
+    for file_id in (batch.output_file_id, getattr(batch, "error_file_id", None)):
+        if file_id:
+            results.update(read_batch_results(client.files.content(file_id).text))
+
+    # Requests missing from both files are reported as errors too
+    for custom_id in texts:
+        results.setdefault(custom_id, Compilation(content_type="Error", activities=[]))
+
+    return results
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Vector Store Maintenance
+--------------------------
+Bulk snapshot / restore for the place vector store.
+
+    python3 manage_store.py export places.jsonl.gz
+    python3 manage_store.py import places.jsonl.gz --batch-size 5000
+    python3 manage_store.py similar
+
+Exports are JSONL (gzip when the path ends in .gz) and carry each place's
+embedding, so importing into a fresh node skips model inference entirely.
+``similar`` recomputes every queued similar-places list in one go (e.g.
+after a large import) instead of leaving it to the app's worker.
+"""
+
+import argparse
+import time
+
+from vector_store import VectorStore
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Vector store bulk export/import")
+    ap.add_argument(
+        "--persist-directory", default="./chroma_db", help="ChromaDB directory"
+    )
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Write all places to a JSONL file")
+    export.add_argument("path")
+    export.add_argument("--batch-size", type=int, default=1000)
+
+    load = sub.add_parser("import", help="Upsert places from an export file")
+    load.add_argument("path")
+    load.add_argument("--batch-size", type=int, default=5000)
+    load.add_argument(
+        "--reembed",
+        action="store_true",
+        help="Ignore stored embeddings and embed documents again",
+    )
+
+    similar = sub.add_parser("similar", help="Recompute queued similar-places lists")
+    similar.add_argument("--batch-size", type=int, default=256)
+    args = ap.parse_args()
+
+    store = VectorStore(persist_directory=args.persist_directory)
+    start = time.perf_counter()
+    if args.command == "export":
+        count = store.export_records(args.path, args.batch_size)
+        print(f"✅ Exported {count} places to {args.path}")
+    elif args.command == "similar":
+        count = 0
+        while True:
+            handled = store.refresh_similar(args.batch_size)
+            if not handled:
+                break
+            count += handled
+        print(f"✅ Refreshed similar places for {count} queued places")
+    else:
+        count = store.import_records(args.path, args.batch_size, args.reembed)
+        print(f"✅ Imported {count} places from {args.path}")
+    print(f"   {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Precomputed Similar-Place Lists
+---------------------------------
+Keeps the top-k nearest neighbours of every stored place in a side table
+of the SQLite catalog, so "more like this" is a primary-key read instead
+of a vector query per page view.
+
+Stores and deletes only mark places as pending (a cheap insert that also
+works from CLI processes); a background worker drains the pending table,
+recomputing the affected lists with batched ANN queries:
+
+- a changed place gets a fresh list, is offered to each of its new
+  neighbours' lists, and every list that referenced its old embedding is
+  recomputed;
+- a deleted place's list is dropped and every list that referenced it is
+  recomputed.
+
+Offering a place only to its own neighbours is an approximation (k-NN is
+not symmetric), the same trade-off ANN indexes make.
+"""
+
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS neighbors (
+    place_id TEXT NOT NULL,
+    neighbor_id TEXT NOT NULL,
+    distance REAL NOT NULL,
+    PRIMARY KEY (place_id, neighbor_id)
+);
+CREATE INDEX IF NOT EXISTS neighbors_by_neighbor ON neighbors (neighbor_id);
+CREATE TABLE IF NOT EXISTS neighbors_pending (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    place_id TEXT NOT NULL UNIQUE,
+    -- 'changed', 'deleted' or 'refresh' (recompute own list only)
+    kind TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS neighbors_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Stronger kinds win when a place is marked again before it is processed
+_KIND_RANK = {"refresh": 0, "changed": 1, "deleted": 2}
+
+
+class NeighborTable:
+    """Top-k neighbour rows plus the queue of places awaiting recompute."""
+
+    def __init__(self, path: str, k: int = 10):
+        self.path = path
+        self.k = k
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def _transaction(self, fn, *args):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(*args)
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _mark(self, ids: List[str], kind: str):
+        for doc_id in ids:
+            row = self._conn.execute(
+                "SELECT kind FROM neighbors_pending WHERE place_id = ?", (doc_id,)
+            ).fetchone()
+            if row is not None and _KIND_RANK[row[0]] > _KIND_RANK[kind]:
+                kind_now = row[0]
+            else:
+                kind_now = kind
+            # Replacing gives the row a new seq, so a batch read before
+            # this mark won't clear it (see _apply)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO neighbors_pending (place_id, kind) "
+                "VALUES (?, ?)",
+                (doc_id, kind_now),
+            )
+
+    def mark(self, ids: List[str], kind: str):
+        """Queue places for recompute ('changed', 'deleted' or 'refresh')."""
+        if ids:
+            self._transaction(self._mark, list(ids), kind)
+
+    def pending(self, limit: int) -> List[Tuple[int, str, str]]:
+        """Up to ``limit`` queued (seq, place_id, kind) rows, oldest first."""
+        return self._conn.execute(
+            "SELECT seq, place_id, kind FROM neighbors_pending ORDER BY seq LIMIT ?",
+            (limit,),
+        ).fetchall()
+
+    def pending_count(self) -> int:
+        row = self._conn.execute("SELECT COUNT(*) FROM neighbors_pending").fetchone()
+        return row[0]
+
+    def is_bootstrapped(self) -> bool:
+        row = self._conn.execute(
+            "SELECT value FROM neighbors_meta WHERE key = 'bootstrapped'"
+        ).fetchone()
+        return row is not None
+
+    def bootstrap(self, ids: List[str]):
+        """Queue every stored place once, the first time the table is used."""
+
+        def _bootstrap():
+            self._mark(ids, "refresh")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO neighbors_meta (key, value) "
+                "VALUES ('bootstrapped', '1')"
+            )
+
+        self._transaction(_bootstrap)
+
+    def get(
+        self, place_id: str, limit: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """(neighbor_id, distance) nearest first."""
+        return self._conn.execute(
+            "SELECT neighbor_id, distance FROM neighbors WHERE place_id = ? "
+            "ORDER BY distance LIMIT ?",
+            (place_id, limit or self.k),
+        ).fetchall()
+
+    def _referrers(self, ids: List[str]) -> List[str]:
+        marks = ",".join("?" * len(ids))
+        rows = self._conn.execute(
+            f"SELECT DISTINCT place_id FROM neighbors WHERE neighbor_id IN ({marks})",
+            ids,
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _offer(self, place_id: str, neighbor_id: str, distance: float):
+        """Insert into ``place_id``'s list if it beats the current k-th."""
+        rows = self.get(place_id, self.k)
+        if len(rows) >= self.k and distance >= rows[-1][1]:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO neighbors (place_id, neighbor_id, distance) "
+            "VALUES (?, ?, ?)",
+            (place_id, neighbor_id, distance),
+        )
+        if len(rows) >= self.k:
+            self._conn.execute(
+                "DELETE FROM neighbors WHERE place_id = ? AND neighbor_id = ?",
+                (place_id, rows[-1][0]),
+            )
+
+    def _apply(
+        self,
+        batch: List[Tuple[int, str, str]],
+        lists: Dict[str, List[Tuple[str, float]]],
+        candidates: Dict[str, List[Tuple[str, float]]],
+    ):
+        processed = [doc_id for _, doc_id, _ in batch]
+        marks = ",".join("?" * len(processed))
+        # Lists that mention a moved or removed place must be recomputed
+        stale = [doc_id for _, doc_id, kind in batch if kind != "refresh"]
+        referrers = (
+            [r for r in self._referrers(stale) if r not in lists] if stale else []
+        )
+        if stale:
+            self._conn.execute(
+                f"DELETE FROM neighbors WHERE neighbor_id IN "
+                f"({','.join('?' * len(stale))})",
+                stale,
+            )
+        self._conn.execute(
+            f"DELETE FROM neighbors WHERE place_id IN ({marks})", processed
+        )
+        # Only the rows this batch read; places marked again meanwhile stay
+        self._conn.executemany(
+            "DELETE FROM neighbors_pending WHERE seq = ?",
+            [(seq,) for seq, _, _ in batch],
+        )
+        for doc_id, neighbors in lists.items():
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO neighbors (place_id, neighbor_id, distance) "
+                "VALUES (?, ?, ?)",
+                [(doc_id, n, d) for n, d in neighbors],
+            )
+        changed = {doc_id for _, doc_id, kind in batch if kind == "changed"}
+        for doc_id in changed & set(candidates):
+            for neighbor_id, distance in candidates[doc_id]:
+                if neighbor_id not in lists:
+                    self._offer(neighbor_id, doc_id, distance)
+        self._mark(referrers, "refresh")
+
+    def apply(
+        self,
+        batch: List[Tuple[int, str, str]],
+        lists: Dict[str, List[Tuple[str, float]]],
+        candidates: Optional[Dict[str, List[Tuple[str, float]]]] = None,
+    ):
+        """Write recomputed ``lists`` for a processed pending ``batch``.
+
+        Changed places are offered to the lists of their ``candidates``
+        (defaults to their own lists). Places in the batch without a list
+        (deleted, or no longer stored) just lose their rows.
+        """
+        self._transaction(self._apply, batch, lists, candidates or lists)
+
+
+class NeighborWorker(threading.Thread):
+    """Daemon thread that drains the pending table.
+
+    ``step`` processes one batch and returns how many places it handled;
+    the worker loops while there is work and otherwise sleeps until woken
+    by a local write or ``interval`` passes (catching writes made by other
+    processes).
+    """
+
+    def __init__(self, step: Callable[[], int], interval: float = 5.0):
+        super().__init__(name="neighbor-worker", daemon=True)
+        self._step = step
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def notify(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                handled = self._step()
+            except Exception as e:
+                print(f"⚠️  Similar-places refresh failed: {e}")
+                handled = 0
+            if not handled:
+                self._wake.wait(self.interval)
+                self._wake.clear()
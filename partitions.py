@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""Region-Partitioned Place Collections
+-------------------------------------
+Splits the place index into one Chroma collection per country (or per
+country + state/region), chosen from each place's geocoded fields, so a
+query about one area only searches that area's index.
+
+``PartitionedCollection`` implements the subset of the Chroma collection
+API that ``VectorStore`` uses (get, query, upsert, delete, count):
+
+- writes are routed by the place's partition key; a place whose country
+  changes on merge moves between collections;
+- reads by id go straight to the owning collection through an id ->
+  partition table kept in the SQLite catalog;
+- filtered reads and queries only visit partitions that can match: a
+  ``country_norm`` filter selects partitions by key, and a geohash ``$in``
+  filter (nearby/map search) selects partitions whose stored bounding box
+  touches one of the cells;
+- everything else scatters to every partition and gathers the results,
+  merging vector hits by distance.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import geohash
+from gazetteer import normalize_name
+
+COLLECTION_PREFIX = "place_info"
+MAX_NAME_LENGTH = 63
+# partition_by value -> whether the state/region is part of the key
+PARTITION_SCHEMES = {"country": False, "region": True}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS partitions (
+    country TEXT NOT NULL,
+    region TEXT NOT NULL,
+    collection TEXT NOT NULL,
+    -- Bounding box of the partition's geocoded places (NULL until one has
+    -- coordinates); only ever grows
+    min_lat REAL,
+    min_lon REAL,
+    max_lat REAL,
+    max_lon REAL,
+    PRIMARY KEY (country, region)
+);
+CREATE TABLE IF NOT EXISTS place_partitions (
+    id TEXT PRIMARY KEY,
+    collection TEXT NOT NULL
+);
+"""
+
+
+def collection_name(country: str, region: str) -> str:
+    """Chroma collection name for a partition key ("place_info-usa.ny").
+
+    Country and region are joined with ".", which never occurs inside a
+    slug, so ("united states", "") and ("united", "states") stay apart.
+    Keys that don't slug losslessly (non-Latin scripts such as "日本") are
+    named by a short hash of the key, and names too long for Chroma keep a
+    readable prefix plus that hash. Only places without a country share
+    "place_info-unknown".
+    """
+    if not country:
+        return f"{COLLECTION_PREFIX}-unknown"
+    parts = [country, region] if region else [country]
+    digest = hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:10]
+    if not all(re.fullmatch(r"[a-z0-9 ]+", part) for part in parts):
+        return f"{COLLECTION_PREFIX}-c-{digest}"
+    name = f"{COLLECTION_PREFIX}-" + ".".join("-".join(p.split()) for p in parts)
+    # Chroma names are 3-63 characters and must end alphanumeric
+    if len(name) > MAX_NAME_LENGTH:
+        name = f"{name[: MAX_NAME_LENGTH - 11].rstrip('.-')}-{digest}"
+    return name
+
+
+def _where_clauses(where: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if not where:
+        return []
+    return list(where["$and"]) if "$and" in where else [where]
+
+
+def _values(condition: Any) -> Optional[Set[str]]:
+    """Values a single-field condition can match, or None if unrestricted."""
+    if isinstance(condition, dict):
+        if "$in" in condition:
+            return set(condition["$in"])
+        if "$eq" in condition:
+            return {condition["$eq"]}
+        return None
+    return {condition}
+
+
+def _empty(fields: Iterable[str]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"ids": []}
+    for field in fields:
+        result[field] = []
+    return result
+
+
+class PartitionedCollection:
+    """One Chroma collection per region, behind a single-collection API."""
+
+    def __init__(
+        self,
+        client,
+        catalog_path: str,
+        partition_by: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        if partition_by not in PARTITION_SCHEMES:
+            raise ValueError(
+                f"partition_by must be one of {sorted(PARTITION_SCHEMES)}, "
+                f"not {partition_by!r}"
+            )
+        self.client = client
+        self.partition_by = partition_by
+        self._metadata = metadata
+        self._collections: Dict[str, Any] = {}
+        # Partition key -> collection, as recorded in the partitions table
+        self._names: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            catalog_path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def partition_key(self, metadata: Dict[str, Any]) -> Tuple[str, str]:
+        """(country, region) a place belongs to, normalized."""
+        country = metadata.get("country_norm") or normalize_name(
+            metadata.get("country") or ""
+        )
+        region = ""
+        if PARTITION_SCHEMES[self.partition_by]:
+            region = normalize_name(metadata.get("state") or "")
+        return country, region
+
+    def _name_for(self, key: Tuple[str, str]) -> str:
+        """Collection of a partition key; existing partitions keep their name."""
+        name = self._names.get(key)
+        if name is None:
+            row = self._conn.execute(
+                "SELECT collection FROM partitions WHERE country = ? AND region = ?",
+                key,
+            ).fetchone()
+            name = row[0] if row else collection_name(*key)
+            self._names[key] = name
+        return name
+
+    def _collection(self, name: str):
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self.client.get_or_create_collection(
+                name=name, metadata=self._metadata, embedding_function=None
+            )
+            self._collections[name] = collection
+        return collection
+
+    def partitions(self) -> List[str]:
+        """Names of every partition collection, in a stable order."""
+        rows = self._conn.execute(
+            "SELECT DISTINCT collection FROM partitions ORDER BY collection"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _route(self, where: Optional[Dict[str, Any]]) -> List[str]:
+        """Partitions that can hold places matching ``where``."""
+        countries: Optional[Set[str]] = None
+        cells: Optional[List[str]] = None
+        for clause in _where_clauses(where):
+            for field, condition in clause.items():
+                if field == "country_norm":
+                    values = _values(condition)
+                    if values is not None:
+                        countries = values if countries is None else countries & values
+                elif re.fullmatch(r"gh\d", field):
+                    values = _values(condition)
+                    if values is not None:
+                        cells = sorted(values)
+
+        rows = self._conn.execute(
+            "SELECT country, collection, min_lat, min_lon, max_lat, max_lon "
+            "FROM partitions ORDER BY collection"
+        ).fetchall()
+        boxes = [geohash.bounds(cell) for cell in cells] if cells is not None else []
+        names = []
+        for country, name, min_lat, min_lon, max_lat, max_lon in rows:
+            if countries is not None and country not in countries:
+                continue
+            if cells is not None:
+                if min_lat is None:
+                    continue
+                if not any(
+                    b[0] <= max_lat
+                    and min_lat <= b[2]
+                    and b[1] <= max_lon
+                    and min_lon <= b[3]
+                    for b in boxes
+                ):
+                    continue
+            if name not in names:
+                names.append(name)
+        return names
+
+    def _owners(self, ids: List[str]) -> Dict[str, str]:
+        """id -> partition collection for ids that are stored."""
+        owners = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start : start + 500]
+            marks = ",".join("?" * len(chunk))
+            owners.update(
+                self._conn.execute(
+                    f"SELECT id, collection FROM place_partitions WHERE id IN ({marks})",
+                    chunk,
+                ).fetchall()
+            )
+        return owners
+
+    def count(self) -> int:
+        return sum(self._collection(name).count() for name in self.partitions())
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Chroma ``get`` across the partitions that can match."""
+        include = include or ["metadatas", "documents"]
+        merged = _empty(include)
+        if ids is not None:
+            by_partition: Dict[str, List[str]] = defaultdict(list)
+            for doc_id, name in self._owners(list(ids)).items():
+                by_partition[name].append(doc_id)
+            targets = [(name, by_partition[name]) for name in sorted(by_partition)]
+        else:
+            targets = [(name, None) for name in self._route(where)]
+
+        skip, remaining = offset or 0, limit
+        for name, partition_ids in targets:
+            collection = self._collection(name)
+            if partition_ids is None and where is None:
+                # Unfiltered pages can skip whole partitions by count
+                size = collection.count()
+                if skip >= size:
+                    skip -= size
+                    continue
+                result = collection.get(limit=remaining, offset=skip, include=include)
+                drop, skip = 0, 0
+            else:
+                result = collection.get(
+                    ids=partition_ids,
+                    where=where,
+                    limit=None if remaining is None else skip + remaining,
+                    include=include,
+                )
+                drop = min(skip, len(result["ids"]))
+                skip -= drop
+            merged["ids"].extend(result["ids"][drop:])
+            for field in include:
+                if result.get(field) is not None:
+                    merged[field].extend(list(result[field])[drop:])
+            if remaining is not None:
+                remaining -= len(result["ids"]) - drop
+                if remaining <= 0:
+                    break
+        return merged
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Scatter a vector query to the matching partitions, gather by distance."""
+        include = list(include or ["metadatas", "documents", "distances"])
+        fetch = include if "distances" in include else include + ["distances"]
+        hits: List[List[Tuple[float, Dict[str, Any]]]] = [[] for _ in query_embeddings]
+        for name in self._route(where):
+            collection = self._collection(name)
+            size = collection.count()
+            if not size:
+                continue
+            result = collection.query(
+                query_embeddings=query_embeddings,
+                n_results=min(n_results, size),
+                where=where,
+                include=fetch,
+            )
+            for i in range(len(query_embeddings)):
+                for j, doc_id in enumerate(result["ids"][i]):
+                    hit = {"ids": doc_id}
+                    for field in fetch:
+                        if result.get(field) is not None:
+                            hit[field] = result[field][i][j]
+                    hits[i].append((hit["distances"], hit))
+
+        merged = _empty(include)
+        for query_hits in hits:
+            query_hits.sort(key=lambda pair: pair[0])
+            top = [hit for _, hit in query_hits[:n_results]]
+            merged["ids"].append([hit["ids"] for hit in top])
+            for field in include:
+                merged[field].append([hit.get(field) for hit in top])
+        return merged
+
+    def _record(self, placed: List[Tuple[str, str, Tuple[str, str], Dict[str, Any]]]):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for doc_id, name, (country, region), metadata in placed:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO partitions (country, region, collection) "
+                    "VALUES (?, ?, ?)",
+                    (country, region, name),
+                )
+                lat, lon = metadata.get("lat"), metadata.get("lon")
+                if lat is not None and lon is not None:
+                    self._conn.execute(
+                        "UPDATE partitions SET "
+                        "min_lat = MIN(COALESCE(min_lat, :lat), :lat), "
+                        "max_lat = MAX(COALESCE(max_lat, :lat), :lat), "
+                        "min_lon = MIN(COALESCE(min_lon, :lon), :lon), "
+                        "max_lon = MAX(COALESCE(max_lon, :lon), :lon) "
+                        "WHERE country = :country AND region = :region",
+                        {
+                            "lat": float(lat),
+                            "lon": float(lon),
+                            "country": country,
+                            "region": region,
+                        },
+                    )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO place_partitions (id, collection) "
+                    "VALUES (?, ?)",
+                    (doc_id, name),
+                )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        documents: List[str],
+    ):
+        """Upsert each place into its partition, moving it if its key changed."""
+        with self._lock:
+            owners = self._owners(list(ids))
+            groups: Dict[str, List[int]] = defaultdict(list)
+            moved: Dict[str, List[str]] = defaultdict(list)
+            placed = []
+            for i, (doc_id, metadata) in enumerate(zip(ids, metadatas)):
+                key = self.partition_key(metadata)
+                name = self._name_for(key)
+                groups[name].append(i)
+                placed.append((doc_id, name, key, metadata))
+                if owners.get(doc_id, name) != name:
+                    moved[owners[doc_id]].append(doc_id)
+
+            for name, positions in groups.items():
+                self._collection(name).upsert(
+                    ids=[ids[i] for i in positions],
+                    embeddings=[embeddings[i] for i in positions],
+                    metadatas=[metadatas[i] for i in positions],
+                    documents=[documents[i] for i in positions],
+                )
+            for name, old_ids in moved.items():
+                self._collection(name).delete(ids=old_ids)
+            self._record(placed)
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            by_partition: Dict[str, List[str]] = defaultdict(list)
+            for doc_id, name in self._owners(list(ids)).items():
+                by_partition[name].append(doc_id)
+            for name, partition_ids in by_partition.items():
+                self._collection(name).delete(ids=partition_ids)
+            self._conn.executemany(
+                "DELETE FROM place_partitions WHERE id = ?",
+                [(doc_id,) for doc_id in ids],
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """Places per partition collection."""
+        return {name: self._collection(name).count() for name in self.partitions()}
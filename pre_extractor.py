@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""Deterministic Pre-Extractor
+-----------------------------
+Rule- and gazetteer-based extraction of place name, genre and availability
+from captions and OCR text. Many captions follow fixed patterns
+("📍 Joe's Pizza, NYC", @handles, street address lines); when these rules are
+confident the agent skips the full LLM parse, or only asks the LLM for
+feedback and takeaways.
+
+Run as a script to report how much of a corpus it resolves:
+    python3 pre_extractor.py corpus.jsonl
+"""
+
+import argparse
+import json
+import os
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from gazetteer import Gazetteer
+from llm_parser import Availability, ConfidenceScores, PlaceInfo
+
+# Minimum confidence for each field before the LLM parse can be skipped
+CONFIDENT_PLACE_NAME = 0.85
+CONFIDENT_GENRE = 0.6
+# A pinned name longer than this is probably a sentence, not a venue
+MAX_PIN_WORDS = 6
+# Lowercase words that still belong in venue names ("Museum of Ice Cream")
+NAME_CONNECTORS = set(
+    "of the and de del della di da du des la le el los las y e on at in by n".split()
+)
+
+_PIN_RE = re.compile(r"(?:📍|📌|Location:)\s*([^\n#@|]+)", re.IGNORECASE)
+# Where a pin's name ends: " - " / en or em dash separators, sentence
+# punctuation, or the start of a description after a full stop
+_PIN_STOP_RE = re.compile(r"\s+-\s+|[–—]|[!?;]|\.(?=\s+[a-z])|\.$")
+_HANDLE_RE = re.compile(r"(?<![\w.])@([A-Za-z0-9_.]{3,30})")
+_ADDRESS_RE = re.compile(
+    r"\b\d{1,5}\s+(?:[A-Z0-9][\w'.-]*\s+){0,4}"
+    r"(?:St|Street|Ave|Avenue|Blvd|Boulevard|Rd|Road|Dr|Drive|Ln|Lane|Way|Pl|"
+    r"Place|Ct|Court|Sq|Square|Pkwy|Parkway|Hwy|Highway)\b\.?"
+)
+_SECTION_RE = re.compile(r"^(SPEECH|OCR TEXT|CAPTION): ", re.MULTILINE)
+
+# alias -> (city, state, country). Fallback for when no GeoNames gazetteer is
+# configured, and for short aliases (NYC, CDMX) a GeoNames dump may not carry
+GAZETTEER: Dict[str, Tuple[str, str, str]] = {
+    "nyc": ("New York", "NY", "USA"),
+    "new york": ("New York", "NY", "USA"),
+    "new york city": ("New York", "NY", "USA"),
+    "manhattan": ("New York", "NY", "USA"),
+    "brooklyn": ("Brooklyn", "NY", "USA"),
+    "queens": ("Queens", "NY", "USA"),
+    "la": ("Los Angeles", "CA", "USA"),
+    "los angeles": ("Los Angeles", "CA", "USA"),
+    "sf": ("San Francisco", "CA", "USA"),
+    "san francisco": ("San Francisco", "CA", "USA"),
+    "san diego": ("San Diego", "CA", "USA"),
+    "chicago": ("Chicago", "IL", "USA"),
+    "boston": ("Boston", "MA", "USA"),
+    "miami": ("Miami", "FL", "USA"),
+    "austin": ("Austin", "TX", "USA"),
+    "houston": ("Houston", "TX", "USA"),
+    "seattle": ("Seattle", "WA", "USA"),
+    "portland": ("Portland", "OR", "USA"),
+    "las vegas": ("Las Vegas", "NV", "USA"),
+    "dc": ("Washington", "DC", "USA"),
+    "washington dc": ("Washington", "DC", "USA"),
+    "toronto": ("Toronto", "ON", "Canada"),
+    "vancouver": ("Vancouver", "BC", "Canada"),
+    "montreal": ("Montreal", "QC", "Canada"),
+    "mexico city": ("Mexico City", "CDMX", "Mexico"),
+    "cdmx": ("Mexico City", "CDMX", "Mexico"),
+    "london": ("London", "England", "UK"),
+    "paris": ("Paris", "Île-de-France", "France"),
+    "rome": ("Rome", "Lazio", "Italy"),
+    "milan": ("Milan", "Lombardy", "Italy"),
+    "barcelona": ("Barcelona", "Catalonia", "Spain"),
+    "madrid": ("Madrid", "Madrid", "Spain"),
+    "lisbon": ("Lisbon", "Lisbon", "Portugal"),
+    "amsterdam": ("Amsterdam", "North Holland", "Netherlands"),
+    "berlin": ("Berlin", "Berlin", "Germany"),
+    "copenhagen": ("Copenhagen", "Capital Region", "Denmark"),
+    "istanbul": ("Istanbul", "Istanbul", "Turkey"),
+    "dubai": ("Dubai", "Dubai", "UAE"),
+    "tokyo": ("Tokyo", "Tokyo", "Japan"),
+    "osaka": ("Osaka", "Osaka", "Japan"),
+    "kyoto": ("Kyoto", "Kyoto", "Japan"),
+    "seoul": ("Seoul", "Seoul", "South Korea"),
+    "bangkok": ("Bangkok", "Bangkok", "Thailand"),
+    "singapore": ("Singapore", "", "Singapore"),
+    "hong kong": ("Hong Kong", "", "Hong Kong"),
+    "bali": ("", "Bali", "Indonesia"),
+    "sydney": ("Sydney", "NSW", "Australia"),
+    "melbourne": ("Melbourne", "VIC", "Australia"),
+}
+
+# keyword -> genre, checked in order so more specific words win
+GENRE_KEYWORDS: List[Tuple[str, str]] = [
+    ("bakery", "bakery"),
+    ("boulangerie", "bakery"),
+    ("patisserie", "bakery"),
+    ("coffee", "cafe"),
+    ("cafe", "cafe"),
+    ("café", "cafe"),
+    ("espresso", "cafe"),
+    ("cocktail", "bar"),
+    ("speakeasy", "bar"),
+    ("wine bar", "bar"),
+    ("brewery", "bar"),
+    ("pub", "bar"),
+    ("museum", "museum"),
+    ("gallery", "museum"),
+    ("hotel", "hotel"),
+    ("resort", "hotel"),
+    ("trail", "hike"),
+    ("hike", "hike"),
+    ("hiking", "hike"),
+    ("park", "park"),
+    ("spa", "wellness"),
+    ("club", "nightlife"),
+    ("pizza", "restaurant"),
+    ("ramen", "restaurant"),
+    ("sushi", "restaurant"),
+    ("tacos", "restaurant"),
+    ("taqueria", "restaurant"),
+    ("burger", "restaurant"),
+    ("bistro", "restaurant"),
+    ("trattoria", "restaurant"),
+    ("deli", "restaurant"),
+    ("delicatessen", "restaurant"),
+    ("restaurant", "restaurant"),
+    ("brunch", "restaurant"),
+    ("dinner", "restaurant"),
+    ("staycation", "hotel"),
+]
+
+# Food and venue emoji are as reliable as keywords in captions
+GENRE_EMOJI: Dict[str, str] = {
+    "🥐": "bakery",
+    "🍰": "bakery",
+    "☕": "cafe",
+    "🍸": "bar",
+    "🍹": "bar",
+    "🍺": "bar",
+    "🍷": "bar",
+    "🏨": "hotel",
+    "🍕": "restaurant",
+    "🍜": "restaurant",
+    "🍣": "restaurant",
+    "🌮": "restaurant",
+    "🍔": "restaurant",
+    "🥩": "restaurant",
+}
+
+
+class PreExtraction(BaseModel):
+    """Place fields recovered deterministically, with per-field confidence."""
+
+    place_name: str = ""
+    genre: str = ""
+    availability: Availability = Field(default_factory=Availability)
+    confidence: ConfidenceScores = Field(default_factory=ConfidenceScores)
+    compilation: bool = False
+
+    @property
+    def confident(self) -> bool:
+        """True when the LLM is not needed to identify the place."""
+        return (
+            not self.compilation
+            and self.confidence.place_name >= CONFIDENT_PLACE_NAME
+            and self.confidence.genre >= CONFIDENT_GENRE
+        )
+
+    def to_place_info(self) -> PlaceInfo:
+        return PlaceInfo(
+            place_name=self.place_name,
+            genre=self.genre,
+            availability=self.availability.model_copy(),
+            sources=["captions"],
+            confidence=self.confidence.model_copy(),
+        )
+
+
+def _clean_pin(pin: str) -> str:
+    """Cut a pin's text at the first emoji, separator or sentence break.
+
+    "📍 Katz's Delicatessen 🥪 best pastrami ever" -> "Katz's Delicatessen".
+    """
+    for i, char in enumerate(pin):
+        if unicodedata.category(char) in ("So", "Sk", "Cs"):
+            pin = pin[:i]
+            break
+    stop = _PIN_STOP_RE.search(pin)
+    if stop:
+        pin = pin[: stop.start()]
+    return pin.strip(" .,-\ufe0f")
+
+
+def _looks_like_name(name: str) -> bool:
+    """Short, title-like text; lowercase words other than connectors are prose."""
+    words = name.split()
+    if not words or len(words) > MAX_PIN_WORDS:
+        return False
+    return not any(w[0].islower() and w not in NAME_CONNECTORS for w in words)
+
+
+def _squash(text: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def _area(
+    words: List[str], gazetteer: Optional[Gazetteer]
+) -> Optional[Tuple[str, str, str]]:
+    """(city, state, country) for words naming a city, region or country.
+
+    The GeoNames gazetteer is consulted first when configured, but only for
+    capitalised words so that "nice pizza" doesn't land in Nice. Two-letter
+    aliases (LA, SF, DC) only count when written in capitals so that words
+    like the Spanish/French "la" don't match.
+    """
+    key = " ".join(words).lower()
+    if len(key) <= 2 and not "".join(words).isupper():
+        return None
+    if gazetteer is not None and all(w[0].isupper() for w in words):
+        found = gazetteer.area(key)
+        if found:
+            return found["city"], found["state"], found["country"]
+    return GAZETTEER.get(key)
+
+
+def _find_location(
+    text: str, gazetteer: Optional[Gazetteer] = None
+) -> Optional[Tuple[str, str, str]]:
+    """Find the first city, region or country mentioned in free text."""
+    words = re.findall(r"[^\W\d_]+", text)
+    for i in range(len(words)):
+        for n in (3, 2, 1):
+            window = words[i : i + n]
+            if len(window) < n:
+                continue
+            place = _area(window, gazetteer)
+            if place:
+                return place
+    return None
+
+
+def _guess_genre(name: str, texts: List[str]) -> Tuple[str, float]:
+    """Guess a genre from keywords, trusting the place name over free text."""
+    for text, confidence in [(name, 0.8)] + [(t, 0.65) for t in texts]:
+        lowered = text.lower()
+        for keyword, genre in GENRE_KEYWORDS:
+            if re.search(rf"\b{re.escape(keyword)}\b", lowered):
+                return genre, confidence
+        for emoji, genre in GENRE_EMOJI.items():
+            if emoji in text:
+                return genre, confidence
+    return "", 0.0
+
+
+def pre_extract(
+    caption: str, ocr_text: str = "", gazetteer: Optional[Gazetteer] = None
+) -> PreExtraction:
+    """Extract a single place from caption and OCR text without the LLM.
+
+    Captions are trusted over OCR. Posts with more than one pinned place are
+    flagged as compilations and never considered confident. Locations are
+    resolved with ``gazetteer`` (the agent passes ``get_gazetteer()``) and
+    the built-in GAZETTEER aliases.
+    """
+    result = PreExtraction()
+    conf = result.confidence
+    sources = [caption or "", ocr_text or ""]
+
+    pins: List[str] = []
+    for text in sources:
+        for match in _PIN_RE.finditer(text):
+            pin = _clean_pin(match.group(1))
+            if pin and _squash(pin) not in {_squash(p) for p in pins}:
+                pins.append(pin)
+
+    # A pin that is only a city ("📍 NYC") locates the post but names no venue
+    city_pins = [p for p in pins if _area(p.split(), gazetteer)]
+    venue_pins = [p for p in pins if p not in city_pins]
+
+    if len(venue_pins) > 1:
+        result.compilation = True
+
+    location_hint = city_pins[0] if city_pins else ""
+    if venue_pins:
+        name, _, hint = venue_pins[0].partition(",")
+        location_hint = hint or location_hint
+        result.place_name = name.strip()
+        # Trailing prose means the rule may have misread the caption
+        conf.place_name = 0.9 if _looks_like_name(result.place_name) else 0.5
+
+    handles = [h.rstrip(".") for h in _HANDLE_RE.findall(caption or "")]
+    if result.place_name:
+        squashed = _squash(result.place_name)
+        if conf.place_name >= CONFIDENT_PLACE_NAME and any(
+            squashed and squashed in _squash(h) for h in handles
+        ):
+            conf.place_name = 0.95
+    elif len(handles) == 1:
+        # A lone handle is often the venue, but just as often the creator
+        result.place_name = re.sub(r"[_.]+", " ", handles[0]).strip()
+        conf.place_name = 0.4
+
+    for text in sources:
+        address = _ADDRESS_RE.search(text)
+        if address:
+            result.availability.street_address = address.group(0).strip()
+            conf.availability = 0.85
+            break
+
+    place = _find_location(location_hint, gazetteer) if location_hint else None
+    for text in sources:
+        place = place or _find_location(text, gazetteer)
+    if place:
+        city, state, country = place
+        result.availability.city = city
+        result.availability.state = state
+        result.availability.country = country
+        if location_hint and not city:
+            result.availability.region = location_hint.strip()
+        conf.availability = max(conf.availability, 0.8)
+
+    result.genre, conf.genre = _guess_genre(result.place_name, sources)
+    return result
+
+
+def split_fused_text(fused_text: str) -> Dict[str, str]:
+    """Split agent fused text back into its SPEECH / OCR TEXT / CAPTION parts."""
+    parts: Dict[str, str] = {}
+    matches = list(_SECTION_RE.finditer(fused_text))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(fused_text)
+        parts[match.group(1)] = fused_text[match.end() : end].strip()
+    return parts
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Report pre-extractor coverage")
+    ap.add_argument("corpus", help="JSONL file of {id, text} fused-text records")
+    ap.add_argument(
+        "--geonames",
+        default=os.getenv("GEONAMES_PATH"),
+        help="GeoNames dump for resolving locations (default: $GEONAMES_PATH)",
+    )
+    ap.add_argument("--verbose", "-v", action="store_true")
+    args = ap.parse_args()
+    gazetteer = Gazetteer.load(args.geonames) if args.geonames else None
+
+    total = resolved = 0
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            parts = split_fused_text(record.get("text", ""))
+            pre = pre_extract(
+                parts.get("CAPTION", ""), parts.get("OCR TEXT", ""), gazetteer
+            )
+            total += 1
+            resolved += pre.confident
+            if args.verbose:
+                mark = "✅" if pre.confident else "—"
+                print(f"{mark} {record.get('id')}: {pre.place_name!r} ({pre.genre})")
+
+    if not total:
+        print("❌ Corpus is empty")
+        return
+    print(
+        f"📊 Resolved {resolved}/{total} jobs ({resolved / total:.1%}) without the LLM"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Shared Rate Limiting for External APIs
+----------------------------------------
+Token buckets stored in a local SQLite file, so every ingest worker process
+on the machine draws from the same quota, plus in-flight request coalescing
+so concurrent identical requests share one upstream call.
+
+Configured through environment variables:
+  • OPENAI_RPM          – LLM requests per minute (default 500)
+  • GOOGLE_PLACES_QPS   – Places API requests per second (default 10)
+  • YTDLP_RPM           – yt-dlp metadata/download calls per minute (default 30)
+  • RATE_LIMIT_DB       – bucket database path (default rate_limits.sqlite)
+"""
+
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "rate_limits.sqlite")
+
+# name -> (tokens per second, burst capacity)
+LIMITS: Dict[str, tuple] = {
+    "openai": (float(os.getenv("OPENAI_RPM", "500")) / 60, 10),
+    "google_places": (float(os.getenv("GOOGLE_PLACES_QPS", "10")), 10),
+    "ytdlp": (float(os.getenv("YTDLP_RPM", "30")) / 60, 3),
+}
+
+
+class TokenBucket:
+    """Token bucket whose state lives in SQLite so processes share it."""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        capacity: float,
+        path: str = RATE_LIMIT_DB,
+    ):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        # Autocommit mode so BEGIN IMMEDIATE takes the cross-process write lock
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; otherwise return seconds until they are."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at FROM buckets WHERE name = ?",
+                    (self.name,),
+                ).fetchone()
+                available = self.capacity
+                if row is not None:
+                    available = min(
+                        self.capacity, row[0] + (now - row[1]) * self.rate
+                    )
+
+                wait = 0.0
+                if available >= tokens:
+                    available -= tokens
+                else:
+                    wait = (tokens - available) / self.rate
+
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) "
+                    "VALUES (?, ?, ?)",
+                    (self.name, available, now),
+                )
+                self._conn.execute("COMMIT")
+                return wait
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None):
+        """Block until tokens are available (raises TimeoutError past timeout)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise TimeoutError(f"Rate limit '{self.name}' not available in time")
+            # Jitter keeps waiting workers from retrying in lockstep
+            time.sleep(wait * (1 + random.random() * 0.1))
+
+
+class RequestCoalescer:
+    """Let concurrent identical requests share one upstream call."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def call(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+_coalescer = RequestCoalescer()
+
+
+def limiter(name: str) -> TokenBucket:
+    """Return the shared bucket for an upstream API, creating it on first use."""
+    with _buckets_lock:
+        if name not in _buckets:
+            rate, capacity = LIMITS[name]
+            _buckets[name] = TokenBucket(name, rate, capacity)
+        return _buckets[name]
+
+
+# yt-dlp reports throttling only in its message ("HTTP Error 429: Too Many ...")
+_HTTP_429_RE = re.compile(r"\bHTTP Error 429\b")
+
+
+def _is_rate_limit_error(e: Exception) -> bool:
+    """Whether an upstream error is throttling (worth a backoff and retry).
+
+    Only structured signals count (status codes, the OpenAI/googlemaps
+    exception types) plus yt-dlp's exact message; any other text that
+    merely contains "429" (a URL, a command line) is not a rate limit.
+    """
+    response = getattr(e, "response", None)
+    status = (
+        getattr(e, "status_code", None)
+        or getattr(e, "status", None)
+        or getattr(response, "status_code", None)
+    )
+    return (
+        status in (429, "OVER_QUERY_LIMIT")
+        or "RateLimit" in type(e).__name__
+        or "OverQueryLimit" in type(e).__name__
+        or bool(_HTTP_429_RE.search(str(e)))
+    )
+
+
+def call_limited(
+    name: str,
+    fn: Callable,
+    *args,
+    coalesce_key: Optional[Hashable] = None,
+    retries: int = 3,
+    **kwargs,
+) -> Any:
+    """Call ``fn`` under the ``name`` rate limit.
+
+    Identical concurrent calls with the same ``coalesce_key`` share one
+    upstream request, and rate-limit errors that slip through (e.g. from
+    another host on the same key) are retried with exponential backoff
+    instead of failing the job.
+    """
+
+    def _attempt():
+        for attempt in range(retries + 1):
+            limiter(name).acquire()
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == retries or not _is_rate_limit_error(e):
+                    raise
+                backoff = 2**attempt + random.random()
+                print(f"⏳ {name} rate limited, retrying in {backoff:.1f}s")
+                time.sleep(backoff)
+
+    if coalesce_key is None:
+        return _attempt()
+    return _coalescer.call((name, coalesce_key), _attempt)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Search Result Cache
+---------------------
+LRU cache for search results, tagged with the store generation they were
+computed at. Every store/delete bumps the generation (kept in the SQLite
+catalog, so writes from other processes count too), which makes all older
+entries stale without having to track which results a write affects.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class ResultCache:
+    """LRU of key -> (generation, results)."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[int, List[Dict[str, Any]]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, key: Hashable, generation: int) -> Optional[List[Dict[str, Any]]]:
+        """Cached results for ``key`` if they were computed at ``generation``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != generation:
+                del self._entries[key]
+                self.stale += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Shallow copies so callers can annotate results (e.g. scores)
+            return [dict(r) for r in entry[1]]
+
+    def put(self, key: Hashable, generation: int, results: List[Dict[str, Any]]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (generation, [dict(r) for r in results])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_evictions": self.stale,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
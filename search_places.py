@@ -26,6 +26,8 @@ def format_search_result(result: Dict[str, Any], show_document: bool = False) ->
 
     if distance is not None:
         lines.append(f"   Similarity: {1 - distance:.3f}")
+    if result.get("score") is not None:
+        lines.append(f"   Fused score: {result['score']:.4f}")
 
     if metadata.get("source_url"):
         lines.append(f"   Source: {metadata['source_url']}")
@@ -44,6 +46,14 @@ def main():
     )
     ap.add_argument("--by-name", action="store_true", help="Search by place name only")
     ap.add_argument("--by-genre", action="store_true", help="Search by genre only")
+    ap.add_argument(
+        "--hybrid",
+        action="store_true",
+        help="Fuse keyword (BM25) and semantic ranking",
+    )
+    ap.add_argument("--genre", help="Only rank places of this genre")
+    ap.add_argument("--city", help="Only rank places in this city")
+    ap.add_argument("--country", help="Only rank places in this country")
     ap.add_argument(
         "--show-document", action="store_true", help="Show full document text"
     )
@@ -77,7 +87,11 @@ def main():
     elif args.by_genre:
         results = store.search_by_genre(args.query, args.limit)
     else:
-        results = store.search(args.query, args.limit)
+        filters = {"genre": args.genre, "city": args.city, "country": args.country}
+        if args.hybrid:
+            results = store.search_hybrid(args.query, args.limit, filters)
+        else:
+            results = store.search(args.query, args.limit, filters)
 
     if not results:
         print("❌ No results found")
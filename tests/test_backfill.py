@@ -0,0 +1,113 @@
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_parser import (  # noqa: E402
+    BATCH_ENDPOINT,
+    parse_place_info_batch,
+    read_batch_results,
+    write_batch_requests,
+)
+
+DATA = Path(__file__).resolve().parent / "data"
+
+TEXTS = {
+    "reel-1": "Three Tokyo spots: Ichiran, Fuglen Tokyo and Meiji Shrine",
+    "reel-2": "Grabbing a slice at Joe's Pizza in New York",
+    "reel-3": "No places in this one",
+    "reel-4": "This request is rejected by the batch",
+    "reel-5": "This request never comes back",
+}
+
+
+class FakeBatchClient:
+    """Stands in for the OpenAI client, serving the canned batch files."""
+
+    def __init__(self, polls_before_done=1):
+        self.uploaded = None
+        self.polls_before_done = polls_before_done
+        self.files = SimpleNamespace(create=self._create_file, content=self._content)
+        self.batches = SimpleNamespace(
+            create=self._create_batch, retrieve=self._retrieve
+        )
+
+    def _create_file(self, file, purpose):
+        assert purpose == "batch"
+        self.uploaded = file.read().decode("utf-8")
+        return SimpleNamespace(id="file-input")
+
+    def _content(self, file_id):
+        name = {
+            "file-output": "batch_output.jsonl",
+            "file-errors": "batch_errors.jsonl",
+        }
+        return SimpleNamespace(text=(DATA / name[file_id]).read_text(encoding="utf-8"))
+
+    def _batch(self, status):
+        return SimpleNamespace(
+            id="batch-1",
+            status=status,
+            output_file_id="file-output" if status == "completed" else None,
+            error_file_id="file-errors" if status == "completed" else None,
+        )
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        assert input_file_id == "file-input"
+        assert endpoint == BATCH_ENDPOINT
+        return self._batch("validating")
+
+    def _retrieve(self, batch_id):
+        self.polls_before_done -= 1
+        return self._batch(
+            "completed" if self.polls_before_done <= 0 else "in_progress"
+        )
+
+
+def test_write_batch_requests_emits_one_line_per_text(tmp_path):
+    path = write_batch_requests(TEXTS, tmp_path / "input.jsonl")
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+    assert [line["custom_id"] for line in lines] == list(TEXTS)
+    for line, text in zip(lines, TEXTS.values()):
+        assert line["method"] == "POST"
+        assert line["url"] == BATCH_ENDPOINT
+        assert text in json.dumps(line["body"], ensure_ascii=False)
+
+
+def test_read_batch_results_parses_compilations_and_errors():
+    output = read_batch_results(
+        (DATA / "batch_output.jsonl").read_text(encoding="utf-8")
+    )
+    errors = read_batch_results(
+        (DATA / "batch_errors.jsonl").read_text(encoding="utf-8")
+    )
+
+    assert output["reel-1"].content_type == "Compilation"
+    assert [a.place_name for a in output["reel-1"].activities] == [
+        "Ichiran",
+        "Fuglen Tokyo",
+        "Meiji Shrine",
+    ]
+    assert [a.place_name for a in output["reel-2"].activities] == ["Joe's Pizza"]
+    # Unparseable model output and rejected requests both become errors
+    assert output["reel-3"].content_type == "Error"
+    assert errors["reel-4"].content_type == "Error"
+    assert errors["reel-4"].activities == []
+
+
+def test_parse_place_info_batch_round_trip():
+    client = FakeBatchClient(polls_before_done=2)
+    results = parse_place_info_batch(TEXTS, poll_interval=0, client=client)
+
+    uploaded = [json.loads(line) for line in client.uploaded.splitlines()]
+    assert [line["custom_id"] for line in uploaded] == list(TEXTS)
+
+    assert set(results) == set(TEXTS)
+    assert results["reel-1"].content_type == "Compilation"
+    assert len(results["reel-1"].activities) == 3
+    assert results["reel-2"].activities[0].place_name == "Joe's Pizza"
+    for custom_id in ("reel-3", "reel-4", "reel-5"):
+        assert results[custom_id].content_type == "Error"
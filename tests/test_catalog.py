@@ -0,0 +1,104 @@
+import hashlib
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from catalog import PlaceCatalog  # noqa: E402
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return PlaceCatalog(str(tmp_path / "catalog.sqlite"))
+
+
+def _place(genre, city="New York", created_at="2026-01-01T00:00:00"):
+    return {"genre": genre, "city": city, "country": "USA", "created_at": created_at}
+
+
+def test_upsert_and_delete_keep_counts_and_bump_generation(catalog):
+    start = catalog.generation()
+    gen = catalog.record_upsert([("a", _place("cafe")), ("b", _place("bar"))], 2)
+    assert gen == catalog.generation() == start + 1
+    assert catalog.total() == 2
+    assert catalog.count("CAFE") == 1
+
+    # Re-storing a place moves it between genres without changing the total
+    gen = catalog.record_upsert([("a", _place("bar", city="Tokyo"))], 1)
+    assert gen == start + 2
+    assert catalog.total() == 2
+    assert catalog.count("cafe") == 0
+    assert catalog.count("bar") == 2
+    stats = catalog.stats()
+    assert stats["city_distribution"] == {"New York": 1, "Tokyo": 1}
+    assert stats["ingest_by_day"][-1]["new_places"] == 2
+    assert stats["ingest_by_day"][-1]["activities"] == 3
+
+    gen = catalog.record_delete(["a", "missing"])
+    assert gen == start + 3
+    assert catalog.total() == 1
+    assert catalog.stats()["city_distribution"] == {"New York": 1}
+
+
+def test_rebuild_replaces_counts(catalog):
+    catalog.record_upsert([("a", _place("cafe")), ("b", _place("bar"))])
+    generation = catalog.generation()
+    catalog.rebuild([("c", _place("museum"))])
+    assert catalog.is_bootstrapped()
+    assert catalog.generation() == generation + 1
+    assert catalog.total() == 1
+    assert catalog.count("museum") == 1
+    assert [row[0] for row in catalog.page(10)] == ["c"]
+
+
+def test_page_orders_ties_by_id_and_resumes_after_cursor(catalog):
+    same = "2026-01-02T00:00:00"
+    catalog.record_upsert(
+        [
+            ("b", _place("cafe", created_at=same)),
+            ("a", _place("cafe", created_at=same)),
+            ("c", _place("bar", created_at=same)),
+            ("old", _place("cafe", created_at="2026-01-01T00:00:00")),
+        ]
+    )
+    assert [row[0] for row in catalog.page(10)] == ["c", "b", "a", "old"]
+
+    first = catalog.page(2)
+    rest = catalog.page(10, after=(first[-1][1], first[-1][0]))
+    assert [row[0] for row in first + rest] == ["c", "b", "a", "old"]
+
+    cafes = catalog.page(1, genre="Cafe")
+    more = catalog.page(10, after=(cafes[-1][1], cafes[-1][0]), genre="cafe")
+    assert [row[0] for row in cafes + more] == ["b", "a", "old"]
+
+
+def _fake_embed(texts):
+    vectors = []
+    for text in texts:
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        vectors.append([b / 255.0 for b in digest[:16]])
+    return vectors
+
+
+def test_store_rebuilds_drifted_catalog_on_open(tmp_path):
+    from vector_store import VectorStore
+
+    store = VectorStore(str(tmp_path / "db"), embedder=_fake_embed)
+    ids = store.store_results(
+        {
+            "activities": [
+                {"place_name": f"Place {i}", "genre": "cafe", "city": "Paris"}
+                for i in range(3)
+            ]
+        },
+        "https://example.com/reel",
+    )
+    # A crash between the Chroma write and the catalog update
+    store.collection.delete(ids=[ids[0]])
+    assert store.catalog.total() == 3
+
+    reopened = VectorStore(str(tmp_path / "db"), embedder=_fake_embed)
+    assert reopened.catalog.total() == reopened.collection.count() == 2
+    assert reopened.get_stats()["genre_distribution"] == {"cafe": 2}
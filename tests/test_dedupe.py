@@ -0,0 +1,107 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dedupe import is_near_duplicate, name_similarity, same_location  # noqa: E402
+
+NYC = {"city": "New York", "country": "USA"}
+NYC_META = {"city_norm": "new york", "country_norm": "usa"}
+
+
+@pytest.mark.parametrize(
+    "a, b, similar",
+    [
+        ("Joe's Pizza", "Joes Pizza", True),
+        ("Joe's Pizza", "Joes Pizza NYC", True),
+        ("Joe's Pizza", "Joe's Pizza 2", False),
+        ("Pier 39", "Pier 38", False),
+        ("Joe's Pizza", "Pizza", False),
+        ("Joe's Pizza", "Joe's Shanghai", False),
+    ],
+)
+def test_name_similarity(a, b, similar):
+    assert (name_similarity(a, b) >= 0.85) is similar
+
+
+@pytest.mark.parametrize(
+    "activity, metadata, same",
+    [
+        (NYC, NYC_META, True),
+        # Same city name, different country
+        (
+            {"city": "Paris", "country": "France"},
+            {"city_norm": "paris", "country_norm": "united states"},
+            False,
+        ),
+        # Spellings of one country agree
+        (NYC, {"city_norm": "new york", "country_norm": "united states"}, True),
+        # A missing city (and no coordinates) on either side never merges
+        ({"country": "USA"}, NYC_META, False),
+        (NYC, {"country_norm": "usa"}, False),
+        ({}, {}, False),
+        # Street-level coordinates about 0.3 km apart
+        (
+            {"lat": 40.7306, "lon": -74.0021, "geo_precision": "street"},
+            {"lat": 40.7330, "lon": -74.0041, "geo_precision": "street"},
+            True,
+        ),
+        # ... and about 2 km apart, even in the same city
+        (
+            {**NYC, "lat": 40.7306, "lon": -74.0021, "geo_precision": "street"},
+            {**NYC_META, "lat": 40.7486, "lon": -73.9997, "geo_precision": "street"},
+            False,
+        ),
+        # City-centroid coordinates fall back to comparing cities
+        (
+            {**NYC, "lat": 40.71, "lon": -74.0, "geo_precision": "city"},
+            {**NYC_META, "lat": 40.9, "lon": -74.2, "geo_precision": "city"},
+            True,
+        ),
+    ],
+)
+def test_same_location(activity, metadata, same):
+    assert same_location(activity, metadata) is same
+
+
+@pytest.mark.parametrize(
+    "activity, metadata, distance, merged",
+    [
+        (
+            {**NYC, "place_name": "Joes Pizza"},
+            {**NYC_META, "place_name": "Joe's Pizza"},
+            0.1,
+            True,
+        ),
+        # Too far apart in embedding space
+        (
+            {**NYC, "place_name": "Joes Pizza"},
+            {**NYC_META, "place_name": "Joe's Pizza"},
+            0.9,
+            False,
+        ),
+        # Numbered branches stay apart
+        (
+            {**NYC, "place_name": "Joe's Pizza 2"},
+            {**NYC_META, "place_name": "Joe's Pizza"},
+            0.1,
+            False,
+        ),
+        # Matches a stored alias
+        (
+            {**NYC, "place_name": "Joe's Pizza Carmine St"},
+            {
+                **NYC_META,
+                "place_name": "Joe's",
+                "aliases": '["Joe\'s Pizza Carmine St"]',
+            },
+            0.1,
+            True,
+        ),
+        ({"place_name": "Joes Pizza"}, {"place_name": "Joe's Pizza"}, 0.1, False),
+    ],
+)
+def test_is_near_duplicate(activity, metadata, distance, merged):
+    assert is_near_duplicate(activity, metadata, distance) is merged
@@ -0,0 +1,101 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from jobs import MAX_ATTEMPTS, JobQueue, JobStorer  # noqa: E402
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite"))
+
+
+def _age(queue, job_id, seconds):
+    """Pretend the job started ``seconds`` ago."""
+    started = (datetime.now() - timedelta(seconds=seconds)).isoformat()
+    queue._conn.execute(
+        "UPDATE jobs SET started_at = ? WHERE id = ?", (started, job_id)
+    )
+
+
+def test_dead_worker_job_is_requeued(queue):
+    job_id = queue.submit("url", "http://a", "http://a")
+    other = queue.submit("url", "http://b", "http://b")
+    assert queue.claim(101)["id"] == job_id
+    assert queue.claim(102)["id"] == other
+
+    assert queue.recover([101]) == 1
+    assert queue.get(job_id)["status"] == "queued"
+    assert queue.get(other)["status"] == "running"
+    # Nobody died and nothing timed out: a no-op
+    assert queue.recover([]) == 0
+    assert queue.get(other)["status"] == "running"
+
+
+def test_timed_out_job_is_requeued(queue):
+    job_id = queue.submit("url", "http://a", "http://a")
+    fresh = queue.submit("url", "http://b", "http://b")
+    assert queue.claim(101)["id"] == job_id
+    assert queue.claim(102)["id"] == fresh
+    _age(queue, job_id, 120)
+
+    assert queue.hung_workers(60) == [101]
+    assert queue.recover([], timeout=60) == 1
+    assert queue.get(job_id)["status"] == "queued"
+    assert queue.get(fresh)["status"] == "running"
+
+
+def test_timeout_at_max_attempts_fails_and_deletes_upload(queue, tmp_path):
+    upload = tmp_path / "clip.mp4"
+    upload.write_bytes(b"video")
+    job_id = queue.submit("upload", str(upload), "clip.mp4")
+    for attempt in range(MAX_ATTEMPTS):
+        queue.claim(100 + attempt)
+        _age(queue, job_id, 120)
+        queue.recover([], timeout=60)
+        if attempt < MAX_ATTEMPTS - 1:
+            assert queue.get(job_id)["status"] == "queued"
+            assert upload.exists()
+
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["attempts"] == MAX_ATTEMPTS
+    assert not upload.exists()
+
+
+def test_restart_requeues_running_and_restores_storing(queue):
+    running = queue.submit("url", "http://a", "http://a")
+    storing = queue.submit("url", "http://b", "http://b")
+    assert queue.claim(101)["id"] == running
+    assert queue.claim(102)["id"] == storing
+    queue.extracted(storing, {"activities": []})
+    assert queue.claim_extracted()["id"] == storing
+
+    assert queue.recover() == 1
+    assert queue.get(running)["status"] == "queued"
+    assert queue.get(storing)["status"] == "extracted"
+
+
+def test_storer_stores_and_fails(queue):
+    ok = queue.submit("url", "http://a", "http://a")
+    bad = queue.submit("url", "http://b", "http://b")
+    for job_id in (ok, bad):
+        queue.claim(101)
+        queue.extracted(job_id, {"source": job_id})
+
+    def store(summary, label):
+        if summary["source"] == bad:
+            raise RuntimeError("store failed")
+        return ["doc-1"]
+
+    storer = JobStorer(queue, store)
+    assert storer.step() and storer.step()
+    assert not storer.step()
+    assert queue.get(ok)["status"] == "done"
+    assert queue.get(ok)["doc_ids"] == ["doc-1"]
+    assert queue.get(bad)["status"] == "failed"
+    assert queue.get(bad)["error"] == "store failed"
@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import chromadb  # noqa: E402
+from chromadb.config import Settings  # noqa: E402
+
+from gazetteer import normalize_name  # noqa: E402
+from partitions import PartitionedCollection, collection_name  # noqa: E402
+
+
+def test_collection_names_are_unambiguous():
+    names = {
+        collection_name("united states", ""),
+        collection_name("united", "states"),
+        collection_name("united states", "ny"),
+        collection_name("日本", ""),
+        collection_name("한국", ""),
+        collection_name("россия", ""),
+        collection_name("", ""),
+    }
+    assert len(names) == 7
+    assert collection_name("", "") == "place_info-unknown"
+
+    long_a = collection_name("a" * 60, "")
+    long_b = collection_name("a" * 61, "")
+    assert long_a != long_b
+    for name in (long_a, long_b):
+        assert len(name) <= 63 and name[-1].isalnum()
+
+
+@pytest.fixture
+def partitioned(tmp_path):
+    client = chromadb.PersistentClient(
+        path=str(tmp_path / "db"), settings=Settings(anonymized_telemetry=False)
+    )
+    return PartitionedCollection(
+        client, str(tmp_path / "catalog.sqlite"), "country", {"hnsw:space": "l2"}
+    )
+
+
+def _upsert(collection, places):
+    collection.upsert(
+        ids=[doc_id for doc_id, _, _ in places],
+        embeddings=[vector for _, _, vector in places],
+        metadatas=[metadata for _, metadata, _ in places],
+        documents=[doc_id for doc_id, _, _ in places],
+    )
+
+
+def _meta(country, lat=None, lon=None):
+    metadata = {"country": country, "country_norm": normalize_name(country)}
+    if lat is not None:
+        metadata.update(lat=lat, lon=lon)
+    return metadata
+
+
+def test_upsert_routes_by_country_and_moves_on_change(partitioned):
+    _upsert(
+        partitioned,
+        [
+            ("nyc", _meta("USA", 40.7, -74.0), [1.0, 0.0]),
+            ("tokyo", _meta("Japan", 35.7, 139.7), [0.0, 1.0]),
+            ("kyoto", _meta("日本"), [0.1, 0.9]),
+            ("nowhere", _meta(""), [0.5, 0.5]),
+        ],
+    )
+    assert partitioned.stats() == {
+        collection_name("usa", ""): 1,
+        collection_name("japan", ""): 1,
+        collection_name("日本", ""): 1,
+        "place_info-unknown": 1,
+    }
+    assert partitioned.count() == 4
+
+    # A merge that changes the country moves the place
+    _upsert(partitioned, [("nyc", _meta("Japan", 35.6, 139.8), [1.0, 0.0])])
+    stats = partitioned.stats()
+    assert stats[collection_name("usa", "")] == 0
+    assert stats[collection_name("japan", "")] == 2
+    assert partitioned.count() == 4
+    assert partitioned.get(ids=["nyc"])["metadatas"][0]["country"] == "Japan"
+
+    # Country filters only visit that partition
+    assert partitioned._route({"country_norm": "japan"}) == [
+        collection_name("japan", "")
+    ]
+    japan = partitioned.get(where={"country_norm": "japan"})
+    assert sorted(japan["ids"]) == ["nyc", "tokyo"]
+    hits = partitioned.query([[1.0, 0.0]], n_results=2)
+    assert hits["ids"][0][0] == "nyc"
+
+
+def test_existing_partitions_keep_their_recorded_name(partitioned):
+    partitioned._conn.execute(
+        "INSERT INTO partitions (country, region, collection) "
+        "VALUES ('usa', '', 'place_info-usa-legacy')"
+    )
+    _upsert(partitioned, [("nyc", _meta("USA"), [1.0, 0.0])])
+    assert partitioned.stats() == {"place_info-usa-legacy": 1}
@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gazetteer import Gazetteer  # noqa: E402
+from pre_extractor import pre_extract  # noqa: E402
+
+# id, name, asciiname, alternates, lat, lon, class, code, country, cc2, admin1,
+# admin2, admin3, admin4, population
+_GEONAMES_ROWS = [
+    ("1", "Shibuya", "Shibuya", "", "35.66", "139.70", "P", "PPLA2", "JP", "", "40"),
+    ("2", "Nice", "Nice", "", "43.70", "7.27", "P", "PPLA2", "FR", "", "93"),
+    ("3", "Tokyo", "Tokyo", "", "35.69", "139.69", "P", "PPLC", "JP", "", "40"),
+]
+_POPULATIONS = ["230000", "340000", "8300000"]
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    path = tmp_path / "cities.txt"
+    path.write_text(
+        "".join(
+            "\t".join(row + ("", "", "", population)) + "\n"
+            for row, population in zip(_GEONAMES_ROWS, _POPULATIONS)
+        ),
+        encoding="utf-8",
+    )
+    (tmp_path / "countryInfo.txt").write_text(
+        "JP\tJPN\t392\tJA\tJapan\tTokyo\n", encoding="utf-8"
+    )
+    return Gazetteer.load(str(path))
+
+
+@pytest.mark.parametrize(
+    "caption, name",
+    [
+        ("📍 Katz's Delicatessen 🥪 best pastrami ever", "Katz's Delicatessen"),
+        ("📍 Prospect Park - Brooklyn", "Prospect Park"),
+        (
+            "📍 Dishoom Shoreditch, London — order the bacon naan roll",
+            "Dishoom Shoreditch",
+        ),
+        ("📍 Russ & Daughters – bagels forever", "Russ & Daughters"),
+        ("📍 Joe's Pizza! cheapest slice in town", "Joe's Pizza"),
+        ("Location: Fuglen Coffee Roasters, Tokyo", "Fuglen Coffee Roasters"),
+        ("📍 Museum of Ice Cream, NYC", "Museum of Ice Cream"),
+    ],
+)
+def test_pin_name_stops_at_emoji_separators_and_punctuation(caption, name):
+    assert pre_extract(caption).place_name == name
+
+
+def test_clean_pin_is_confident():
+    pre = pre_extract("📍 Joe's Pizza, NYC 🍕 @joespizzanyc")
+    assert pre.place_name == "Joe's Pizza"
+    assert pre.availability.city == "New York"
+    assert pre.confident
+
+
+def test_location_after_dash_is_still_found():
+    pre = pre_extract("📍 Prospect Park - Brooklyn")
+    assert pre.availability.city == "Brooklyn"
+
+
+@pytest.mark.parametrize(
+    "caption",
+    [
+        "📍 the best pizza place we tried this whole trip",
+        "📍 Pizza spot that locals swear by",
+        "📍 One Two Three Four Five Six Seven Pizza",
+    ],
+)
+def test_prose_pins_are_not_confident(caption):
+    assert not pre_extract(caption).confident
+
+
+def test_configured_gazetteer_resolves_places_the_aliases_lack(gazetteer):
+    assert pre_extract("📍 Ichiran, Shibuya 🍜").availability.city == ""
+
+    pre = pre_extract("📍 Ichiran, Shibuya 🍜", gazetteer=gazetteer)
+    assert pre.place_name == "Ichiran"
+    assert (pre.availability.city, pre.availability.country) == ("Shibuya", "Japan")
+    assert pre.confident
+
+
+def test_city_only_pin_from_gazetteer_is_not_a_venue(gazetteer):
+    pre = pre_extract("📍 Shibuya\n📍 Fuglen Coffee Roasters", gazetteer=gazetteer)
+    assert pre.place_name == "Fuglen Coffee Roasters"
+    assert not pre.compilation
+    assert pre.availability.city == "Shibuya"
+
+
+def test_aliases_are_the_fallback_when_gazetteer_misses(gazetteer):
+    pre = pre_extract("📍 Joe's Pizza, NYC 🍕", gazetteer=gazetteer)
+    assert pre.availability.city == "New York"
+
+
+def test_lowercase_words_do_not_match_gazetteer_places(gazetteer):
+    pre = pre_extract("📍 Joe's Pizza 🍕 such a nice slice", gazetteer=gazetteer)
+    assert pre.availability.city == ""
@@ -0,0 +1,179 @@
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ratelimit  # noqa: E402
+from ratelimit import TokenBucket, _is_rate_limit_error, call_limited  # noqa: E402
+
+
+class FakeClock:
+    """Stands in for the ``time`` module: sleeping just advances the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    monkeypatch.setattr(ratelimit.random, "random", lambda: 0.0)
+    return clock
+
+
+@pytest.fixture
+def bucket(tmp_path, clock, monkeypatch):
+    bucket = TokenBucket("test", rate=2.0, capacity=2, path=str(tmp_path / "rl.db"))
+    monkeypatch.setattr(ratelimit, "_buckets", {"test": bucket})
+    return bucket
+
+
+def test_bucket_allows_burst_then_refills(bucket, clock):
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0
+    # Idle time refills only up to capacity
+    clock.now += 60
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() > 0
+
+
+def test_acquire_waits_or_times_out(bucket, clock):
+    bucket.acquire()
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+    with pytest.raises(TimeoutError):
+        bucket.acquire(timeout=0.1)
+
+
+def test_buckets_share_state_through_the_database(bucket, tmp_path):
+    other = TokenBucket("test", rate=2.0, capacity=2, path=str(tmp_path / "rl.db"))
+    bucket.try_acquire()
+    other.try_acquire()
+    assert bucket.try_acquire() > 0
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class Response:
+    status_code = 429
+
+
+class HTTPError(Exception):
+    response = Response()
+
+
+@pytest.mark.parametrize(
+    "error, limited",
+    [
+        (RateLimitError("slow down"), True),
+        (HTTPError("Too Many Requests"), True),
+        (type("ApiError", (Exception,), {"status": "OVER_QUERY_LIMIT"})(), True),
+        (Exception("ERROR: HTTP Error 429: Too Many Requests"), True),
+        (
+            subprocess.CalledProcessError(
+                1, ["yt-dlp", "https://example.com/reel/4290"]
+            ),
+            False,
+        ),
+        (ValueError("expected 429 items"), False),
+        (ValueError("HTTP Error 4290"), False),
+    ],
+)
+def test_is_rate_limit_error(error, limited):
+    assert _is_rate_limit_error(error) is limited
+
+
+def test_call_limited_retries_rate_limits_with_backoff(bucket, clock):
+    calls = []
+
+    def flaky():
+        calls.append(clock.now)
+        if len(calls) < 3:
+            raise RateLimitError("slow down")
+        return "ok"
+
+    assert call_limited("test", flaky) == "ok"
+    assert len(calls) == 3
+    assert clock.sleeps[:2] == [1, 2]
+
+
+def test_call_limited_gives_up_after_retries(bucket, clock):
+    def throttled():
+        raise RateLimitError("slow down")
+
+    with pytest.raises(RateLimitError):
+        call_limited("test", throttled, retries=2)
+    assert [s for s in clock.sleeps if s >= 1] == [1, 2]
+
+
+def test_call_limited_does_not_retry_other_errors(bucket, clock):
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise subprocess.CalledProcessError(1, ["yt-dlp", "https://x.com/429"])
+
+    with pytest.raises(subprocess.CalledProcessError):
+        call_limited("test", broken)
+    assert calls == [1]
+
+
+def test_call_limited_coalesces_identical_calls(bucket, monkeypatch):
+    started, release, waiting = threading.Event(), threading.Event(), threading.Event()
+    calls = []
+
+    class WatchedFuture(Future):
+        def result(self, timeout=None):
+            waiting.set()
+            return super().result(timeout)
+
+    monkeypatch.setattr(ratelimit, "Future", WatchedFuture)
+
+    def slow(value):
+        calls.append(value)
+        started.set()
+        release.wait(5)
+        return value * 2
+
+    results = []
+    leader = threading.Thread(
+        target=lambda: results.append(call_limited("test", slow, 21, coalesce_key="k"))
+    )
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(
+        target=lambda: results.append(call_limited("test", slow, 21, coalesce_key="k"))
+    )
+    follower.start()
+    # Hold the leader's call open until the follower waits on its result
+    assert waiting.wait(5)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert results == [42, 42]
+    assert calls == [21]
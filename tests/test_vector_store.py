@@ -0,0 +1,84 @@
+import hashlib
+import math
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vector_store import VectorStore  # noqa: E402
+
+
+def _fake_embed(texts):
+    """Bag-of-words hashing embedder: shared words mean nearby vectors."""
+    vectors = []
+    for text in texts:
+        vector = [0.0] * 64
+        for word in re.findall(r"\w+", text.lower()):
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        vectors.append([x / norm for x in vector])
+    return vectors
+
+
+@pytest.fixture
+def store(tmp_path):
+    return VectorStore(str(tmp_path / "db"), embedder=_fake_embed, dedupe=False)
+
+
+def _place(name, genre, lat, lon, takeaways):
+    return {
+        "place_name": name,
+        "genre": genre,
+        "lat": lat,
+        "lon": lon,
+        "geo_precision": "street",
+        "address": f"{name} St",
+        "key_takeaways": takeaways,
+    }
+
+
+def test_ranked_nearby_search_widens_until_enough_inside(store):
+    # 30 strong matches just outside the radius (inside its bounding box),
+    # 5 weaker ones inside it
+    outside = [
+        _place(f"Coffee {i}", "coffee", 40.7077, -73.9899, ["coffee"])
+        for i in range(30)
+    ]
+    inside = [
+        _place(f"Tea House {i}", "tea", 40.7, -74.0, ["quiet", "coffee", "pastries"])
+        for i in range(5)
+    ]
+    store.store_results({"activities": outside + inside}, "https://example.com/r")
+
+    results = store.search_nearby(
+        40.7, -74.0, radius_km=1.0, query="coffee", n_results=5
+    )
+    assert sorted(r["metadata"]["place_name"] for r in results) == [
+        f"Tea House {i}" for i in range(5)
+    ]
+    assert all(r["distance_km"] <= 1.0 for r in results)
+
+
+@pytest.mark.parametrize("count, limit", [(6, 3), (7, 3), (3, 3), (0, 3)])
+def test_places_cursor_stops_at_the_last_page(store, count, limit):
+    store.store_results(
+        {
+            "activities": [
+                _place(f"Spot {i}", "cafe", None, None, []) for i in range(count)
+            ]
+        },
+        "https://example.com/r",
+    )
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = store.get_places_page(limit=limit, cursor=cursor)
+        pages += 1
+        seen.extend(p["metadata"]["place_name"] for p in page["places"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(f"Spot {i}" for i in range(count))
+    assert pages == max(1, math.ceil(count / limit))
@@ -4,22 +4,228 @@
 Uses ChromaDB to store and retrieve place information with semantic search capabilities.
 """
 
+import base64
+import bisect
+import gzip
 import json
+import os
+import threading
 import uuid
+from array import array
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
 import chromadb
 from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
+
+from embeddings import CachedEmbedder, make_embedder
+import geohash
+from catalog import PlaceCatalog
+from dedupe import is_near_duplicate, name_key
+from gazetteer import haversine_km, normalize_name
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from neighbors import NeighborTable, NeighborWorker
+from partitions import COLLECTION_PREFIX, PartitionedCollection
+from result_cache import ResultCache
+
+EXPORT_FORMAT = "place-store/1"
+
+# Query-less area searches page through the covering cells' places, and
+# ranked ones widen their fetch; both stop after this many candidates
+AREA_PAGE_SIZE = 500
+MAX_AREA_CANDIDATES = 10000
+
+# Fixed namespace so the same place always hashes to the same document id
+PLACE_NAMESPACE = uuid.UUID("6f1c2d4e-8a3b-5c7d-9e0f-1a2b3c4d5e6f")
+
+
+def place_identity(activity: Dict[str, Any]) -> str:
+    """Identity key for a place: normalized name plus location.
+
+    Coordinates (rounded to ~100 m) are preferred over the address text,
+    since two reels rarely spell the same address identically.
+    """
+    name = normalize_name(activity.get("place_name") or "")
+    lat, lon = activity.get("lat"), activity.get("lon")
+    # City/country centroids are shared by many venues, so only a
+    # street-level geocode identifies a place
+    street_level = (activity.get("geo_precision") or "street") == "street"
+    if lat is not None and lon is not None and street_level:
+        location = f"{float(lat):.3f},{float(lon):.3f}"
+    else:
+        location = normalize_name(activity.get("address") or "")
+    return f"{name}|{location}"
+
+
+def place_id(activity: Dict[str, Any]) -> str:
+    """Deterministic document id for a place."""
+    return str(uuid.uuid5(PLACE_NAMESPACE, place_identity(activity)))
+
+
+# Structured filter name -> normalized metadata field it matches
+FILTER_FIELDS = {
+    "genre": "genre_norm",
+    "city": "city_norm",
+    "country": "country_norm",
+}
+
+
+def build_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Translate {genre, city, country} filters into a Chroma ``where`` clause.
+
+    Values are normalized like the stored ``*_norm`` fields, so matching is
+    case- and accent-insensitive; a list value matches any of its items.
+    """
+    clauses = []
+    for name, value in (filters or {}).items():
+        if name not in FILTER_FIELDS or value in (None, "", []):
+            continue
+        field = FILTER_FIELDS[name]
+        if isinstance(value, (list, tuple, set)):
+            clauses.append({field: {"$in": [normalize_name(v) for v in value]}})
+        else:
+            clauses.append({field: normalize_name(value)})
+    return and_where(*clauses)
+
+
+def and_where(*clauses: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Combine ``where`` clauses, dropping empty ones."""
+    clauses = [c for c in clauses if c]
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+# Lower is more precise; decides which coordinates win when records merge
+GEO_PRECISION_RANK = {"street": 0, "city": 1, "country": 2}
+
+
+class PrefixIndex:
+    """Sorted (normalized key, id) pairs searched with bisect."""
+
+    def __init__(self):
+        self._pairs: List[Tuple[str, str]] = []
+        self._keys: Dict[str, str] = {}
+
+    def load(self, items: List[Tuple[str, str]]):
+        """Bulk-load (doc id, key) pairs into an empty index."""
+        self._keys = {doc_id: key for doc_id, key in items if key}
+        self._pairs = sorted((key, doc_id) for doc_id, key in self._keys.items())
+
+    def add(self, doc_id: str, key: str):
+        self.remove(doc_id)
+        if key:
+            bisect.insort(self._pairs, (key, doc_id))
+            self._keys[doc_id] = key
+
+    def remove(self, doc_id: str):
+        key = self._keys.pop(doc_id, None)
+        if key is not None:
+            i = bisect.bisect_left(self._pairs, (key, doc_id))
+            if i < len(self._pairs) and self._pairs[i] == (key, doc_id):
+                del self._pairs[i]
+
+    def prefix(self, prefix: str, limit: int) -> List[str]:
+        """Ids whose key starts with ``prefix``, in key order."""
+        lo = bisect.bisect_left(self._pairs, (prefix,))
+        hi = bisect.bisect_left(self._pairs, (prefix + "\uffff",), lo)
+        return [doc_id for _, doc_id in self._pairs[lo : min(hi, lo + limit)]]
+
+
+def _cache_key(kind: str, query: str, n_results: int, filters=None, *extra) -> Tuple:
+    """Result cache key: (kind, query, limit, canonical filters, extras)."""
+    return (kind, query, n_results, json.dumps(filters or {}, sort_keys=True), *extra)
+
+
+def encode_cursor(created_at: str, doc_id: str) -> str:
+    """Opaque pagination cursor for the row after (created_at, id)."""
+    raw = json.dumps([created_at, doc_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    try:
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return str(created_at), str(doc_id)
+
+
+def _open_dump(path: str, mode: str):
+    """Open an export file as text, gzip-compressed when it ends in .gz."""
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _pack_vector(vector) -> str:
+    """float32 vector -> base64 (exact and ~3x smaller than JSON floats)."""
+    return base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+
+
+def _unpack_vector(packed: str) -> List[float]:
+    vector = array("f")
+    vector.frombytes(base64.b64decode(packed))
+    return vector.tolist()
+
+
+def _json_list(metadata: Dict[str, Any], key: str) -> List[str]:
+    """Decode a list stored as a JSON string in Chroma metadata."""
+    try:
+        value = json.loads(metadata.get(key) or "[]")
+    except (TypeError, ValueError):
+        return []
+    return value if isinstance(value, list) else []
+
+
+def _merge_unique(old: List[str], new: List[str]) -> List[str]:
+    """Append items from ``new`` not already in ``old`` (case-insensitive)."""
+    merged = list(old)
+    seen = {item.strip().lower() for item in merged}
+    for item in new:
+        key = (item or "").strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            merged.append(item)
+    return merged
 
 
 class VectorStore:
     """Vector database for storing and retrieving place information."""
 
-    def __init__(self, persist_directory: str = "./chroma_db"):
-        """Initialize the vector store with ChromaDB."""
+    def __init__(
+        self,
+        persist_directory: str = "./chroma_db",
+        embedder=None,
+        embedding_cache_size: int = 4096,
+        embedding_cache_path: Optional[str] = None,
+        result_cache_size: int = 1024,
+        dedupe: bool = True,
+        similar_k: int = 10,
+        partition_by: Optional[str] = None,
+    ):
+        """Initialize the vector store with ChromaDB.
+
+        Args:
+            persist_directory: Where ChromaDB keeps its files
+            embedder: Callable mapping a list of texts to a list of vectors
+                (defaults to the $EMBEDDING_BACKEND backend: batched
+                all-MiniLM-L6-v2 in PyTorch, or its int8 ONNX export)
+            embedding_cache_size: In-memory LRU entries for repeated texts
+            embedding_cache_path: Optional SQLite file for a persistent
+                embedding cache shared across runs (default: $EMBEDDING_CACHE_PATH)
+            result_cache_size: Search results kept in an LRU that every
+                store/delete invalidates (0 disables it)
+            dedupe: Merge incoming places into near-duplicate stored ones
+                (similar name and embedding, same location)
+            similar_k: Neighbours kept per place in the precomputed
+                similar-places table
+            partition_by: "country" or "region" (country + state) to keep
+                one collection per area instead of the single place_info
+                collection (default: $PLACE_PARTITION_BY)
+        """
         self.persist_directory = Path(persist_directory)
         self.persist_directory.mkdir(exist_ok=True)
 
@@ -29,16 +235,217 @@ class VectorStore:
             settings=Settings(anonymized_telemetry=False),
         )
 
-        # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name="place_info",
-            metadata={"description": "Place information extracted from videos"},
+        # Embeddings are always passed explicitly, so the collection gets no
+        # embedding function and Chroma never loads its own default model
+        self.embedder = CachedEmbedder(
+            embedder or make_embedder(),
+            max_entries=embedding_cache_size,
+            disk_path=embedding_cache_path or os.getenv("EMBEDDING_CACHE_PATH"),
         )
 
-        # Initialize sentence transformer for embeddings
-        self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+        # Get or create collection (or the per-region partitions, which
+        # answer the same get/query/upsert/delete calls)
+        metadata = {"description": "Place information extracted from videos"}
+        self.partition_by = partition_by or os.getenv("PLACE_PARTITION_BY") or None
+        self._check_layout()
+        if self.partition_by:
+            self.collection = PartitionedCollection(
+                self.client,
+                str(self.persist_directory / "catalog.sqlite"),
+                self.partition_by,
+                metadata,
+            )
+        else:
+            self.collection = self.client.get_or_create_collection(
+                name=COLLECTION_PREFIX, metadata=metadata, embedding_function=None
+            )
 
-    def _create_document_text(self, activity: Dict[str, Any]) -> str:
+        # Exact aggregates (and ingest order) live in a SQLite side table,
+        # updated right after each Chroma write. Stores created before it
+        # existed are backfilled once, and a catalog that drifted (a process
+        # died between the two writes) is rebuilt on open
+        self.catalog = PlaceCatalog(str(self.persist_directory / "catalog.sqlite"))
+        if not self.catalog.is_bootstrapped():
+            self.catalog.rebuild(self._iter_metadata())
+        elif self.catalog.total() != self.collection.count():
+            print(
+                f"⚠️  Catalog out of sync ({self.catalog.total()} places, "
+                f"collection has {self.collection.count()}); rebuilding"
+            )
+            self.catalog.rebuild(self._iter_metadata())
+
+        # Prefix indexes over normalized name/genre and a BM25 index over
+        # document text, loaded on first use and reloaded whenever the
+        # catalog generation shows a write this instance didn't apply
+        self._name_index = PrefixIndex()
+        self._genre_index = PrefixIndex()
+        self._lexical_index = BM25Index()
+        self._indexed_generation: Optional[int] = None
+        self._index_lock = threading.Lock()
+
+        self.result_cache = ResultCache(result_cache_size)
+        self.dedupe = dedupe
+
+        # Precomputed "more like this" lists; writes only queue places,
+        # a worker started with start_similar_worker() recomputes them
+        self.neighbors = NeighborTable(
+            str(self.persist_directory / "catalog.sqlite"), similar_k
+        )
+        self._neighbor_worker: Optional[NeighborWorker] = None
+
+    def _check_layout(self):
+        """Refuse to open a store written with the other partitioning mode."""
+        names = [c.name for c in self.client.list_collections()]
+        if self.partition_by:
+            if (
+                COLLECTION_PREFIX in names
+                and self.client.get_collection(COLLECTION_PREFIX).count()
+            ):
+                raise ValueError(
+                    f"{self.persist_directory} holds an unpartitioned store; "
+                    "export it with manage_store.py and import it into a new "
+                    "partitioned directory"
+                )
+        elif any(name.startswith(COLLECTION_PREFIX + "-") for name in names):
+            raise ValueError(
+                f"{self.persist_directory} holds a partitioned store; "
+                "open it with partition_by (or $PLACE_PARTITION_BY) set"
+            )
+
+    def _iter_metadata(self, page: int = 5000):
+        """Yield (id, metadata) for every stored place, a page at a time."""
+        offset = 0
+        while True:
+            batch = self.collection.get(
+                include=["metadatas"], limit=page, offset=offset
+            )
+            yield from zip(batch["ids"], batch["metadatas"])
+            if len(batch["ids"]) < page:
+                return
+            offset += page
+
+    def _ensure_indexes(self):
+        """(Re)build the in-memory indexes if they miss any write."""
+        generation = self.catalog.generation()
+        with self._index_lock:
+            if self._indexed_generation == generation:
+                return
+            self._lexical_index = BM25Index()
+            names, genres = [], []
+            offset, page = 0, 5000
+            while True:
+                batch = self.collection.get(
+                    include=["metadatas", "documents"], limit=page, offset=offset
+                )
+                for doc_id, metadata, document in zip(
+                    batch["ids"], batch["metadatas"], batch["documents"]
+                ):
+                    names.append((doc_id, metadata.get("name_norm", "")))
+                    genres.append((doc_id, metadata.get("genre_norm", "")))
+                    self._lexical_index.add(doc_id, document or "")
+                if len(batch["ids"]) < page:
+                    break
+                offset += page
+            self._name_index.load(names)
+            self._genre_index.load(genres)
+            self._indexed_generation = generation
+
+    def _index_records(
+        self, ids: List[str], metadatas: List[Dict[str, Any]], documents: List[str]
+    ):
+        """Add or refresh records in the in-memory indexes."""
+        for doc_id, metadata, document in zip(ids, metadatas, documents):
+            self._name_index.add(doc_id, metadata.get("name_norm", ""))
+            self._genre_index.add(doc_id, metadata.get("genre_norm", ""))
+            self._lexical_index.add(doc_id, document or "")
+
+    def _unindex_records(self, ids: List[str]):
+        """Drop records from the in-memory indexes."""
+        for doc_id in ids:
+            self._name_index.remove(doc_id)
+            self._genre_index.remove(doc_id)
+            self._lexical_index.remove(doc_id)
+
+    def _after_upsert(
+        self,
+        ids: List[str],
+        metadatas: List[Dict[str, Any]],
+        documents: List[str],
+        activities: int = 0,
+    ):
+        """Keep derived indexes and aggregates in step with an upsert."""
+        generation = self.catalog.record_upsert(list(zip(ids, metadatas)), activities)
+        with self._index_lock:
+            # Apply in place only if no other writer got in between;
+            # otherwise the next lookup reloads from the collection
+            if self._indexed_generation == generation - 1:
+                self._index_records(ids, metadatas, documents)
+                self._indexed_generation = generation
+        self._queue_neighbors(ids, "changed")
+
+    def _after_delete(self, ids: List[str]):
+        """Keep derived indexes and aggregates in step with a delete."""
+        generation = self.catalog.record_delete(ids)
+        with self._index_lock:
+            if self._indexed_generation == generation - 1:
+                self._unindex_records(ids)
+                self._indexed_generation = generation
+        self._queue_neighbors(ids, "deleted")
+
+    def _queue_neighbors(self, ids: List[str], kind: str):
+        self.neighbors.mark(ids, kind)
+        if self._neighbor_worker is not None:
+            self._neighbor_worker.notify()
+
+    def _cached(self, key: Tuple, compute) -> List[Dict[str, Any]]:
+        """Serve ``key`` from the result cache unless the store has changed."""
+        generation = self.catalog.generation()
+        results = self.result_cache.get(key, generation)
+        if results is None:
+            results = compute()
+            self.result_cache.put(key, generation, results)
+        return results
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts with the store's embedding function."""
+        return self.embedder(texts)
+
+    def _format_query_results(
+        self, results: Dict[str, Any], query_index: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Flatten one query of a Chroma query response into matches."""
+        i = query_index
+        matches = []
+        if results["documents"] and results["documents"][i]:
+            for j, doc in enumerate(results["documents"][i]):
+                match = {
+                    "document": doc,
+                    "metadata": results["metadatas"][i][j],
+                    "distance": results["distances"][i][j]
+                    if results["distances"]
+                    else None,
+                    "id": results["ids"][i][j],
+                }
+                matches.append(match)
+
+        return matches
+
+    def _format_get_results(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Flatten a Chroma get response into records (no distance: not ranked)."""
+        records = []
+        for i, doc_id in enumerate(results["ids"]):
+            records.append(
+                {
+                    "document": results["documents"][i],
+                    "metadata": results["metadatas"][i],
+                    "distance": None,
+                    "id": doc_id,
+                }
+            )
+        return records
+
+    @staticmethod
+    def _create_document_text(activity: Dict[str, Any]) -> str:
         """Create a searchable text document from activity data."""
         parts = []
 
@@ -46,6 +453,9 @@ class VectorStore:
         if activity.get("place_name"):
             parts.append(f"Place: {activity['place_name']}")
 
+        if activity.get("aliases"):
+            parts.append("Also known as: " + ", ".join(activity["aliases"]))
+
         if activity.get("genre"):
             parts.append(f"Genre: {activity['genre']}")
 
@@ -66,20 +476,107 @@ class VectorStore:
         self, activity: Dict[str, Any], source_url: str = None
     ) -> Dict[str, Any]:
         """Create metadata for the vector store entry."""
+        takeaways = activity.get("key_takeaways") or []
+        source_urls = activity.get("source_urls") or (
+            [source_url] if source_url else []
+        )
+        now = datetime.now().isoformat()
         metadata = {
-            "place_name": activity.get("place_name", ""),
-            "genre": activity.get("genre", ""),
-            "category_detail": activity.get("category_detail", ""),
-            "address": activity.get("address", ""),
-            "takeaways_count": len(activity.get("key_takeaways", [])),
-            "timestamp": datetime.now().isoformat(),
+            "place_name": activity.get("place_name") or "",
+            "genre": activity.get("genre") or "",
+            "category_detail": activity.get("category_detail") or "",
+            "address": activity.get("address") or "",
+            "city": activity.get("city") or "",
+            "state": activity.get("state") or "",
+            "country": activity.get("country") or "",
+            # Normalized copies back exact/prefix lookups and ``where`` filters
+            "name_norm": normalize_name(activity.get("place_name") or ""),
+            "genre_norm": normalize_name(activity.get("genre") or ""),
+            "city_norm": normalize_name(activity.get("city") or ""),
+            "country_norm": normalize_name(activity.get("country") or ""),
+            "takeaways_count": len(takeaways),
+            # Chroma metadata values are scalars, so lists are stored as JSON
+            "key_takeaways": json.dumps(takeaways),
+            "source_urls": json.dumps(source_urls),
+            "aliases": json.dumps(activity.get("aliases") or []),
+            "created_at": activity.get("created_at") or now,
+            "timestamp": now,
         }
 
-        if source_url:
-            metadata["source_url"] = source_url
+        if source_url or source_urls:
+            metadata["source_url"] = source_url or source_urls[-1]
+
+        # Chroma rejects None values, so coordinates are only set when known
+        lat, lon = activity.get("lat"), activity.get("lon")
+        if lat is not None and lon is not None:
+            metadata["lat"], metadata["lon"] = float(lat), float(lon)
+            metadata["geo_precision"] = activity.get("geo_precision") or "street"
+            # Geohash prefixes back radius / bounding-box filters
+            full = geohash.encode(float(lat), float(lon), 6)
+            for precision in geohash.INDEXED_PRECISIONS:
+                metadata[f"gh{precision}"] = full[:precision]
 
         return metadata
 
+    def _merge_activity(
+        self,
+        existing: Optional[Dict[str, Any]],
+        activity: Dict[str, Any],
+        source_url: Optional[str],
+    ) -> Dict[str, Any]:
+        """Fold a new activity into an existing record's metadata.
+
+        The first-seen place name stays canonical, other new non-empty
+        fields win; takeaways and source URLs accumulate without duplicates
+        and the original ingest time is preserved.
+        """
+        existing = existing or {}
+        merged = {
+            field: activity.get(field) or existing.get(field) or ""
+            for field in (
+                "genre",
+                "category_detail",
+                "address",
+                "city",
+                "state",
+                "country",
+            )
+        }
+        merged["place_name"] = existing.get("place_name") or activity.get("place_name")
+        # Other spellings seen for the same place stay searchable
+        aliases = _json_list(existing, "aliases")
+        new_name = activity.get("place_name") or ""
+        if name_key(new_name) != name_key(merged["place_name"] or ""):
+            aliases = _merge_unique(aliases, [new_name])
+        merged["aliases"] = aliases
+        merged["key_takeaways"] = _merge_unique(
+            _json_list(existing, "key_takeaways"), activity.get("key_takeaways") or []
+        )
+        old_urls = _json_list(existing, "source_urls")
+        if not old_urls and existing.get("source_url"):
+            old_urls = [existing["source_url"]]
+        merged["source_urls"] = _merge_unique(
+            old_urls, [source_url] if source_url else []
+        )
+        merged["created_at"] = existing.get("created_at") or existing.get("timestamp")
+
+        # Keep whichever coordinates came from the more precise geocode
+        sources = [
+            src
+            for src in (activity, existing)
+            if src.get("lat") is not None and src.get("lon") is not None
+        ]
+        if sources:
+            best = min(
+                sources,
+                key=lambda src: GEO_PRECISION_RANK.get(
+                    src.get("geo_precision") or "street", 0
+                ),
+            )
+            merged["lat"], merged["lon"] = best["lat"], best["lon"]
+            merged["geo_precision"] = best.get("geo_precision") or "street"
+        return merged
+
     def store_results(
         self, results: Dict[str, Any], source_url: str = None
     ) -> List[str]:
@@ -96,144 +593,605 @@ class VectorStore:
         if not activities:
             return []
 
-        document_ids = []
-        documents = []
-        metadatas = []
+        # Collapse repeats within this batch onto one id, keeping input order
+        document_ids = [place_id(activity) for activity in activities]
+        merged: Dict[str, Dict[str, Any]] = {}
+        existing = self.collection.get(ids=list(dict.fromkeys(document_ids)))
+        for doc_id, metadata in zip(existing["ids"], existing["metadatas"] or []):
+            merged[doc_id] = metadata
 
-        for activity in activities:
-            # Create unique ID
-            doc_id = str(uuid.uuid4())
-            document_ids.append(doc_id)
+        # Places not known under their exact identity may still be stored
+        # under another spelling; redirect those to the canonical record
+        fresh = [i for i, doc_id in enumerate(document_ids) if doc_id not in merged]
+        if self.dedupe and fresh:
+            matches = self._find_near_duplicates([activities[i] for i in fresh])
+            for i, match in zip(fresh, matches):
+                if match is not None:
+                    document_ids[i] = match["id"]
+                    merged.setdefault(match["id"], match["metadata"])
 
-            # Create searchable text
-            doc_text = self._create_document_text(activity)
-            documents.append(doc_text)
+        known = set(merged)
+        for doc_id, activity in zip(document_ids, activities):
+            merged[doc_id] = self._create_metadata(
+                self._merge_activity(merged.get(doc_id), activity, source_url)
+            )
 
-            # Create metadata
-            metadata = self._create_metadata(activity, source_url)
-            metadatas.append(metadata)
+        ids = list(dict.fromkeys(document_ids))
+        metadatas = [merged[doc_id] for doc_id in ids]
+        documents = [
+            self._create_document_text(
+                {
+                    **metadata,
+                    "key_takeaways": _json_list(metadata, "key_takeaways"),
+                    "aliases": _json_list(metadata, "aliases"),
+                }
+            )
+            for metadata in metadatas
+        ]
 
-        # Add to collection
-        self.collection.add(documents=documents, metadatas=metadatas, ids=document_ids)
+        # Upsert so reprocessing a reel, or a new reel of a known place,
+        # updates the existing record instead of adding another vector
+        self.collection.upsert(
+            documents=documents,
+            embeddings=self._embed(documents),
+            metadatas=metadatas,
+            ids=ids,
+        )
+        self._after_upsert(ids, metadatas, documents, activities=len(activities))
+
+        merged_count = sum(1 for doc_id in document_ids if doc_id in known)
+        print(
+            f"✅ Stored {len(activities)} activities in vector database "
+            f"({merged_count} merged into existing places)"
+        )
+        return ids
 
-        print(f"✅ Stored {len(activities)} activities in vector database")
-        return document_ids
+    def _find_near_duplicates(
+        self, activities: List[Dict[str, Any]], candidates: int = 5
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Stored record each activity duplicates, if any.
+
+        One batched ANN query fetches the nearest few stored places per
+        activity, so the cost stays flat as the store grows; the name and
+        location heuristics in ``dedupe`` then decide.
+        """
+        count = self.collection.count()
+        if not count:
+            return [None] * len(activities)
+        documents = [self._create_document_text(a) for a in activities]
+        results = self.collection.query(
+            query_embeddings=self._embed(documents),
+            n_results=min(candidates, count),
+        )
+        matches = []
+        for i, activity in enumerate(activities):
+            match = None
+            for candidate in self._format_query_results(results, i):
+                if is_near_duplicate(
+                    activity, candidate["metadata"], candidate["distance"]
+                ):
+                    match = candidate
+                    break
+            matches.append(match)
+        return matches
 
-    def search(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+    def search(
+        self,
+        query: str,
+        n_results: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
         """Search for places using semantic similarity.
 
         Args:
             query: Search query
             n_results: Number of results to return
+            filters: Optional {genre, city, country} constraints, applied
+                before ranking
 
         Returns:
             List of matching activities with metadata and scores
         """
-        results = self.collection.query(query_texts=[query], n_results=n_results)
 
-        matches = []
-        if results["documents"] and results["documents"][0]:
-            for i, doc in enumerate(results["documents"][0]):
-                match = {
-                    "document": doc,
-                    "metadata": results["metadatas"][0][i],
-                    "distance": results["distances"][0][i]
-                    if results["distances"]
-                    else None,
-                    "id": results["ids"][0][i],
-                }
-                matches.append(match)
+        def _search():
+            results = self.collection.query(
+                query_embeddings=self._embed([query]),
+                n_results=n_results,
+                where=build_where(filters),
+            )
+            return self._format_query_results(results)
 
-        return matches
+        return self._cached(_cache_key("semantic", query, n_results, filters), _search)
 
-    def search_by_place_name(
-        self, place_name: str, n_results: int = 5
+    def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Run many semantic searches at once.
+
+        All distinct queries are embedded in one batch and sent to Chroma as
+        a single multi-vector query; results are keyed by query text.
+        Queries already in the result cache skip both steps.
+        """
+        unique = list(dict.fromkeys(q for q in queries if q))
+        generation = self.catalog.generation()
+        found = {}
+        for query in unique:
+            cached = self.result_cache.get(
+                _cache_key("semantic", query, n_results, filters), generation
+            )
+            if cached is not None:
+                found[query] = cached
+
+        missing = [query for query in unique if query not in found]
+        if missing:
+            results = self.collection.query(
+                query_embeddings=self._embed(missing),
+                n_results=n_results,
+                where=build_where(filters),
+            )
+            for i, query in enumerate(missing):
+                found[query] = self._format_query_results(results, i)
+                self.result_cache.put(
+                    _cache_key("semantic", query, n_results, filters),
+                    generation,
+                    found[query],
+                )
+        return {query: found[query] for query in unique}
+
+    def search_hybrid(
+        self,
+        query: str,
+        n_results: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        candidates: int = 50,
     ) -> List[Dict[str, Any]]:
-        """Search for places by name using exact matching."""
-        results = self.collection.query(
-            query_texts=[f"Place: {place_name}"], n_results=n_results
+        """Fuse BM25 and vector rankings with reciprocal rank fusion.
+
+        Each side contributes its top ``candidates``; lexical hits are
+        checked against ``filters`` before fusion, and every result carries
+        its fused ``score`` (plus the vector ``distance`` when it had one).
+        """
+        return self._cached(
+            _cache_key("hybrid", query, n_results, filters, candidates),
+            lambda: self._search_hybrid(query, n_results, filters, candidates),
         )
 
-        matches = []
-        if results["documents"] and results["documents"][0]:
-            for i, doc in enumerate(results["documents"][0]):
-                match = {
-                    "document": doc,
-                    "metadata": results["metadatas"][0][i],
-                    "distance": results["distances"][0][i]
-                    if results["distances"]
-                    else None,
-                    "id": results["ids"][0][i],
-                }
-                matches.append(match)
+    def _search_hybrid(
+        self,
+        query: str,
+        n_results: int,
+        filters: Optional[Dict[str, Any]],
+        candidates: int,
+    ) -> List[Dict[str, Any]]:
+        self._ensure_indexes()
+        candidates = max(candidates, n_results)
+        where = build_where(filters)
 
-        return matches
+        vector = self._format_query_results(
+            self.collection.query(
+                query_embeddings=self._embed([query]),
+                n_results=candidates,
+                where=where,
+            )
+        )
+        by_id = {r["id"]: r for r in vector}
 
-    def search_by_genre(self, genre: str, n_results: int = 10) -> List[Dict[str, Any]]:
-        """Search for places by genre."""
-        results = self.collection.query(
-            query_texts=[f"Genre: {genre}"], n_results=n_results
+        with self._index_lock:
+            lexical_ids = [
+                doc_id for doc_id, _ in self._lexical_index.search(query, candidates)
+            ]
+        missing = [doc_id for doc_id in lexical_ids if doc_id not in by_id]
+        if missing:
+            fetched = self.collection.get(ids=missing, where=where)
+            for record in self._format_get_results(fetched):
+                by_id[record["id"]] = {**record, "distance": None}
+            lexical_ids = [doc_id for doc_id in lexical_ids if doc_id in by_id]
+
+        fused = reciprocal_rank_fusion([[r["id"] for r in vector], lexical_ids])
+        return [
+            {**by_id[doc_id], "score": score} for doc_id, score in fused[:n_results]
+        ]
+
+    def _search_area(
+        self,
+        bbox: Tuple[float, float, float, float],
+        distance_from: Optional[Tuple[float, float]],
+        max_km: Optional[float],
+        query: Optional[str],
+        n_results: int,
+        filters: Optional[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Places inside ``bbox`` (and ``max_km`` of ``distance_from``)."""
+        precision, cells = geohash.best_cover(*bbox)
+        where = and_where({f"gh{precision}": {"$in": cells}}, build_where(filters))
+
+        min_lat, min_lon, max_lat, max_lon = bbox
+
+        def keep(record: Dict[str, Any]) -> bool:
+            lat, lon = record["metadata"].get("lat"), record["metadata"].get("lon")
+            if lat is None or lon is None:
+                return False
+            if distance_from is not None:
+                km = haversine_km(distance_from[0], distance_from[1], lat, lon)
+                if max_km is not None and km > max_km:
+                    return False
+                record["distance_km"] = km
+                return True
+            return min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+
+        if query:
+            # Over-fetch: cells overhang the box, so some hits get trimmed.
+            # Grow the fetch until enough survive or the cells run out
+            embedding = self._embed([query])
+            fetch = n_results * 3
+            while True:
+                records = self._format_query_results(
+                    self.collection.query(
+                        query_embeddings=embedding, n_results=fetch, where=where
+                    )
+                )
+                inside = [record for record in records if keep(record)]
+                if (
+                    len(inside) >= n_results
+                    or len(records) < fetch
+                    or fetch >= MAX_AREA_CANDIDATES
+                ):
+                    break
+                fetch = min(fetch * 4, MAX_AREA_CANDIDATES)
+        else:
+            # A box search can stop once it has enough places; a radius
+            # search has to see every candidate to return the nearest
+            inside = []
+            for offset in range(0, MAX_AREA_CANDIDATES, AREA_PAGE_SIZE):
+                page = self._format_get_results(
+                    self.collection.get(
+                        where=where, limit=AREA_PAGE_SIZE, offset=offset
+                    )
+                )
+                inside.extend(record for record in page if keep(record))
+                if len(page) < AREA_PAGE_SIZE:
+                    break
+                if distance_from is None and len(inside) >= n_results:
+                    break
+
+        if not query and distance_from is not None:
+            inside.sort(key=lambda r: r["distance_km"])
+        return inside[:n_results]
+
+    def search_nearby(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float = 5.0,
+        query: Optional[str] = None,
+        n_results: int = 20,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Places within ``radius_km`` of a point.
+
+        Without a query results are nearest first; with one they are ranked
+        semantically among the places inside the radius. Each result has a
+        ``distance_km``.
+        """
+        return self._search_area(
+            geohash.radius_bbox(lat, lon, radius_km),
+            (lat, lon),
+            radius_km,
+            query,
+            n_results,
+            filters,
         )
 
-        matches = []
-        if results["documents"] and results["documents"][0]:
-            for i, doc in enumerate(results["documents"][0]):
-                match = {
-                    "document": doc,
-                    "metadata": results["metadatas"][0][i],
-                    "distance": results["distances"][0][i]
-                    if results["distances"]
-                    else None,
-                    "id": results["ids"][0][i],
-                }
-                matches.append(match)
+    def search_bbox(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        query: Optional[str] = None,
+        n_results: int = 100,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Places inside a bounding box (e.g. the visible map region)."""
+        return self._search_area(
+            (min_lat, min_lon, max_lat, max_lon), None, None, query, n_results, filters
+        )
 
-        return matches
+    def _lookup(
+        self, field: str, index: PrefixIndex, value: str, n_results: int, prefix: bool
+    ) -> List[Dict[str, Any]]:
+        """Exact metadata match on ``field``, topped up with prefix matches."""
+        key = normalize_name(value)
+        if not key:
+            return []
+        exact = self._format_get_results(
+            self.collection.get(where={field: key}, limit=n_results)
+        )
+        if not prefix or len(exact) >= n_results:
+            return exact
+
+        self._ensure_indexes()
+        seen = {r["id"] for r in exact}
+        extra = [i for i in index.prefix(key, n_results + len(seen)) if i not in seen]
+        extra = extra[: n_results - len(exact)]
+        if not extra:
+            return exact
+        found = {
+            r["id"]: r for r in self._format_get_results(self.collection.get(ids=extra))
+        }
+        return exact + [found[i] for i in extra if i in found]
+
+    def search_by_place_name(
+        self, place_name: str, n_results: int = 5, prefix: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Look up places by normalized name: exact matches, then prefix matches."""
+        return self._cached(
+            _cache_key("name", place_name, n_results, None, prefix),
+            lambda: self._lookup(
+                "name_norm", self._name_index, place_name, n_results, prefix
+            ),
+        )
 
-    def get_all_places(self, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get all stored places (up to limit)."""
-        results = self.collection.get(limit=limit)
+    def search_by_genre(
+        self, genre: str, n_results: int = 10, prefix: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Look up places whose normalized genre matches exactly (or by prefix)."""
+        return self._cached(
+            _cache_key("genre", genre, n_results, None, prefix),
+            lambda: self._lookup(
+                "genre_norm", self._genre_index, genre, n_results, prefix
+            ),
+        )
+
+    def get_places_page(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        genre: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """One page of places, newest first.
+
+        Pass the returned ``next_cursor`` back to get the following page;
+        ``offset`` is only used without a cursor (e.g. jumping to a page).
+        The total comes from the catalog's maintained counts.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        # One extra row tells whether another page exists, so an exactly
+        # full last page doesn't hand out a cursor to an empty one
+        rows = self.catalog.page(
+            limit + 1, after=after, offset=0 if after else offset, genre=genre
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
         places = []
-        if results["documents"]:
-            for i, doc in enumerate(results["documents"]):
-                place = {
-                    "document": doc,
-                    "metadata": results["metadatas"][i],
-                    "id": results["ids"][i],
-                }
-                places.append(place)
+        if rows:
+            found = {
+                r["id"]: r
+                for r in self._format_get_results(
+                    self.collection.get(ids=[doc_id for doc_id, _ in rows])
+                )
+            }
+            places = [found[doc_id] for doc_id, _ in rows if doc_id in found]
 
-        return places
+        next_cursor = None
+        if has_more:
+            last_id, last_created = rows[-1]
+            next_cursor = encode_cursor(last_created, last_id)
+
+        return {
+            "places": places,
+            "next_cursor": next_cursor,
+            "total": self.catalog.count(genre),
+        }
+
+    def get_all_places(
+        self, limit: int = 100, offset: int = 0, cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Get stored places newest first (up to limit)."""
+        return self.get_places_page(limit, cursor, offset)["places"]
+
+    def get_places_by_ids(self, place_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch places by id in one primary-key lookup, in the order asked.
+
+        Unknown ids are left out.
+        """
+        ids = list(dict.fromkeys(place_ids))
+        if not ids:
+            return []
+        found = {
+            r["id"]: r for r in self._format_get_results(self.collection.get(ids=ids))
+        }
+        return [found[doc_id] for doc_id in ids if doc_id in found]
+
+    def get_place(self, place_id: str) -> Optional[Dict[str, Any]]:
+        """A single place by id, or None if it is not stored."""
+        places = self.get_places_by_ids([place_id])
+        return places[0] if places else None
 
     def delete_place(self, place_id: str) -> bool:
         """Delete a specific place by ID."""
         try:
             self.collection.delete(ids=[place_id])
+            self._after_delete([place_id])
             return True
         except Exception as e:
             print(f"Error deleting place {place_id}: {e}")
             return False
 
-    def get_stats(self) -> Dict[str, Any]:
-        """Get statistics about the stored data."""
-        try:
+    def refresh_similar(self, batch_size: int = 128) -> int:
+        """Recompute one batch of queued similar-places lists.
+
+        Returns the number of queued places handled (0 when up to date).
+        """
+        if not self.neighbors.is_bootstrapped():
+            self.neighbors.bootstrap([doc_id for doc_id, _ in self._iter_metadata()])
+        batch = self.neighbors.pending(batch_size)
+        if not batch:
+            return 0
+
+        k = self.neighbors.k
+        lists: Dict[str, List[Tuple[str, float]]] = {}
+        candidates: Dict[str, List[Tuple[str, float]]] = {}
+        live = [doc_id for _, doc_id, kind in batch if kind != "deleted"]
+        if live:
+            stored = self.collection.get(ids=live, include=["embeddings"])
             count = self.collection.count()
+            lists = {doc_id: [] for doc_id in stored["ids"]}
+            if stored["ids"] and count > 1:
+                # 2k candidates: a changed place is also offered to places
+                # just outside its own top k, whose lists it may still enter
+                results = self.collection.query(
+                    query_embeddings=stored["embeddings"],
+                    n_results=min(2 * k + 1, count),
+                    include=["distances"],
+                )
+                for doc_id, ids, distances in zip(
+                    stored["ids"], results["ids"], results["distances"]
+                ):
+                    nearest = [(n, d) for n, d in zip(ids, distances) if n != doc_id]
+                    lists[doc_id] = nearest[:k]
+                    candidates[doc_id] = nearest
+        self.neighbors.apply(batch, lists, candidates)
+        return len(batch)
+
+    def start_similar_worker(self, interval: float = 5.0) -> NeighborWorker:
+        """Keep similar-places lists current from a background thread."""
+        if self._neighbor_worker is None:
+            self._neighbor_worker = NeighborWorker(self.refresh_similar, interval)
+            self._neighbor_worker.start()
+        return self._neighbor_worker
+
+    def get_similar(
+        self, place_id: str, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Precomputed nearest places to ``place_id``, nearest first.
+
+        A primary-key read of the neighbour table plus an id fetch; empty
+        until the worker has processed the place.
+        """
+        rows = self.neighbors.get(place_id, limit)
+        if not rows:
+            return []
+        found = {
+            r["id"]: r
+            for r in self._format_get_results(
+                self.collection.get(ids=[doc_id for doc_id, _ in rows])
+            )
+        }
+        return [
+            {**found[doc_id], "distance": distance}
+            for doc_id, distance in rows
+            if doc_id in found
+        ]
 
-            # Get sample data for analysis
-            sample = self.collection.get(limit=100)
+    def export_records(self, path: str, batch_size: int = 1000) -> int:
+        """Stream every place, with its embedding, to a JSONL file.
 
-            genres = {}
-            if sample["metadatas"]:
-                for metadata in sample["metadatas"]:
-                    genre = metadata.get("genre", "unknown")
-                    genres[genre] = genres.get(genre, 0) + 1
+        The first line is a header naming the embedding model; each further
+        line is {id, document, metadata, embedding}. Paths ending in .gz
+        are gzip-compressed. Returns the number of places written.
+        """
+        written = 0
+        with _open_dump(path, "w") as f:
+            header = {"format": EXPORT_FORMAT, "model_id": self.embedder.model_id}
+            f.write(json.dumps(header) + "\n")
+            offset = 0
+            while True:
+                batch = self.collection.get(
+                    include=["documents", "metadatas", "embeddings"],
+                    limit=batch_size,
+                    offset=offset,
+                )
+                for doc_id, document, metadata, embedding in zip(
+                    batch["ids"],
+                    batch["documents"],
+                    batch["metadatas"],
+                    batch["embeddings"],
+                ):
+                    record = {
+                        "id": doc_id,
+                        "document": document,
+                        "metadata": metadata,
+                        "embedding": _pack_vector(embedding),
+                    }
+                    f.write(json.dumps(record) + "\n")
+                written += len(batch["ids"])
+                if len(batch["ids"]) < batch_size:
+                    break
+                offset += batch_size
+        return written
+
+    def import_records(
+        self, path: str, batch_size: int = 5000, reembed: bool = False
+    ) -> int:
+        """Upsert places from an export_records file in large chunks.
+
+        Stored embeddings are reused as-is unless ``reembed`` is set, the
+        file came from a different embedding model, or a record has none;
+        only those documents go through the embedder. Returns the number of
+        places imported.
+        """
+        imported = 0
+        with _open_dump(path, "r") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("format") != EXPORT_FORMAT:
+                raise ValueError(f"{path} is not a {EXPORT_FORMAT} export")
+            if header.get("model_id") != self.embedder.model_id and not reembed:
+                print(
+                    f"⚠️  Export was embedded with {header.get('model_id')}, "
+                    f"re-embedding with {self.embedder.model_id}"
+                )
+                reembed = True
 
-            return {
-                "total_places": count,
-                "genre_distribution": genres,
-                "sample_size": len(sample["metadatas"]) if sample["metadatas"] else 0,
+            chunk: List[Dict[str, Any]] = []
+            for line in f:
+                if line.strip():
+                    chunk.append(json.loads(line))
+                if len(chunk) >= batch_size:
+                    imported += self._import_chunk(chunk, reembed)
+                    chunk = []
+            if chunk:
+                imported += self._import_chunk(chunk, reembed)
+        return imported
+
+    def _import_chunk(self, records: List[Dict[str, Any]], reembed: bool) -> int:
+        ids = [r["id"] for r in records]
+        documents = [r["document"] or "" for r in records]
+        metadatas = [r["metadata"] for r in records]
+        embeddings: List[Optional[List[float]]] = [None] * len(records)
+        if not reembed:
+            for i, record in enumerate(records):
+                if record.get("embedding"):
+                    embeddings[i] = _unpack_vector(record["embedding"])
+        missing = [i for i, e in enumerate(embeddings) if e is None]
+        if missing:
+            for i, vector in zip(missing, self._embed([documents[i] for i in missing])):
+                embeddings[i] = vector
+
+        self.collection.upsert(
+            ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings
+        )
+        self._after_upsert(ids, metadatas, documents)
+        print(f"📥 Imported {len(ids)} places ({len(missing)} re-embedded)")
+        return len(ids)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics about the stored data (exact, from the catalog)."""
+        try:
+            stats = {
+                **self.catalog.stats(),
+                "embedding_cache": self.embedder.stats(),
+                "result_cache": self.result_cache.stats(),
+                "similar_pending": self.neighbors.pending_count(),
             }
+            if self.partition_by:
+                stats["partitions"] = self.collection.stats()
+            return stats
         except Exception as e:
             return {"error": str(e)}
 
@@ -248,10 +1206,12 @@ def store_results_from_file(json_file: str, source_url: str = None) -> List[str]
     return store.store_results(results, source_url)
 
 
-def search_places(query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+def search_places(
+    query: str, n_results: int = 5, filters: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
     """Search for places using a query."""
     store = VectorStore()
-    return store.search(query, n_results)
+    return store.search(query, n_results, filters)
 
 
 if __name__ == "__main__":